@@ -1,4 +1,14 @@
 __version__ = "0.1.0"
 
 from .server import Server, load_lexicons
-from .database import OverturePlaces, OpenStreetMap, OvertureDivisions
\ No newline at end of file
+
+# The source classes belong to the export pipeline; import them on first
+# use so a serving worker importing garganorn never loads it.
+_PIPELINE_EXPORTS = {"OverturePlaces", "OpenStreetMap", "OvertureDivisions"}
+
+
+def __getattr__(name):
+    if name in _PIPELINE_EXPORTS:
+        from . import database
+        return getattr(database, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,28 +1,157 @@
-import gzip, json, os, logging
-from flask import Flask, abort, request, Response
+import gzip, hashlib, os, logging, threading, time
+from flask import Flask, abort, request, Response, send_file
 from werkzeug.utils import safe_join
 from lexrpc.flask_server import init_flask
 from lexrpc.base import XrpcError
 from garganorn import Server
+from garganorn.server import DEFAULT_COVERAGE_CACHE_ENTRIES
 from garganorn.config import load_config
+from garganorn.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, Registry
 
 DEFAULT_CONFIG = "config.yaml"
 
-def create_app():
+
+def _record_etag(stamp, collection, rkey):
+    """ETag for one record of one run: a run never changes its records, so
+    the run stamp plus the record's identity names the representation.
+    Hashed so arbitrary rkey characters never reach the header."""
+    digest = hashlib.sha1(f"{collection}/{rkey}".encode("utf-8")).hexdigest()[:16]
+    return f"{stamp}-{digest}"
+
+# Request metrics are labelled by method, never by anything a client sent.
+_XRPC_METRIC_METHODS = {
+    "org.atgeo.getCoverage": "getCoverage",
+    "com.atproto.repo.getRecord": "getRecord",
+    "org.atgeo.getRecords": "getRecords",
+    "org.atgeo.describeGazetteer": "describeGazetteer",
+}
+
+
+def _metric_method():
+    """The method label for the current request, or None if untracked."""
+    if request.endpoint == "xrpc-endpoint":
+        return _XRPC_METRIC_METHODS.get(request.view_args.get("nsid"))
+    if request.endpoint == "get_resource":
+        return "getRecord"
+    if request.endpoint == "serve_tile":
+        return "tile"
+    return None
+
+
+def _admission_metrics(limiter):
+    """Registry collector for the process's cold-path AdmissionLimiter."""
+    stats = limiter.stats()
+    return [
+        ("garganorn_cold_path_in_flight", "gauge",
+         "Cold lookups and tile loads running now.", [("", {}, stats["in_flight"])]),
+        ("garganorn_cold_path_queue_depth", "gauge",
+         "Cold lookups and tile loads waiting for a slot.", [("", {}, stats["queued"])]),
+        ("garganorn_cold_path_limit", "gauge",
+         "Cold lookups and tile loads allowed at once.", [("", {}, stats["max_concurrent"])]),
+        ("garganorn_cold_path_admitted_total", "counter",
+         "Cold lookups and tile loads admitted.", [("", {}, stats["admitted"])]),
+        ("garganorn_cold_path_shed_total", "counter",
+         "Cold lookups and tile loads refused with 503.", [("", {}, stats["shed"])]),
+    ]
+
+
+def _serving_metrics(gazetteer, served_runs):
+    """Registry collector: the cache and lookup stats kept by the serving
+    objects themselves, read at scrape time. Per-run values restart from
+    zero when a run is swapped in, as counters do on restart."""
+    tile_stats = {}
+    lookups = []
+    rejections = []
+    for collection, run in sorted(served_runs.items()):
+        if run.records is None:
+            continue
+        tile_stats[collection] = run.records.tile_cache.stats()
+        lookups.extend(run.records.lookup_seconds.samples(
+            collection=collection, engine=run.records.record_index))
+        rejections.append(("", {"collection": collection}, run.records.filter_rejections.value()))
+
+    def per_collection(field):
+        return [("", {"collection": c}, stats[field]) for c, stats in tile_stats.items()]
+
+    coverage = gazetteer.coverage_cache.stats()
+    return [
+        ("garganorn_tile_cache_hits_total", "counter",
+         "getRecord tile reads answered from the tile cache.", per_collection("hits")),
+        ("garganorn_tile_cache_misses_total", "counter",
+         "getRecord tile reads that loaded the tile.", per_collection("misses")),
+        ("garganorn_tile_cache_evictions_total", "counter",
+         "Tiles evicted from the tile cache.", per_collection("evictions")),
+        ("garganorn_tile_cache_coalesced_total", "counter",
+         "Tile cache misses that waited on another request's load.",
+         per_collection("coalesced")),
+        ("garganorn_tile_cache_bytes", "gauge",
+         "Decompressed bytes held in the tile cache.", per_collection("bytes")),
+        ("garganorn_tile_cache_max_bytes", "gauge",
+         "Tile cache byte budget.", per_collection("max_bytes")),
+        ("garganorn_record_lookup_seconds", "histogram",
+         "Time to find an rkey's candidate tiles, by record_index engine.", lookups),
+        ("garganorn_record_filter_rejections_total", "counter",
+         "getRecord misses answered by the run's rkey Bloom filter alone.", rejections),
+        ("garganorn_coverage_cache_hits_total", "counter",
+         "getCoverage answers served from the coverage cache.",
+         [("", {}, coverage["hits"])]),
+        ("garganorn_coverage_cache_misses_total", "counter",
+         "getCoverage answers computed by a tile walk.", [("", {}, coverage["misses"])]),
+        ("garganorn_coverage_cache_hit_ratio", "gauge",
+         "Coverage cache hits over lookups since startup.",
+         [("", {}, coverage["hit_ratio"])]),
+        ("garganorn_coverage_cache_entries", "gauge",
+         "Entries held in the coverage cache.", [("", {}, coverage["entries"])]),
+        ("garganorn_coverage_errors_total", "counter",
+         "getCoverage requests rejected, by error name (BboxTooLarge, "
+         "BboxTooPrecise, ...).", list(gazetteer.coverage_errors.samples())),
+    ]
+
+
+def create_app(preload=False):
+    """Build the WSGI app from $GARGANORN_CONFIG.
+
+    preload=True is for gunicorn --preload (see garganorn/gunicorn_conf.py):
+    everything is built in the master before it forks, so workers share
+    the manifests, record indexes, pinned tiles and lexicons copy-on-write
+    instead of each building its own. Threads don't survive fork(), so
+    warm-up finishes before this returns and the RunWatcher starts in each
+    worker after the fork instead of here.
+    """
     config_path = os.getenv("GARGANORN_CONFIG", DEFAULT_CONFIG)
     repo, tiles_config = load_config(config_path)
 
     app = Flask("garganorn")
     app.logger.setLevel(logging.INFO)
-    tile_manifests = {}
-    tile_collections = {}
-    collection_metadata = {}
     max_coverage_tiles = 50
     tile_dirs = {}  # slug -> tiles_dir
+    run_stamps = {}  # collection -> serving run's stamp, for record ETags
+    pinned_tiles = {}  # slug -> serving run's Run.pinned
+    served_runs = {}  # collection -> Run being served
+    tiles_ready = threading.Event()  # set once boot warm-up is done
+    app.tiles_ready = tiles_ready
+    runs = {}
+    collections_cfg = {}
+    tile_flight = None
     if tiles_config:
-        from garganorn.quadtree import TileManifest
-        from garganorn.tile_reader import TileBackedCollection
-        for collection, coll_cfg in tiles_config.get("collections", {}).items():
+        from garganorn.runs import load_run, pin_run, resolve_run_dir
+        from garganorn.tile_reader import (
+            DEFAULT_COLD_LOADS,
+            DEFAULT_COLD_QUEUE,
+            DEFAULT_COLD_QUEUE_SECONDS,
+            AdmissionLimiter,
+            SingleFlight,
+        )
+        # One per process: getRecord's DuckDB lookups and cache misses and
+        # serve_tile's decompressions share it, so the cold-path bound --
+        # and the queue past which requests are shed -- is global.
+        tile_flight = SingleFlight(limiter=AdmissionLimiter(
+            tiles_config.get("max_cold_tile_loads", DEFAULT_COLD_LOADS),
+            max_queue=tiles_config.get("cold_load_queue", DEFAULT_COLD_QUEUE),
+            queue_timeout=tiles_config.get("cold_load_queue_seconds", DEFAULT_COLD_QUEUE_SECONDS),
+        ))
+        collections_cfg = tiles_config.get("collections", {})
+        for collection, coll_cfg in collections_cfg.items():
             manifest_path = coll_cfg.get("manifest")
             base_url = coll_cfg.get("base_url")
             slug = coll_cfg.get("slug")
@@ -34,51 +163,129 @@ def create_app():
                 )
             # Completeness guard: a run is only ready to serve when BOTH
             # manifest.duckdb AND its sibling manifest.json (the completeness
-            # marker, written last) exist. `and` short-circuits so
-            # os.path.dirname never sees manifest_path=None.
-            ready = (
-                bool(manifest_path)
-                and os.path.isfile(manifest_path)
-                and os.path.isfile(os.path.join(os.path.dirname(manifest_path), "manifest.json"))
-            )
-            if manifest_path and not ready:
+            # marker, written last) exist.
+            run_dir = resolve_run_dir(manifest_path)
+            if manifest_path and run_dir is None:
                 app.logger.warning(
                     "Tile run for %s is incomplete or missing (no manifest.json completeness "
                     "marker); tile serving disabled for this collection", collection,
                 )
-            if ready:
-                run_dir = os.path.realpath(os.path.dirname(manifest_path))
-                stamp = os.path.basename(run_dir)
-                tiles_root = os.path.dirname(run_dir)
-                tile_manifests[collection] = TileManifest(manifest_path, f"{base_url}/{stamp}")
-                collection_json_path = os.path.join(run_dir, "collection.json")
-                if os.path.isfile(collection_json_path):
-                    with open(collection_json_path) as f:
-                        collection_metadata[collection] = json.load(f)
-                if "tiles_dir" in coll_cfg:
-                    tile_collections[collection] = TileBackedCollection(
-                        collection=collection,
-                        manifest_db_path=manifest_path,
-                        tiles_dir=run_dir,
-                        source_url=coll_cfg.get("source", ""),
-                        license_url=coll_cfg.get("license", ""),
+            if run_dir is not None:
+                runs[collection] = load_run(collection, coll_cfg, run_dir, tile_flight)
+                if "tiles_dir" in coll_cfg and not slug and base_url:
+                    app.logger.warning(
+                        "Collection %s has base_url but no slug; getCoverage URLs will 404",
+                        collection,
                     )
-                    # Gate serving on the SAME readiness condition: the route
-                    # must not serve a collection whose tiles are otherwise disabled.
-                    if slug:
-                        tile_dirs[slug] = tiles_root
-                    elif base_url:
-                        app.logger.warning(
-                            "Collection %s has base_url but no slug; getCoverage URLs will 404",
-                            collection,
-                        )
         max_coverage_tiles = tiles_config.get("max_coverage_tiles", 50)
-    gazetteer = Server(repo, app.logger,
-                       tile_manifests=tile_manifests, tile_collections=tile_collections,
-                       max_coverage_tiles=max_coverage_tiles,
-                       collection_metadata=collection_metadata)
+    gazetteer = Server(repo, app.logger, max_coverage_tiles=max_coverage_tiles,
+                       coverage_cache_entries=(tiles_config or {}).get(
+                           "coverage_cache_entries", DEFAULT_COVERAGE_CACHE_ENTRIES))
+
+    def install_run(run):
+        """Make run the one its collection serves (at startup, and again
+        from the RunWatcher whenever `current` moves to a complete run)."""
+        gazetteer.swap_run(run)
+        served_runs[run.collection] = run
+        if run.records is not None:
+            # Gate serving on the SAME readiness condition: the route
+            # must not serve a collection whose tiles are otherwise disabled.
+            slug = collections_cfg[run.collection].get("slug")
+            if slug:
+                tile_dirs[slug] = run.tiles_root
+                pinned_tiles[slug] = run.pinned
+            # Last, so no response pairs the new run's stamp with the old
+            # run's content.
+            run_stamps[run.collection] = run.stamp
+
+    for run in runs.values():
+        install_run(run)
+
+    def warm_up():
+        """Pin each booted run's hot tiles, then report ready. Runs
+        alongside serving: until a run's pins land, its tiles come from
+        disk."""
+        try:
+            for run in runs.values():
+                pin_run(run, collections_cfg[run.collection])
+                slug = collections_cfg[run.collection].get("slug")
+                # A reload may have replaced the run meanwhile; its own
+                # pins came with it.
+                if slug and served_runs.get(run.collection) is run:
+                    pinned_tiles[slug] = run.pinned
+        except Exception:
+            app.logger.exception("Tile warm-up failed; serving pinned tiles from disk")
+        finally:
+            tiles_ready.set()
+
+    if preload:
+        warm_up()
+    elif any(run.records is not None for run in runs.values()):
+        threading.Thread(target=warm_up, name="garganorn-warm-up", daemon=True).start()
+    else:
+        tiles_ready.set()
+
+    reload_interval = (tiles_config or {}).get("reload_interval", 0)
+    if reload_interval and collections_cfg:
+        from garganorn.runs import RunWatcher
+        app.run_watcher = RunWatcher(collections_cfg, runs, reload_interval, install_run,
+                                     tile_flight)
+        if preload:
+            # Each worker polls for itself: a run swapped in by the master
+            # would never reach workers already forked.
+            os.register_at_fork(after_in_child=app.run_watcher.start)
+        else:
+            app.run_watcher.start()
     init_flask(gazetteer.server, app)
 
+    metrics = app.metrics = Registry()
+    request_seconds = metrics.histogram(
+        "garganorn_request_duration_seconds", "Request latency by method.")
+    requests_total = metrics.counter(
+        "garganorn_requests_total", "Requests by method and status code.")
+    tile_bytes = metrics.counter(
+        "garganorn_tile_bytes_served_total", "Tile response body bytes, by encoding.")
+    records_served = metrics.counter(
+        "garganorn_records_served_total", "Records returned by getRecord and getRecords, by collection.")
+    metrics.collector(lambda: _serving_metrics(gazetteer, served_runs))
+    if tile_flight is not None:
+        metrics.collector(lambda: _admission_metrics(tile_flight.limiter))
+
+    # Registered ahead of every other hook: a before_request that answers
+    # (the record 304) skips the ones after it, and the after_request
+    # registered first runs last, so it sees the final response.
+    @app.before_request
+    def start_request_timer():
+        request.environ["garganorn.start"] = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        method = _metric_method()
+        start = request.environ.get("garganorn.start")
+        if method is None or start is None:
+            return response
+        request_seconds.observe(time.perf_counter() - start, method=method)
+        requests_total.inc(method=method, code=str(response.status_code))
+        if response.status_code == 200:
+            if method == "tile":
+                tile_bytes.inc(response.content_length or 0,
+                               encoding=response.headers.get("Content-Encoding", "identity"))
+            elif method == "getRecord":
+                collection = (request.view_args.get("collection")
+                              if request.endpoint == "get_resource"
+                              else request.args.get("collection"))
+                # Only collections this server serves, so a client can't
+                # mint label values.
+                if collection in served_runs:
+                    records_served.inc(collection=collection)
+            elif method == "getRecords":
+                collection = request.args.get("collection")
+                if collection in served_runs:
+                    records_served.inc(
+                        sum(not entry.get("notFound") for entry in response.get_json()["records"]),
+                        collection=collection)
+        return response
+
     lexicon_map = gazetteer.lexicon_map
 
     @app.route('/<nsid>')
@@ -104,8 +311,26 @@ def create_app():
 
     @app.route('/health')
     def health_check():
+        # Not ready until warm-up has pinned the hot tiles, so a load
+        # balancer doesn't route to a worker that would serve them from disk.
+        if not tiles_ready.is_set():
+            return {"status": "warming", "service": "garganorn"}, 503
         return {"status": "ok", "service": "garganorn"}, 200
 
+    @app.route('/metrics')
+    def metrics_endpoint():
+        return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
+
+    if tile_flight is not None:
+        from garganorn.tile_reader import Overloaded
+
+        @app.errorhandler(Overloaded)
+        def shed_overloaded(e):
+            # Fast and cheap on purpose: the client backs off, and the
+            # thread goes back to requests that don't need the cold path.
+            return ({"error": "Overloaded", "message": str(e)}, 503,
+                    {"Retry-After": str(e.retry_after)})
+
     @app.route('/<collection>/<path:rkey>')
     def get_resource(collection, rkey):
         try:
@@ -117,21 +342,91 @@ def create_app():
 
     @app.route("/tiles/<slug>/<path:tile_path>")
     def serve_tile(slug, tile_path):
-        """Serve a tile as plain JSON, decompressed from its on-disk gzip
-        file -- storage format and wire format are separate decisions;
-        Caddy owns wire compression negotiation via Accept-Encoding."""
+        """Serve a tile as JSON. Clients that accept gzip get the on-disk
+        .json.gz bytes verbatim with Content-Encoding: gzip -- via
+        send_file, so the WSGI server can sendfile() them without touching
+        the body. Only clients that don't accept gzip pay for a decompress.
+        Vary: Accept-Encoding keeps shared caches from crossing the two.
+        A matching If-None-Match gets a 304 before the file is opened.
+        Pinned tiles are answered from memory in either form without
+        touching the filesystem at all."""
         if not tile_path.endswith(".json.gz"):
             return ("Not found", 404)
         tiles_dir = tile_dirs.get(slug)
         if tiles_dir is None:
             return ("Not found", 404)
-        full_path = safe_join(tiles_dir, tile_path)
-        if full_path is None or not os.path.isfile(full_path):
-            return ("Not found", 404)
-        with gzip.open(full_path, "rb") as f:
-            data = f.read()
-        response = Response(data, mimetype="application/json")
+        pinned = pinned_tiles.get(slug, {}).get(tile_path)
+        if pinned is None:
+            full_path = safe_join(tiles_dir, tile_path)
+            if full_path is None or not os.path.isfile(full_path):
+                return ("Not found", 404)
+        gzip_ok = request.accept_encodings["gzip"] > 0
+        # tile_path is <stamp>/<qk6>/<qk>.json.gz, and a run's tiles never
+        # change, so stamp + quadkey names the content; the two encodings
+        # are distinct representations and need distinct tags.
+        stamp = tile_path.split("/", 1)[0]
+        qk = os.path.basename(tile_path)[:-len(".json.gz")]
+        etag = f"{stamp}-{qk}-gz" if gzip_ok else f"{stamp}-{qk}"
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        elif pinned is not None:
+            response = Response(pinned[0] if gzip_ok else pinned[1],
+                                mimetype="application/json")
+            if gzip_ok:
+                response.headers["Content-Encoding"] = "gzip"
+        elif gzip_ok:
+            response = send_file(full_path, mimetype="application/json",
+                                 conditional=False, etag=False)
+            response.headers["Content-Encoding"] = "gzip"
+        else:
+            def read():
+                with gzip.open(full_path, "rb") as f:
+                    return f.read()
+            data, _ = tile_flight.do(full_path, read)
+            response = Response(data, mimetype="application/json")
+        response.set_etag(etag)
         response.headers["Cache-Control"] = "public, max-age=604800, immutable"
+        response.vary.add("Accept-Encoding")
+        return response
+
+    def request_record_etag():
+        """The ETag of the tile-backed record this request asks for, or
+        None if it isn't a record request (or names no tile collection)."""
+        if request.endpoint == "get_resource":
+            collection = request.view_args.get("collection")
+            rkey = request.view_args.get("rkey")
+        elif (
+            request.endpoint == "xrpc-endpoint"
+            and request.view_args.get("nsid") == "com.atproto.repo.getRecord"
+        ):
+            collection = request.args.get("collection")
+            rkey = request.args.get("rkey")
+        else:
+            return None
+        stamp = run_stamps.get(collection)
+        if stamp is None or not rkey:
+            return None
+        return _record_etag(stamp, collection, rkey)
+
+    @app.before_request
+    def record_not_modified():
+        # Runs before the view, so a revalidation costs no manifest lookup
+        # and no tile read.
+        if not request.if_none_match:
+            return None
+        etag = request_record_etag()
+        if etag is not None and request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+            response.set_etag(etag, weak=True)
+            return response
+        return None
+
+    @app.after_request
+    def add_record_etag(response):
+        if response.status_code == 200:
+            etag = request_record_etag()
+            if etag is not None:
+                response.set_etag(etag, weak=True)
         return response
 
     CACHED_QUERIES = {"org.atgeo.getCoverage", "org.atgeo.describeGazetteer"}
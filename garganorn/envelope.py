@@ -5,6 +5,7 @@ implementation of the envelope shape.
 
 Imports nothing from garganorn — no import cycle with server.py or stages.py.
 """
+import hashlib
 import json
 
 
@@ -33,6 +34,20 @@ def wrap_record(uri: str, record_json: str) -> str:
     return '{"uri":%s,"cid":null,"value":%s}' % (json.dumps(uri), record_json)
 
 
+def wrap_record_sql(repo: str, collection: str, rkey: str, record_json: str) -> str:
+    """A DuckDB VARCHAR expression equal to wrap_record(record_uri(repo,
+    collection, rkey), record_json) for the columns named rkey and
+    record_json.
+
+    The URI is quoted, not JSON-escaped: rkeys are record-key syntax
+    (ASCII letters, digits and . - _ : ~), none of which json.dumps
+    escapes, and repo and collection are ASCII constants.
+    """
+    prefix = '{"uri":"' + record_uri(repo, collection, "")
+    return "('%s' || %s || '\",\"cid\":null,\"value\":' || %s || '}')" % (
+        prefix.replace("'", "''"), rkey, record_json)
+
+
 def build_tile_payload(collection: str, source_url: str, license_url: str,
                         generated_at: str, wrapped_records: list) -> bytes:
     """Build the top-level tile payload.
@@ -42,6 +57,14 @@ def build_tile_payload(collection: str, source_url: str, license_url: str,
     strings; they are embedded verbatim via string composition, matching
     wrap_record's no-parse-round-trip contract.
     """
+    header = tile_header(collection, source_url, license_url, generated_at)
+    return compose_tile_payload(header, ",".join(wrapped_records).encode("utf-8"))
+
+
+def tile_header(collection: str, source_url: str, license_url: str,
+                generated_at: str) -> bytes:
+    """The payload bytes before the first record: the top-level keys other
+    than records, then the opening of the records array."""
     header = json.dumps({
         "collection": collection,
         "source": source_url,
@@ -49,8 +72,62 @@ def build_tile_payload(collection: str, source_url: str, license_url: str,
         "generated_at": generated_at,
     })
     # header is '{"collection": ..., ..., "generated_at": "..."}' -- splice
-    # "records" in before the closing brace, joining the wrapped record
-    # strings verbatim.
-    joined_records = ",".join(wrapped_records)
-    payload = header[:-1] + ',"records":[' + joined_records + ']}'
-    return payload.encode("utf-8")
+    # "records" in before the closing brace.
+    return (header[:-1] + ',"records":[').encode("utf-8")
+
+
+def compose_tile_payload(header: bytes, joined_records: bytes) -> bytes:
+    """A tile payload from tile_header's output and the UTF-8 wrapped
+    records already comma-joined -- by build_tile_payload, or by a
+    string_agg over wrap_record_sql."""
+    return header + joined_records + b"]}"
+
+
+def _utf8_len(s: str) -> int:
+    return len(s) if s.isascii() else len(s.encode("utf-8"))
+
+
+def record_value_spans(payload: bytes, wrapped_records: list,
+                       record_jsons: list) -> list:
+    """(offset, length) of each record's `value` inside payload.
+
+    payload is build_tile_payload's output for wrapped_records, and
+    record_jsons[i] is the record_json wrap_record embedded in
+    wrapped_records[i]. Offsets are bytes into the uncompressed payload, so
+    a reader can json.loads(payload[offset:offset + length]) one record
+    without parsing the tile. Computed from the composition rules above,
+    not by scanning: the records array ends two bytes ("]}") before the
+    payload does, records are comma-joined, and each value ends one byte
+    ("}") before its wrapper does.
+    """
+    return value_spans(len(payload), [_utf8_len(w) for w in wrapped_records],
+                       [_utf8_len(r) for r in record_jsons])
+
+
+def value_spans(payload_len: int, wrapped_lens: list, value_lens: list) -> list:
+    """record_value_spans from byte lengths alone: the payload's, each
+    wrapped record's, and each record_json's."""
+    pos = payload_len - 2 - sum(wrapped_lens) - max(len(wrapped_lens) - 1, 0)
+    spans = []
+    for wrapped_len, value_len in zip(wrapped_lens, value_lens):
+        spans.append((pos + wrapped_len - 1 - value_len, value_len))
+        pos += wrapped_len + 1
+    return spans
+
+
+def tile_digest(payload: bytes) -> str:
+    """Hex content digest of a build_tile_payload payload, blind to its
+    generated_at.
+
+    Every run stamps its own generated_at into every tile, so two runs'
+    copies of an unchanged tile differ only there; the digest hashes the
+    header up to generated_at and the records array after it, so they
+    match. Found from the composition rules above: json.dumps escapes any
+    quote inside a header value, so the ', "generated_at": ' key and the
+    ',"records":[' splice can only occur where build_tile_payload put them.
+    """
+    records_at = payload.index(b',"records":[')
+    generated_at = payload.rindex(b', "generated_at": ', 0, records_at)
+    digest = hashlib.blake2b(payload[:generated_at], digest_size=16)
+    digest.update(payload[records_at:])
+    return digest.hexdigest()
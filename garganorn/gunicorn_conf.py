@@ -0,0 +1,26 @@
+"""gunicorn settings for preload-and-fork serving.
+
+    gunicorn -c python:garganorn.gunicorn_conf \\
+        "garganorn.__main__:create_app(preload=True)" --workers 16
+
+The master builds the app once -- manifests, record indexes, pinned tiles,
+lexicons -- and every worker inherits it copy-on-write. Two things keep
+those pages shared: the big structures are flat arrays, mmaps and bytes
+rather than many small objects whose refcounts would be written on every
+touch, and gc.freeze() moves everything the master built into the
+permanent generation, so no worker's collector ever writes to it.
+Following the gc.freeze documentation, collection is off while the app
+loads, so freed objects don't leave holes for later allocations to dirty.
+"""
+import gc
+
+preload_app = True
+
+gc.disable()
+
+
+def when_ready(server):
+    # Called in the master after the preloaded app is built and before the
+    # first worker is forked.
+    gc.freeze()
+    gc.enable()
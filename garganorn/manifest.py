@@ -0,0 +1,165 @@
+"""The serving side of a tile run's manifest: which tiles exist, and which
+of them cover a bbox.
+
+Serving-only: imports nothing from the export pipeline (stages, covering,
+database, quadtree), so a worker that only serves never loads it. The
+pipeline re-exports TileManifest and BboxTooLarge from garganorn.quadtree.
+"""
+import bisect
+import logging
+import math
+import os
+from array import array
+
+import duckdb
+
+from garganorn.quadkey import (
+    bboxes_intersect,
+    pack_quadkey,
+    quadkey_to_bbox,
+    subtree_range,
+    unpack_quadkey,
+)
+from garganorn.record_index import INDEX_FILENAME, RecordIndex
+
+log = logging.getLogger(__name__)
+
+
+class BboxTooLarge(Exception):
+    pass
+
+
+class TileManifest:
+    def __init__(self, manifest_path: str, base_url: str):
+        self.base_url = base_url.rstrip("/")
+        # Runs exported with a manifest.idx sidecar carry the sorted tile
+        # array ready-made: map it, sharing pages with every other worker.
+        idx_path = os.path.join(os.path.dirname(manifest_path), INDEX_FILENAME)
+        if os.path.exists(idx_path):
+            try:
+                self._set_index(RecordIndex.from_file(idx_path).tiles)
+                return
+            except ValueError as e:
+                # An older index layout: manifest.duckdb still has the tiles.
+                log.warning("TileManifest: ignoring %s: %s", idx_path, e)
+        con = duckdb.connect(manifest_path, read_only=True)
+        try:
+            # The tiles table holds one row per tile; runs exported before
+            # it existed only have record_tiles, one row per (rkey, tile).
+            has_tiles_table = con.execute(
+                "SELECT count(*) FROM duckdb_tables() WHERE table_name = 'tiles'"
+            ).fetchone()[0] > 0
+            if has_tiles_table:
+                rows = con.execute("SELECT tile_qk FROM tiles").fetchall()
+            else:
+                rows = con.execute("SELECT DISTINCT tile_qk FROM record_tiles").fetchall()
+            self._build_index(row[0] for row in rows)
+        finally:
+            con.close()
+
+    def _build_index(self, quadkeys):
+        """Hold the manifest as a sorted array('Q') of packed quadints
+        (garganorn.quadkey) -- 8 bytes a tile.
+
+        Sorted quadints are a flattened trie: every quadkey's descendants
+        form one contiguous run immediately after it, so a subtree is a
+        bisect range and a bbox query can prune it whole.
+        """
+        self._set_index(array("Q", sorted(pack_quadkey(qk) for qk in quadkeys)))
+
+    def _set_index(self, packed):
+        """Adopt packed (sorted quadints: an array, or a memoryview over
+        manifest.idx) as the manifest."""
+        self._packed = packed
+        # A capped walk finds the first summary tile without touching the
+        # rest of the array -- which, mmapped, would fault in every page.
+        found = []
+        self._walk("", 0, len(packed), (-180, -90, 180, 90), 1, 5, found, 0)
+        self.has_summary_band = bool(found)
+
+    def __len__(self):
+        return len(self._packed)
+
+    def __iter__(self):
+        return (unpack_quadkey(v) for v in self._packed)
+
+    def __contains__(self, qk):
+        try:
+            packed = pack_quadkey(qk)
+        except (TypeError, ValueError):
+            return False
+        i = bisect.bisect_left(self._packed, packed)
+        return i < len(self._packed) and self._packed[i] == packed
+
+    def count_prefix(self, prefix):
+        """Number of manifest tiles at or under prefix."""
+        lo, hi = subtree_range(prefix)
+        return (bisect.bisect_left(self._packed, hi)
+                - bisect.bisect_left(self._packed, lo))
+
+    def summary_tiles(self):
+        """Every summary-band tile (quadkey length < 6), in quadkey order."""
+        out = []
+        self._walk("", 0, len(self._packed), (-180, -90, 180, 90), 1, 5, out, math.inf)
+        return out
+
+    def tiles_with_prefix(self, prefix):
+        """Every manifest tile at or under prefix, in quadkey order."""
+        lo, hi = subtree_range(prefix)
+        start = bisect.bisect_left(self._packed, lo)
+        end = bisect.bisect_left(self._packed, hi, start)
+        return [unpack_quadkey(self._packed[i]) for i in range(start, end)]
+
+    def _walk(self, prefix, lo, hi, bbox, min_len, max_len, out, limit):
+        """Collect quadkeys in self._packed[lo:hi] -- the run under prefix --
+        whose length is in [min_len, max_len] and whose tile intersects bbox.
+
+        Descends only into children that hold at least one tile and whose
+        envelope intersects bbox, and stops once out holds more than limit
+        entries, so a query costs the size of its answer (capped at
+        limit + 1), not the size of the manifest.
+        """
+        packed = self._packed
+        if lo < hi and packed[lo] == pack_quadkey(prefix):
+            if len(prefix) >= min_len:
+                out.append(prefix)
+            lo += 1
+        if len(prefix) >= max_len:
+            return
+        for digit in "0123":
+            if len(out) > limit or lo >= hi:
+                return
+            child = prefix + digit
+            child_min, child_max = subtree_range(child)
+            child_lo = bisect.bisect_left(packed, child_min, lo, hi)
+            child_hi = bisect.bisect_left(packed, child_max, child_lo, hi)
+            lo = child_hi
+            if child_lo == child_hi:
+                continue
+            if not bboxes_intersect(quadkey_to_bbox(child), bbox):
+                continue
+            self._walk(child, child_lo, child_hi, bbox,
+                       min_len, max_len, out, limit)
+
+    def _tile_url(self, qk):
+        return f"{self.base_url}/{qk[:6]}/{qk}.json.gz"
+
+    def get_tiles_for_bbox(self, xmin, ymin, xmax, ymax, max_tiles=50):
+        # Summary tiles are keyed by quadkey length < 6 (the regular band's
+        # min_zoom); answer from the regular band first, and fall back to
+        # the summary band -- uncapped, since it is bounded by construction
+        # -- only when the regular answer exceeds max_tiles
+        # (docs/design-constraints.md).
+        bbox = (xmin, ymin, xmax, ymax)
+        n = len(self._packed)
+        regular = []
+        self._walk("", 0, n, bbox, 6, math.inf, regular, max_tiles)
+        if len(regular) <= max_tiles:
+            return [self._tile_url(qk) for qk in regular]
+
+        if self.has_summary_band:
+            summary = []
+            self._walk("", 0, n, bbox, 1, 5, summary, math.inf)
+            return [self._tile_url(qk) for qk in summary]
+
+        raise BboxTooLarge(f"Bounding box covers more than {max_tiles} tiles")
@@ -0,0 +1,144 @@
+"""Prometheus text-format metrics for the server, without a client library.
+
+Counter and Histogram hold values keyed by label set; a Registry renders
+them, plus whatever its collectors report at scrape time (cache stats that
+already live on the objects they describe), in the text exposition format
+(version 0.0.4).
+
+Labels name methods, collections and outcomes only -- never anything taken
+from a request's parameters, so no bbox or rkey ever reaches /metrics.
+
+Imports nothing from garganorn.
+"""
+import math
+import threading
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds. Most requests are sub-millisecond cache hits; the tail is cold
+# tile reads.
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class Counter:
+    """Monotonic counts, one per label set."""
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(_label_key(labels), 0)
+
+    def samples(self, **extra):
+        """Yield ("", labels, value) for each label set seen."""
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield "", {**dict(key), **extra}, value
+
+
+class Histogram:
+    """Cumulative-bucket histograms, one per label set."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # label key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[i] += 1
+            entry[-2] += value
+            entry[-1] += 1
+
+    def count(self, **labels):
+        with self._lock:
+            entry = self._values.get(_label_key(labels))
+            return entry[-1] if entry else 0
+
+    def samples(self, **extra):
+        """Yield (suffix, labels, value) rows: _bucket per bound and +Inf,
+        then _sum and _count, for each label set seen."""
+        with self._lock:
+            items = sorted((key, list(entry)) for key, entry in self._values.items())
+        for key, entry in items:
+            labels = {**dict(key), **extra}
+            for bound, n in zip(self.buckets, entry):
+                yield "_bucket", {**labels, "le": bound}, n
+            yield "_bucket", {**labels, "le": math.inf}, entry[-1]
+            yield "_sum", labels, entry[-2]
+            yield "_count", labels, entry[-1]
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    parts = []
+    for name, value in labels.items():
+        if not isinstance(value, str):
+            value = _format_value(value)
+        value = value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{name}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+class Registry:
+    def __init__(self):
+        self._families = []  # (name, type, help, metric)
+        self._collectors = []
+
+    def counter(self, name, help_text) -> Counter:
+        metric = Counter()
+        self._families.append((name, "counter", help_text, metric))
+        return metric
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(buckets)
+        self._families.append((name, "histogram", help_text, metric))
+        return metric
+
+    def collector(self, collect):
+        """Register collect(), called at each render; it returns an iterable
+        of (name, type, help, samples) families, samples as yielded by
+        Counter.samples / Histogram.samples."""
+        self._collectors.append(collect)
+        return collect
+
+    def render(self) -> str:
+        families = [(name, kind, help_text, metric.samples())
+                    for name, kind, help_text, metric in self._families]
+        for collect in self._collectors:
+            families.extend(collect())
+        lines = []
+        for name, kind, help_text, samples in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
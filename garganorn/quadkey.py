@@ -0,0 +1,109 @@
+"""Quadkey helpers: tile envelopes, and the packed 64-bit encoding
+("quadint") for compact in-memory manifests.
+
+A quadkey of up to MAX_ZOOM digits packs into one unsigned 64-bit integer:
+its digits, two bits each, left-aligned in the high 58 bits, and its zoom in
+the low 5 bits. Integer order on packed values is exactly string order on
+quadkeys, so a sorted array('Q') keeps each tile's descendants in one
+contiguous run right after it -- the same property a sorted list of str has,
+at 8 bytes a tile instead of a str object each.
+
+Imports nothing from garganorn, so the serving and pipeline sides can both
+use it.
+"""
+import math
+
+MAX_ZOOM = 29
+_ZOOM_BITS = 5
+_ZOOM_MASK = (1 << _ZOOM_BITS) - 1
+
+
+def _shift(zoom: int) -> int:
+    return 2 * (MAX_ZOOM - zoom) + _ZOOM_BITS
+
+
+def pack_quadkey(quadkey: str) -> int:
+    """Pack a quadkey string into its quadint. Raises ValueError on a key
+    longer than MAX_ZOOM or with a digit outside 0-3."""
+    zoom = len(quadkey)
+    if zoom > MAX_ZOOM:
+        raise ValueError(f"quadkey {quadkey!r} is deeper than zoom {MAX_ZOOM}")
+    if quadkey.strip("0123"):
+        raise ValueError(f"invalid quadkey {quadkey!r}")
+    digits = int(quadkey, 4) if quadkey else 0
+    return (digits << _shift(zoom)) | zoom
+
+
+def packed_zoom(packed: int) -> int:
+    """Zoom (quadkey length) of a quadint, without unpacking it."""
+    return packed & _ZOOM_MASK
+
+
+def unpack_quadkey(packed: int) -> str:
+    """Inverse of pack_quadkey."""
+    zoom = packed & _ZOOM_MASK
+    digits = packed >> _shift(zoom)
+    chars = []
+    for _ in range(zoom):
+        chars.append("0123"[digits & 3])
+        digits >>= 2
+    return "".join(reversed(chars))
+
+
+def subtree_range(quadkey: str) -> tuple[int, int]:
+    """Half-open [lo, hi) quadint range holding quadkey and every descendant.
+
+    lo is quadkey's own packed value; hi is where its next sibling's subtree
+    would start, so bisecting a sorted quadint array on both bounds yields
+    exactly the tiles under quadkey.
+    """
+    lo = pack_quadkey(quadkey)
+    return lo, lo - len(quadkey) + (1 << _shift(len(quadkey)))
+
+
+def quadkey_to_bbox(quadkey: str) -> tuple[float, float, float, float]:
+    x, y, level = 0, 0, len(quadkey)
+    for i, ch in enumerate(quadkey):
+        bit = level - i - 1
+        mask = 1 << bit
+        digit = int(ch)
+        if digit & 1:
+            x |= mask
+        if digit & 2:
+            y |= mask
+    n = 2 ** level
+    lon_min = x / n * 360 - 180
+    lon_max = (x + 1) / n * 360 - 180
+    lat_max = 90.0 if y == 0 else math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    lat_min = -90.0 if y == n - 1 else math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return (lon_min, lat_min, lon_max, lat_max)
+
+
+def bboxes_intersect(a, b):
+    """Check if two bboxes intersect, handling antimeridian crossing.
+
+    For antimeridian-crossing bboxes (xmin > xmax), the bbox wraps around the
+    ±180° meridian. This function detects crossing and computes intersection
+    correctly for all combinations of normal and crossing bboxes.
+    """
+    a_crosses = a[0] > a[2]  # xmin > xmax indicates antimeridian crossing
+    b_crosses = b[0] > b[2]
+
+    # Latitude check is always the same (no wrapping in latitude)
+    if a[1] > b[3] or a[3] < b[1]:
+        return False
+
+    if not a_crosses and not b_crosses:
+        # Normal case: neither box crosses the antimeridian
+        return a[0] <= b[2] and a[2] >= b[0]
+
+    if a_crosses and not b_crosses:
+        # a wraps around: check if b overlaps the western or eastern part of a
+        return a[2] >= b[0] or a[0] <= b[2]
+
+    if not a_crosses and b_crosses:
+        # b wraps around: check if a overlaps the western or eastern part of b
+        return b[2] >= a[0] or b[0] <= a[2]
+
+    # Both wrap: they must overlap (both span the antimeridian)
+    return True
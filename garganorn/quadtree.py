@@ -27,9 +27,11 @@ from .stages import (
     stage_division_tile_references,
     stage_summary_division_tile_references,
     stage_export,
+    EXPORT_ENGINES,
     resolve_newest_release,
 )
 from .covering import stage_covering
+from .manifest import BboxTooLarge, TileManifest  # noqa: F401 -- re-exported
 
 log = logging.getLogger(__name__)
 
@@ -80,7 +82,7 @@ def _union_tile_assignments(regular_path, summary_path, output_path, *,
     finalize_artifact(tmp_output, output_path, params={}, inputs=inputs)
 
 
-def run_pipeline(source, parquet_glob, bbox, output_dir, memory_limit="48GB", max_per_tile=1000, boundaries_db=None, export_workers=None, density_parquet=None, idf_parquet=None, force=False, temp_directory=None, max_temp_directory_size="250GB"):
+def run_pipeline(source, parquet_glob, bbox, output_dir, memory_limit="48GB", max_per_tile=1000, boundaries_db=None, export_workers=None, export_partition_workers=1, export_engine="python", density_parquet=None, idf_parquet=None, force=False, temp_directory=None, max_temp_directory_size="250GB"):
     """Orchestrates import → covering → tile-assign → containment → export."""
     source_dir = os.path.join(output_dir, source)
     tiles_root = os.path.join(source_dir, "tiles")
@@ -213,7 +215,9 @@ def run_pipeline(source, parquet_glob, bbox, output_dir, memory_limit="48GB", ma
 
     # Export (self-gating, manages manifests + symlink + keep-2)
     stage_export(source, places_parquet, assignments_parquet, containment_dir, tiles_root,
-                 t0, export_workers=export_workers, memory_limit=memory_limit,
+                 t0, export_workers=export_workers,
+                 export_partition_workers=export_partition_workers,
+                 export_engine=export_engine, memory_limit=memory_limit,
                  temp_directory=temp_directory,
                  max_temp_directory_size=max_temp_directory_size,
                  force=force, idf_parquet=idf_parquet)
@@ -221,46 +225,6 @@ def run_pipeline(source, parquet_glob, bbox, output_dir, memory_limit="48GB", ma
     log.info("[%s] pipeline complete (%.1fs total)", source, time.monotonic() - t0)
 
 
-class BboxTooLarge(Exception):
-    pass
-
-
-class TileManifest:
-    def __init__(self, manifest_path: str, base_url: str):
-        con = duckdb.connect(manifest_path, read_only=True)
-        try:
-            rows = con.execute("SELECT DISTINCT tile_qk FROM record_tiles").fetchall()
-            self.quadkeys = set(row[0] for row in rows)
-        finally:
-            con.close()
-        self.base_url = base_url.rstrip("/")
-
-    def get_tiles_for_bbox(self, xmin, ymin, xmax, ymax, max_tiles=50):
-        # Summary tiles are keyed by quadkey length < 6 (the regular band's
-        # min_zoom); answer from the regular band first, and fall back to
-        # the summary band -- uncapped, since it is bounded by construction
-        # -- only when the regular answer exceeds max_tiles
-        # (docs/design-constraints.md).
-        bbox = (xmin, ymin, xmax, ymax)
-        regular_urls = [
-            f"{self.base_url}/{qk[:6]}/{qk}.json.gz"
-            for qk in self.quadkeys
-            if len(qk) >= 6 and bboxes_intersect(quadkey_to_bbox(qk), bbox)
-        ]
-        if len(regular_urls) <= max_tiles:
-            return regular_urls
-
-        summary_qks = [qk for qk in self.quadkeys if len(qk) < 6]
-        if summary_qks:
-            return [
-                f"{self.base_url}/{qk[:6]}/{qk}.json.gz"
-                for qk in summary_qks
-                if bboxes_intersect(quadkey_to_bbox(qk), bbox)
-            ]
-
-        raise BboxTooLarge(f"Bounding box covers more than {max_tiles} tiles")
-
-
 # ---------------------------------------------------------------------------
 # CLI subcommand helpers
 # ---------------------------------------------------------------------------
@@ -369,6 +333,12 @@ def _cmd_run(args, run_parser):
     max_temp_directory_size = args.max_temp_directory_size if args.max_temp_directory_size is not None else (
         config.get("max_temp_directory_size") if config.get("max_temp_directory_size") is not None else "250GB"
     )
+    export_partition_workers = args.export_partition_workers if args.export_partition_workers is not None else (
+        config.get("export_partition_workers") if config.get("export_partition_workers") is not None else 1
+    )
+    export_engine = args.export_engine if args.export_engine is not None else (
+        config.get("export_engine") if config.get("export_engine") is not None else "python"
+    )
     boundaries_db = args.boundaries
 
     bbox = tuple(args.bbox) if args.bbox is not None else None
@@ -393,6 +363,8 @@ def _cmd_run(args, run_parser):
         max_per_tile=max_per_tile,
         boundaries_db=boundaries_db,
         export_workers=args.export_workers,
+        export_partition_workers=export_partition_workers,
+        export_engine=export_engine,
         density_parquet=args.density_parquet,
         idf_parquet=args.idf_parquet,
         temp_directory=temp_directory,
@@ -427,6 +399,8 @@ def _cmd_all(args):
     temp_directory = config.get("temp_directory")
     max_temp_directory_size = config.get("max_temp_directory_size", "250GB")
     max_per_tile = config.get("max_per_tile", 1000)
+    export_partition_workers = config.get("export_partition_workers", 1)
+    export_engine = config.get("export_engine", "python")
     bbox_list = config.get("bbox")
     bbox = tuple(bbox_list) if bbox_list else None
     sources = config.get("sources") or {}
@@ -501,6 +475,8 @@ def _cmd_all(args):
             output_dir,
             memory_limit=memory_limit,
             max_per_tile=max_per_tile,
+            export_partition_workers=export_partition_workers,
+            export_engine=export_engine,
             density_parquet=density_parquet_path if overture_cfg else None,
             temp_directory=temp_directory,
             max_temp_directory_size=max_temp_directory_size,
@@ -531,6 +507,8 @@ def _cmd_all(args):
             memory_limit=memory_limit,
             max_per_tile=max_per_tile,
             boundaries_db=boundaries_db_path,
+            export_partition_workers=export_partition_workers,
+            export_engine=export_engine,
             density_parquet=density_parquet_path if overture_cfg else None,
             idf_parquet=idf_parquet_path,
             temp_directory=temp_directory,
@@ -651,6 +629,14 @@ def main():
                        help="Path to division boundaries DuckDB for containment enrichment")
     run_p.add_argument("--export-workers", default=None, type=int, dest="export_workers",
                        help="Number of threads for tile gzip compression")
+    run_p.add_argument("--export-partition-workers", default=None, type=int,
+                       dest="export_partition_workers",
+                       help="Export partitions to sort and group concurrently, "
+                            "each with an equal share of --memory-limit (default: 1)")
+    run_p.add_argument("--export-engine", default=None, choices=EXPORT_ENGINES,
+                       dest="export_engine",
+                       help="Compose tile payloads per record in Python, or per tile "
+                            "in DuckDB (default: python)")
     run_p.add_argument("--density-parquet", default=None, dest="density_parquet",
                        help="Path to density_tiles.parquet (input)")
     run_p.add_argument("--idf-parquet", default=None, dest="idf_parquet",
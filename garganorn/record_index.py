@@ -0,0 +1,194 @@
+"""In-memory rkey -> tile lookup for TileBackedCollection.
+
+A RecordIndex is two parallel arrays sorted by rkey hash -- 64-bit hashes
+and 32-bit tile ordinals -- plus the run's distinct tiles as packed quadints
+(garganorn.quadkey), so a lookup is a bisect with no DuckDB connection and
+no query planning. At 12 bytes a record_tiles row it trades memory for
+latency; hosts that can't spare it keep the per-thread DuckDB lookup.
+
+Hashes are not unique: a division's rkey has one entry per tile it is
+referenced from, and two rkeys can collide. lookup() therefore yields every
+candidate tile, and the caller confirms the rkey against the tile itself.
+
+stage_export also writes the same arrays to manifest.idx, a read-only
+sidecar of manifest.duckdb. RecordIndex.from_file mmaps it instead of
+copying, so every gunicorn worker serving a run shares one page-cache copy
+and startup is a single mmap call. Layout, all integers native-endian
+(little-endian on every host we deploy to):
+
+    header     8-byte magic "GGRIDX" + 2 NULs, u32 version, u32 reserved,
+               u64 tile count T, u64 record count N
+    tiles      T x u64  packed quadints, sorted (the tiles table's order)
+    hashes     N x u64  rkey hashes, sorted
+    ordinals   N x u32  index into tiles, ascending within equal hashes
+    offsets    N x u32  byte offset of the record's value in the tile's
+                        uncompressed payload
+    lengths    N x u32  byte length of that value
+
+Each section is aligned to its element size, so it casts straight to a
+memoryview.
+"""
+import bisect
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+import duckdb
+
+from garganorn.quadkey import pack_quadkey, unpack_quadkey
+
+_FETCH_BATCH = 100_000
+
+INDEX_FILENAME = "manifest.idx"
+_MAGIC = b"GGRIDX\0\0"
+_VERSION = 2
+_HEADER = struct.Struct("=8sIIQQ")
+
+
+def rkey_hash(rkey: str) -> int:
+    """64-bit rkey hash: MD5's first 8 bytes, little-endian.
+
+    Equal to DuckDB's md5_number_upper(rkey), so an index built in SQL and a
+    lookup hashed in Python agree.
+    """
+    return int.from_bytes(hashlib.md5(rkey.encode("utf-8")).digest()[:8], "little")
+
+
+def _section_offsets(n_tiles, n_records):
+    tiles_at = _HEADER.size
+    hashes_at = tiles_at + 8 * n_tiles
+    ordinals_at = hashes_at + 8 * n_records
+    offsets_at = ordinals_at + 4 * n_records
+    lengths_at = offsets_at + 4 * n_records
+    # Pad the u32 sections so the file ends 8-byte aligned too.
+    end = lengths_at + 4 * n_records
+    return tiles_at, hashes_at, ordinals_at, offsets_at, lengths_at, end + (-end % 8)
+
+
+def write_index_file(path, tiles, n_records, rows):
+    """Write manifest.idx at path, atomically via path + ".tmp".
+
+    tiles: packed quadints, sorted. rows: batches of (hash, ordinal, offset,
+    length) tuples in (hash, ordinal) order, n_records rows in all. Each
+    section is written through its own file handle, so rows stream from
+    the caller's cursor without being held in memory.
+    """
+    tiles_at, *sections, end = _section_offsets(len(tiles), n_records)
+    typecodes = ("Q", "I", "I", "I")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, 0, len(tiles), n_records))
+        f.write(array("Q", tiles).tobytes())
+        f.truncate(end)
+    written = 0
+    handles = [open(tmp_path, "r+b") for _ in sections]
+    try:
+        for f, at in zip(handles, sections):
+            f.seek(at)
+        for batch in rows:
+            for column, (f, typecode) in enumerate(zip(handles, typecodes)):
+                f.write(array(typecode, (row[column] for row in batch)).tobytes())
+            written += len(batch)
+    finally:
+        for f in handles:
+            f.close()
+    if written != n_records:
+        os.remove(tmp_path)
+        raise ValueError(f"{path}: expected {n_records} index rows, got {written}")
+    os.replace(tmp_path, path)
+
+
+class RecordIndex:
+    def __init__(self, tiles, hashes, ordinals, offsets=None, lengths=None):
+        """tiles: packed quadints, sorted; hashes: rkey hashes, sorted;
+        ordinals: ordinals[i] indexes tiles for the record hashed hashes[i];
+        offsets/lengths: the byte span of that record's value within its
+        tile's uncompressed payload, or None when unknown (an index built
+        from manifest.duckdb).
+
+        Any sequence of ints works -- arrays, or memoryviews over an mmap.
+        """
+        self._tiles = tiles
+        self._hashes = hashes
+        self._ordinals = ordinals
+        self._offsets = offsets
+        self._lengths = lengths
+
+    @classmethod
+    def from_file(cls, path: str) -> "RecordIndex":
+        """Map manifest.idx read-only. Raises FileNotFoundError if the run
+        predates the sidecar, ValueError if the file is not a usable index."""
+        if sys.byteorder != "little":
+            raise ValueError(f"{path}: index files are little-endian")
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mapped) < _HEADER.size:
+            raise ValueError(f"{path}: truncated index header")
+        magic, version, _, n_tiles, n_records = _HEADER.unpack_from(mapped)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path}: not a version {_VERSION} record index")
+        tiles_at, hashes_at, ordinals_at, offsets_at, lengths_at, end = (
+            _section_offsets(n_tiles, n_records))
+        if len(mapped) != end:
+            raise ValueError(f"{path}: size {len(mapped)} does not match header")
+        view = memoryview(mapped)
+        return cls(
+            tiles=view[tiles_at:hashes_at].cast("Q"),
+            hashes=view[hashes_at:ordinals_at].cast("Q"),
+            ordinals=view[ordinals_at:offsets_at].cast("I"),
+            offsets=view[offsets_at:lengths_at].cast("I"),
+            lengths=view[lengths_at:lengths_at + 4 * n_records].cast("I"),
+        )
+
+    @property
+    def tiles(self):
+        """The run's tiles as sorted packed quadints."""
+        return self._tiles
+
+    @classmethod
+    def from_manifest_db(cls, manifest_db_path: str) -> "RecordIndex":
+        """Build the index from manifest.duckdb's record_tiles, hashing and
+        sorting in SQL so Python only streams finished rows into arrays."""
+        tiles = array("Q")
+        hashes = array("Q")
+        ordinals = array("I")
+        con = duckdb.connect(manifest_db_path, read_only=True)
+        try:
+            cursor = con.execute(
+                "SELECT DISTINCT tile_qk FROM record_tiles ORDER BY tile_qk"
+            )
+            while batch := cursor.fetchmany(_FETCH_BATCH):
+                tiles.extend(pack_quadkey(qk) for (qk,) in batch)
+            cursor = con.execute("""
+                SELECT md5_number_upper(rkey) AS h,
+                       (dense_rank() OVER (ORDER BY tile_qk) - 1)::UINTEGER AS ordinal
+                FROM record_tiles
+                ORDER BY h, ordinal
+            """)
+            while batch := cursor.fetchmany(_FETCH_BATCH):
+                for h, ordinal in batch:
+                    hashes.append(h)
+                    ordinals.append(ordinal)
+        finally:
+            con.close()
+        return cls(tiles, hashes, ordinals)
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def lookup(self, rkey: str):
+        """Yield (quadkey, span) for every tile that may hold rkey; span is
+        the (offset, length) of the record's value in the uncompressed
+        tile, or None when the index doesn't record it."""
+        h = rkey_hash(rkey)
+        i = bisect.bisect_left(self._hashes, h)
+        while i < len(self._hashes) and self._hashes[i] == h:
+            qk = unpack_quadkey(self._tiles[self._ordinals[i]])
+            if self._offsets is None:
+                yield qk, None
+            else:
+                yield qk, (self._offsets[i], self._lengths[i])
+            i += 1
@@ -0,0 +1,125 @@
+"""Per-run Bloom filter of rkeys, so getRecord rejects unknown rkeys
+without a lookup.
+
+stage_export writes manifest.bloom next to manifest.duckdb; the server maps
+it read-only and checks it before asking any record_index engine. A "no"
+is definite, a "yes" means "look it up" (about 1% of unknown rkeys at the
+default 10 bits a key). Crawlers, typos and stale links then cost k bit
+probes instead of a DuckDB query.
+
+Bit positions use double hashing over the rkey's MD5: h1 is its first 8
+bytes, h2 its last 8, both little-endian -- DuckDB's md5_number_upper and
+md5_number_lower -- and probe i is (h1 + i * h2) mod m, so the export
+computes positions in SQL and the server in Python and they agree. Layout,
+native-endian like manifest.idx:
+
+    header   8-byte magic "GGBLOOM" + NUL, u32 version, u32 k,
+             u64 m (bits, a multiple of 64), u64 keys the filter was sized for
+    words    m / 64 x u64  bit i is word i // 64, bit i % 64
+
+Imports nothing from garganorn.
+"""
+import hashlib
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+FILTER_FILENAME = "manifest.bloom"
+BITS_PER_KEY = 10
+_MAGIC = b"GGBLOOM\0"
+_VERSION = 1
+_HEADER = struct.Struct("=8sIIQQ")
+
+
+def filter_size(n_keys: int, bits_per_key: int = BITS_PER_KEY) -> tuple[int, int]:
+    """(m, k) for n_keys: m bits rounded up to whole u64 words, and the k
+    that minimizes the false-positive rate at that density."""
+    m = max(64, -(-n_keys * bits_per_key // 64) * 64)
+    k = max(1, round(bits_per_key * math.log(2)))
+    return m, k
+
+
+def _hashes(rkey: str) -> tuple[int, int]:
+    digest = hashlib.md5(rkey.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+
+
+def filter_words_sql(rkeys_from: str, m: int, k: int) -> str:
+    """A query yielding (word, bits) rows in word order for every rkey
+    column value in the FROM item rkeys_from -- write_filter_file's input."""
+    return f"""
+        SELECT pos // 64 AS word, bit_or(1::UBIGINT << (pos % 64)::INTEGER) AS bits
+        FROM (
+            SELECT ((md5_number_upper(rkey)::HUGEINT
+                     + probe * md5_number_lower(rkey)::HUGEINT) % {m})::UBIGINT AS pos
+            FROM {rkeys_from}, range({k}) AS probes(probe)
+        )
+        GROUP BY word
+        ORDER BY word
+    """
+
+
+def write_filter_file(path, m, k, n_keys, words):
+    """Write manifest.bloom at path, atomically via path + ".tmp".
+
+    words: batches of (word_index, bits) rows in ascending word_index
+    order; words that never appear are zero. Streams, so the caller's
+    cursor is never held in memory whole.
+    """
+    n_words = m // 64
+    tmp_path = path + ".tmp"
+    next_word = 0
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, k, m, n_keys))
+        for batch in words:
+            chunk = array("Q")
+            for word, bits in batch:
+                if word > next_word:
+                    chunk.frombytes(bytes(8 * (word - next_word)))
+                chunk.append(bits)
+                next_word = word + 1
+            f.write(chunk.tobytes())
+        if next_word > n_words:
+            f.close()
+            os.remove(tmp_path)
+            raise ValueError(f"{path}: word {next_word - 1} beyond {n_words} words")
+        f.write(bytes(8 * (n_words - next_word)))
+    os.replace(tmp_path, path)
+
+
+class RkeyFilter:
+    def __init__(self, words, m, k):
+        """words: m / 64 u64 words -- an array, or a memoryview over an mmap."""
+        self._words = words
+        self._m = m
+        self._k = k
+
+    @classmethod
+    def from_file(cls, path: str) -> "RkeyFilter":
+        """Map manifest.bloom read-only. Raises FileNotFoundError if the run
+        predates it, ValueError if the file is not a usable filter."""
+        if sys.byteorder != "little":
+            raise ValueError(f"{path}: filter files are little-endian")
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mapped) < _HEADER.size:
+            raise ValueError(f"{path}: truncated filter header")
+        magic, version, k, m, _ = _HEADER.unpack_from(mapped)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path}: not a version {_VERSION} rkey filter")
+        if m == 0 or m % 64 or k == 0 or len(mapped) != _HEADER.size + m // 8:
+            raise ValueError(f"{path}: size {len(mapped)} does not match header")
+        return cls(memoryview(mapped)[_HEADER.size:].cast("Q"), m, k)
+
+    def __contains__(self, rkey: str) -> bool:
+        """False only if rkey is certainly not in the run."""
+        h1, h2 = _hashes(rkey)
+        words = self._words
+        for i in range(self._k):
+            pos = (h1 + i * h2) % self._m
+            if not (words[pos >> 6] >> (pos & 63)) & 1:
+                return False
+        return True
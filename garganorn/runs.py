@@ -0,0 +1,167 @@
+"""Tile runs as the server sees them: loading one, and swapping in the next.
+
+A run is one stage_export output directory (<tiles_root>/<stamp>/). The
+server serves exactly one run per collection, resolved through the
+collection's `current` symlink. load_run builds everything a collection
+serves from -- TileManifest, TileBackedCollection, collection.json -- for
+whichever run `current` points at, and RunWatcher re-resolves `current`
+periodically, loading a newly completed run off the request path and
+handing it to the app to swap in once it is ready.
+"""
+import json
+import logging
+import os
+import threading
+
+from garganorn.manifest import TileManifest
+from garganorn.tile_reader import (
+    DEFAULT_TILE_CACHE_BYTES,
+    TileBackedCollection,
+    load_pinned_tiles,
+)
+
+log = logging.getLogger(__name__)
+
+
+class Run:
+    """One collection's loaded tile run."""
+
+    def __init__(self, collection, run_dir, manifest, records=None, metadata=None):
+        self.collection = collection
+        self.run_dir = run_dir
+        self.stamp = os.path.basename(run_dir)
+        self.tiles_root = os.path.dirname(run_dir)
+        self.manifest = manifest
+        self.records = records
+        self.metadata = metadata
+        # {"<stamp>/<qk6>/<qk>.json.gz": (gzip bytes, plain bytes)}, the
+        # tile paths serve_tile answers from memory; filled by pin_run.
+        self.pinned = {}
+
+
+def pin_run(run, coll_cfg):
+    """Load run's pinned tiles: the whole summary band -- bounded by
+    construction, and what every oversized getCoverage falls back to --
+    plus every tile under the collection's configured pin_prefixes.
+    Only collections whose tiles this server serves get any."""
+    if run.records is None:
+        return
+    quadkeys = run.manifest.summary_tiles()
+    for prefix in coll_cfg.get("pin_prefixes", []):
+        quadkeys.extend(run.manifest.tiles_with_prefix(str(prefix)))
+    pinned = load_pinned_tiles(run.run_dir, dict.fromkeys(quadkeys))
+    run.pinned = {
+        f"{run.stamp}/{qk[:6]}/{qk}.json.gz": forms for qk, forms in pinned.items()
+    }
+    log.info("Pinned %d tiles (%d bytes) for %s", len(run.pinned),
+             sum(len(gz) + len(plain) for gz, plain in run.pinned.values()),
+             run.collection)
+
+
+def resolve_run_dir(manifest_path):
+    """The run directory manifest_path resolves to, or None unless the run
+    is complete: BOTH manifest.duckdb AND its sibling manifest.json (the
+    completeness marker, written last) must exist."""
+    if not manifest_path or not os.path.isfile(manifest_path):
+        return None
+    if not os.path.isfile(os.path.join(os.path.dirname(manifest_path), "manifest.json")):
+        return None
+    return os.path.realpath(os.path.dirname(manifest_path))
+
+
+def load_run(collection, coll_cfg, run_dir, flight=None):
+    """Build a Run for run_dir under a collection's config. flight is the
+    process's shared SingleFlight for cold tile reads, if any.
+
+    Paths inside the run are taken from run_dir itself, not from the
+    config's `current`-relative paths, so a run is pinned once resolved:
+    `current` moving mid-load cannot mix two runs.
+    """
+    manifest_path = os.path.join(run_dir, os.path.basename(coll_cfg["manifest"]))
+    stamp = os.path.basename(run_dir)
+    manifest = TileManifest(manifest_path, f"{coll_cfg.get('base_url')}/{stamp}")
+    metadata = None
+    collection_json_path = os.path.join(run_dir, "collection.json")
+    if os.path.isfile(collection_json_path):
+        with open(collection_json_path) as f:
+            metadata = json.load(f)
+    records = None
+    if "tiles_dir" in coll_cfg:
+        records = TileBackedCollection(
+            collection=collection,
+            manifest_db_path=manifest_path,
+            tiles_dir=run_dir,
+            source_url=coll_cfg.get("source", ""),
+            license_url=coll_cfg.get("license", ""),
+            record_index=coll_cfg.get("record_index", "duckdb"),
+            tile_cache_bytes=coll_cfg.get("tile_cache_bytes", DEFAULT_TILE_CACHE_BYTES),
+            flight=flight,
+        )
+    return Run(collection, run_dir, manifest, records, metadata)
+
+
+class RunWatcher:
+    """Poll each collection's `current` symlink and swap in new runs.
+
+    Loading -- the manifest, the record index, the pinned tiles, warming
+    the new tile cache from the tiles hot in the old one -- happens on this
+    thread while the old run keeps serving; only the final swap touches
+    what requests see.
+    A run that fails to load is logged and not retried until `current`
+    moves again.
+    """
+
+    def __init__(self, collections_cfg, runs, interval, install, flight=None):
+        """collections_cfg: the config's tiles.collections mapping; runs:
+        {collection: Run} as loaded at startup; interval: seconds between
+        polls; install: called with each newly loaded Run to swap it in;
+        flight: passed through to load_run."""
+        self.install = install
+        self.flight = flight
+        self.collections_cfg = collections_cfg
+        self.runs = dict(runs)
+        self.interval = interval
+        self._failed = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._loop, name="garganorn-run-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def poll(self):
+        """Check every collection once; returns the collections swapped."""
+        swapped = []
+        for collection, coll_cfg in self.collections_cfg.items():
+            run_dir = resolve_run_dir(coll_cfg.get("manifest"))
+            old = self.runs.get(collection)
+            if run_dir is None or (old is not None and old.run_dir == run_dir):
+                continue
+            if self._failed.get(collection) == run_dir:
+                continue
+            try:
+                new = load_run(collection, coll_cfg, run_dir, self.flight)
+                pin_run(new, coll_cfg)
+                if old is not None and old.records is not None and new.records is not None:
+                    new.records.warm_from(old.records)
+            except Exception:
+                log.exception("Loading run %s for %s failed; still serving %s",
+                              run_dir, collection, old.run_dir if old else "nothing")
+                self._failed[collection] = run_dir
+                continue
+            self.install(new)
+            self.runs[collection] = new
+            self._failed.pop(collection, None)
+            swapped.append(collection)
+            log.info("Now serving run %s for %s", new.stamp, collection)
+        return swapped
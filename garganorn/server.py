@@ -1,11 +1,13 @@
 """Garganorn package for serving ATProtocol XRPC for org.atgeo."""
-import json, math, time, logging
+import json, math, time, logging, threading
+from collections import OrderedDict
 from importlib.resources import files
 
 import lexrpc
 from lexrpc.base import XrpcError
 from garganorn import envelope
-from garganorn.quadtree import BboxTooLarge
+from garganorn.metrics import Counter
+from garganorn.manifest import BboxTooLarge
 
 _log = logging.getLogger(__name__)
 
@@ -32,6 +34,65 @@ def load_lexicons():
 
 LEXICON_SCHEMA_COLLECTION = "com.atproto.lexicon.schema"
 COLLECTION_METADATA_COLLECTION = "org.atgeo.collection"
+DEFAULT_COVERAGE_CACHE_ENTRIES = 4096
+
+
+class CoverageCache:
+    """LRU of getCoverage outcomes keyed by (collection, parsed bbox).
+
+    Bboxes are snapped to the 0.01° grid, so client traffic -- map
+    viewports, mostly -- repeats a bounded set of keys. Each entry holds
+    the manifest it was computed from and either the sorted URL tuple or
+    a BboxTooLarge message; an entry whose manifest is no longer the one
+    being served is a miss, so a request racing a run swap can never
+    resurrect the old run's URLs. max_entries=0 disables caching.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_COVERAGE_CACHE_ENTRIES):
+        if max_entries < 0:
+            raise ValueError(f"coverage cache size must be >= 0, got {max_entries}")
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, manifest):
+        """The cached (urls, too_large_message) for key under manifest, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] is not manifest:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, manifest, outcome):
+        if self.max_entries == 0:
+            return
+        with self._lock:
+            self._entries[key] = (manifest, outcome)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, collection):
+        """Drop every entry for collection (keys lead with it)."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == collection]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
 
 
 class Server:
@@ -42,11 +103,14 @@ class Server:
 
     def __init__(self, repo, logger, tile_manifests=None,
                  tile_collections=None, max_coverage_tiles=50,
-                 collection_metadata=None):
+                 collection_metadata=None,
+                 coverage_cache_entries=DEFAULT_COVERAGE_CACHE_ENTRIES):
         self.repo = repo
         self.tile_manifests = tile_manifests or {}
         self.tile_collections = tile_collections or {}
         self.max_coverage_tiles = max_coverage_tiles
+        self.coverage_cache = CoverageCache(coverage_cache_entries)
+        self.coverage_errors = Counter()  # by XrpcError name
         self.collection_metadata = collection_metadata or {}
         self.lexicons = load_lexicons()
         self.lexicon_map = {lex["id"]: lex for lex in self.lexicons}
@@ -57,6 +121,26 @@ class Server:
             self.server.register(name, getattr(self, method))
         self.server.register("org.atgeo.getCoverage", self.get_coverage)
         self.server.register("org.atgeo.describeGazetteer", self.describe_gazetteer)
+        self.server.register("org.atgeo.getRecords", self.get_records)
+
+    def swap_run(self, run):
+        """Serve run (a garganorn.runs.Run) for its collection from now on.
+
+        Each map entry is replaced with a single assignment, so a request
+        sees either the old run's object or the new one's, never a mix
+        within one lookup. The old run's objects -- and with them its tile
+        cache -- are dropped once in-flight requests release them, and its
+        cached getCoverage outcomes right away.
+        """
+        collection = run.collection
+        self.tile_manifests[collection] = run.manifest
+        self.coverage_cache.invalidate(collection)
+        if run.records is not None:
+            self.tile_collections[collection] = run.records
+        if run.metadata is not None:
+            self.collection_metadata[collection] = run.metadata
+        else:
+            self.collection_metadata.pop(collection, None)
 
     def record_uri(self, collection, rkey):
         return envelope.record_uri(self.repo, collection, rkey)
@@ -116,6 +200,45 @@ class Server:
             }
         }
 
+    def get_records(self, _, collection: str, rkeys: list):
+        """Batch getRecord over one tile-backed collection: one entry per
+        rkey, in request order, each either the record as getRecord would
+        return it (less source and license, given once at the top level)
+        or {"rkey", "notFound": true}. A repeated rkey repeats its entry.
+
+        The lexicon caps rkeys at 100; lexrpc rejects longer lists before
+        this runs.
+        """
+        start_time = time.perf_counter()
+        source = self.tile_collections.get(collection)
+        if source is None:
+            raise XrpcError(f"Collection {collection} not found on server {self.repo}", "CollectionNotFound")
+        found = source.get_records(self.repo, collection, rkeys)
+        entries = {}
+        for rkey in rkeys:
+            if rkey in entries:
+                continue
+            record = found.get(rkey)
+            if record is None:
+                entries[rkey] = {"rkey": rkey, "notFound": True}
+                continue
+            entries[rkey] = {
+                "rkey": rkey,
+                "uri": self.record_uri(collection, record["rkey"]),
+                **({"importance": record.pop("importance")} if "importance" in record else {}),
+                "value": record,
+            }
+        run_time = int((time.perf_counter() - start_time) * 1000)
+        return {
+            "source": source.source_url,
+            "license": source.license_url,
+            "records": [entries[rkey] for rkey in rkeys],
+            "_query": {
+                "parameters": {"collection": collection, "rkeys": rkeys},
+                "elapsed_ms": run_time,
+            },
+        }
+
     def describe_gazetteer(self, _):
         """Enumerate served collections. The list is tile_manifests' keys --
         the same map get_coverage consults for CollectionNotFound (R1)."""
@@ -182,15 +305,32 @@ class Server:
         Raises BboxTooPrecise if any coordinate exceeds 2 decimal places,
         BboxTooLarge if the bbox spans more tiles than max_coverage_tiles,
         CollectionNotFound if collection has no tile manifest, or InvalidBbox
-        if the bbox string is malformed.
+        if the bbox string is malformed. Both outcomes of the tile walk are
+        cached per (collection, bbox) in coverage_cache; every error is
+        counted in coverage_errors by name.
         """
+        try:
+            return self._get_coverage(collection, bbox)
+        except XrpcError as e:
+            self.coverage_errors.inc(error=e.name)
+            raise
+
+    def _get_coverage(self, collection, bbox):
         self._check_bbox_precision(bbox)
         parsed_bbox = self._parse_bbox(bbox)
         manifest = self.tile_manifests.get(collection)
         if manifest is None:
             raise XrpcError(f"Unknown collection: {collection}", "CollectionNotFound")
-        try:
-            tiles = manifest.get_tiles_for_bbox(*parsed_bbox, max_tiles=self.max_coverage_tiles)
-        except BboxTooLarge as e:
-            raise XrpcError(str(e), "BboxTooLarge") from e
-        return {"tiles": sorted(tiles)}
+        key = (collection, parsed_bbox)
+        outcome = self.coverage_cache.get(key, manifest)
+        if outcome is None:
+            try:
+                tiles = manifest.get_tiles_for_bbox(*parsed_bbox, max_tiles=self.max_coverage_tiles)
+                outcome = (tuple(sorted(tiles)), None)
+            except BboxTooLarge as e:
+                outcome = (None, str(e))
+            self.coverage_cache.put(key, manifest, outcome)
+        tiles, too_large = outcome
+        if too_large is not None:
+            raise XrpcError(too_large, "BboxTooLarge")
+        return {"tiles": list(tiles)}
@@ -10,10 +10,28 @@
 -- Substitution params: ${repo}
 -- Addresses are rendered inline via list_transform/list_filter — no pre-materialization.
 
-CREATE OR REPLACE VIEW tile_export AS
+-- Each distinct (place, containment) pair is rendered once, into the
+-- export_records staging table, and tile_export fans that JSON out to every
+-- tile row referencing it by (place_id, relations_key) -- rather than
+-- re-rendering the record per tile. relations_key is the containment JSON's
+-- MD5, so the fan-out join never hashes the JSON itself.
+-- A place in the z1-z5 summary band is referenced twice, from its own tile
+-- and its summary tile.
+CREATE OR REPLACE VIEW export_refs AS
 SELECT
     ta.tile_qk,
     ta.place_id,
+    coalesce(pc.relations_json, '{}') AS relations_json,
+    md5_number(coalesce(pc.relations_json, '{}')) AS relations_key
+FROM tile_assignments ta
+-- Keyed on (place_id, tile_qk): a place can carry two tile_assignments rows
+-- (its own band and the z1-z5 summary band), each with its own containment row.
+LEFT JOIN place_containment pc ON pc.place_id = ta.place_id AND pc.tile_qk = ta.tile_qk;
+
+CREATE OR REPLACE TEMP TABLE export_records AS
+SELECT
+    r.place_id,
+    r.relations_key,
     p.id AS rkey,
     to_json({
         "$type": 'org.atgeo.place',
@@ -64,11 +82,17 @@ SELECT
             version: p.version,
             sources: p.sources
         })),
-        relations: coalesce(pc.relations_json::JSON, '{}'::JSON)
+        relations: r.relations_json::JSON
     })::VARCHAR AS record_json
-FROM places p
-JOIN tile_assignments ta ON ta.place_id = p.id
--- Keyed on (place_id, tile_qk): a place can carry two tile_assignments rows
--- (its own band and the z1-z5 summary band), each with its own containment row.
-LEFT JOIN place_containment pc ON pc.place_id = p.id AND pc.tile_qk = ta.tile_qk;
+FROM (
+    SELECT place_id, relations_key, any_value(relations_json) AS relations_json
+    FROM export_refs
+    GROUP BY place_id, relations_key
+) r
+JOIN places p ON p.id = r.place_id;
+
+CREATE OR REPLACE VIEW tile_export AS
+SELECT ref.tile_qk, ref.place_id, rec.rkey, rec.record_json
+FROM export_refs ref
+JOIN export_records rec USING (place_id, relations_key);
 -- No ORDER BY: stage_export sorts per partition (pass 2), not here.
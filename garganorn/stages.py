@@ -5,17 +5,19 @@ exists because stages.py must not import from quadtree.py (circular import risk)
 and quadtree.py imports from stages.py.
 Consider consolidating in a future refactor.
 """
+import csv
 import glob as glob_module
 import gzip
 import itertools
 import json
 import logging
-import math
 import os
+import queue
 import re
 import shutil
 import string
 import time
+from array import array
 from collections import deque
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
@@ -26,6 +28,14 @@ import duckdb
 from garganorn import envelope
 from garganorn.database import OverturePlaces, OpenStreetMap, OvertureDivisions
 from garganorn.levels import LEVEL_VOCAB, level_case_sql
+from garganorn.quadkey import bboxes_intersect, pack_quadkey, quadkey_to_bbox  # noqa: F401 -- re-exported
+from garganorn.record_index import INDEX_FILENAME, write_index_file
+from garganorn.rkey_filter import (
+    FILTER_FILENAME,
+    filter_size,
+    filter_words_sql,
+    write_filter_file,
+)
 
 log = logging.getLogger(__name__)
 
@@ -37,9 +47,35 @@ _SOURCES = {
 REPO = "places.atgeo.org"
 _SQL_DIR = Path(__file__).parent / "sql"
 
+# How pass 2 composes tile payloads: "python" wraps and joins each record in
+# flush_tile; "duckdb" has the partition query string_agg the wrapped
+# records per tile, so Python only gzips and writes. Byte-identical output.
+EXPORT_ENGINES = ("python", "duckdb")
+
 # Compiled pattern for timestamp directory names produced by run_pipeline / stage_export.
 _TIMESTAMP_RE = re.compile(r"^\d{8}T\d{6}$")
 
+# DuckDB's size units: K/M/G/T are decimal with or without the B, KiB..TiB
+# binary, and bare numbers bytes.
+_SIZE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(b|bytes|k|kb|m|mb|g|gb|t|tb|kib|mib|gib|tib)?\s*$",
+                      re.IGNORECASE)
+_SIZE_UNITS = {
+    "b": 1, "bytes": 1,
+    "k": 10**3, "kb": 10**3, "m": 10**6, "mb": 10**6,
+    "g": 10**9, "gb": 10**9, "t": 10**12, "tb": 10**12,
+    "kib": 2**10, "mib": 2**20, "gib": 2**30, "tib": 2**40,
+}
+
+
+def _split_size(size: str, parts: int) -> str:
+    """A DuckDB size string (memory_limit, max_temp_directory_size) divided
+    into `parts` equal shares, as a byte count DuckDB accepts."""
+    m = _SIZE_RE.match(size)
+    if m is None:
+        raise ValueError(f"unrecognised DuckDB size {size!r}")
+    total = float(m.group(1)) * _SIZE_UNITS[(m.group(2) or "b").lower()]
+    return f"{int(total // parts)}B"
+
 
 def _is_output_fresh(output_path: str, input_paths: list[str]) -> bool:
     """True if output exists and is strictly newer than all inputs.
@@ -741,6 +777,7 @@ def stage_division_containment(
 
 def write_manifest_db(tile_assignments_parquet: str, output_dir: str, source: str,
                       *, generated_at: str = None,
+                      tiles: dict | None = None,
                       temp_directory: str | None = None,
                       max_temp_directory_size: str | None = "250GB") -> None:
     """Write manifest.duckdb from a tile_assignments parquet file.
@@ -759,6 +796,14 @@ def write_manifest_db(tile_assignments_parquet: str, output_dir: str, source: st
         generated_at: RFC 3339 Z run-scoped timestamp shared with the tiles and
             manifest.json. Defaults to the current time if omitted
             (test callers that don't thread a run timestamp).
+        tiles: {tile_qk: (record_count, compressed_bytes, uncompressed_bytes,
+            digest)} for every tile written, as stage_export collects it
+            while flushing; digest is envelope.tile_digest's, which the next
+            export compares to reuse unchanged tiles. Persisted as the
+            `tiles` table, sorted by tile_qk, so the server loads one row per
+            tile rather than running SELECT DISTINCT over record_tiles. When
+            omitted, record counts are derived from tile_assignments_parquet
+            and byte sizes and digests are NULL.
         temp_directory: DuckDB temp_directory for spill (optional). Callers
             reached via stage_export should pass its own temp_directory so
             the manifest step spills where the export did.
@@ -771,6 +816,7 @@ def write_manifest_db(tile_assignments_parquet: str, output_dir: str, source: st
     source_cls = _SOURCES[source]
     manifest_path = os.path.join(output_dir, "manifest.duckdb")
     tmp_path = manifest_path + ".tmp"
+    tiles_csv = manifest_path + ".tiles.csv"
     if os.path.exists(tmp_path):
         os.remove(tmp_path)
     con = duckdb.connect()
@@ -800,6 +846,33 @@ def write_manifest_db(tile_assignments_parquet: str, output_dir: str, source: st
                 FROM read_parquet('{tile_assignments_parquet}')
                 ORDER BY place_id
             """)
+        if tiles is None:
+            con.execute(f"""
+                CREATE TABLE manifest.tiles AS
+                SELECT tile_qk, count(*) AS record_count,
+                       NULL::BIGINT AS compressed_bytes,
+                       NULL::BIGINT AS uncompressed_bytes,
+                       NULL::VARCHAR AS digest
+                FROM read_parquet('{tile_assignments_parquet}')
+                GROUP BY tile_qk
+                ORDER BY tile_qk
+            """)
+        else:
+            # Staged through CSV: DuckDB reads it natively, where binding
+            # millions of Python values as parameters crawls.
+            with open(tiles_csv, "w", newline="") as f:
+                writer = csv.writer(f)
+                for qk, (count, compressed, uncompressed, digest) in tiles.items():
+                    writer.writerow((qk, count, compressed, uncompressed, digest))
+            con.execute(f"""
+                CREATE TABLE manifest.tiles AS
+                SELECT * FROM read_csv('{tiles_csv}', header = false, columns = {{
+                    'tile_qk': 'VARCHAR', 'record_count': 'BIGINT',
+                    'compressed_bytes': 'BIGINT', 'uncompressed_bytes': 'BIGINT',
+                    'digest': 'VARCHAR'
+                }})
+                ORDER BY tile_qk
+            """)
         con.execute("""
             CREATE TABLE manifest.metadata AS
             SELECT ? AS source, ? AS collection, ? AS generated_at
@@ -807,9 +880,36 @@ def write_manifest_db(tile_assignments_parquet: str, output_dir: str, source: st
         con.execute("DETACH manifest")
     finally:
         con.close()
+        if os.path.exists(tiles_csv):
+            os.remove(tiles_csv)
     os.rename(tmp_path, manifest_path)
 
 
+def load_tile_digests(run_dir) -> dict:
+    """{tile_qk: (digest, compressed_bytes, uncompressed_bytes)} from a
+    complete run's manifest.duckdb -- what stage_export needs to reuse that
+    run's unchanged tiles. Empty when run_dir is incomplete or predates
+    digests, so the export then writes every tile."""
+    manifest_path = os.path.join(run_dir, "manifest.duckdb")
+    if not (os.path.exists(os.path.join(run_dir, "manifest.json"))
+            and os.path.exists(manifest_path)):
+        return {}
+    con = duckdb.connect(manifest_path, read_only=True)
+    try:
+        columns = {name for (name,) in con.execute(
+            "SELECT column_name FROM information_schema.columns WHERE table_name = 'tiles'"
+        ).fetchall()}
+        if "digest" not in columns:
+            return {}
+        rows = con.execute(
+            "SELECT tile_qk, digest, compressed_bytes, uncompressed_bytes "
+            "FROM tiles WHERE digest IS NOT NULL"
+        ).fetchall()
+    finally:
+        con.close()
+    return {qk: (digest, compressed, uncompressed) for qk, digest, compressed, uncompressed in rows}
+
+
 def write_manifest(output_dir, *, generated_at):
     """Write manifest.json as the run's completeness marker.
 
@@ -833,8 +933,8 @@ def write_collection_json(run_dir, source, source_cls, *, generated_at, manifest
 
     places_pq and containment_expr are the same SQL-ready strings stage_export
     already built for the tile export query -- reused here rather than
-    re-escaped or re-derived. attribute_fields is the tile_export attributes
-    struct field set captured earlier on the export connection (overture_place,
+    re-escaped or re-derived. attribute_fields is the rendered records'
+    attributes struct field set captured earlier on the export connection (overture_place,
     overture_division) or None (osm, computed here from places.parquet's tags).
     """
     if not manifest:
@@ -942,54 +1042,6 @@ def write_collection_json(run_dir, source, source_cls, *, generated_at, manifest
     os.replace(tmp_path, collection_path)
 
 
-def quadkey_to_bbox(quadkey: str) -> tuple[float, float, float, float]:
-    x, y, level = 0, 0, len(quadkey)
-    for i, ch in enumerate(quadkey):
-        bit = level - i - 1
-        mask = 1 << bit
-        digit = int(ch)
-        if digit & 1:
-            x |= mask
-        if digit & 2:
-            y |= mask
-    n = 2 ** level
-    lon_min = x / n * 360 - 180
-    lon_max = (x + 1) / n * 360 - 180
-    lat_max = 90.0 if y == 0 else math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
-    lat_min = -90.0 if y == n - 1 else math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
-    return (lon_min, lat_min, lon_max, lat_max)
-
-
-def bboxes_intersect(a, b):
-    """Check if two bboxes intersect, handling antimeridian crossing.
-
-    For antimeridian-crossing bboxes (xmin > xmax), the bbox wraps around the
-    ±180° meridian. This function detects crossing and computes intersection
-    correctly for all combinations of normal and crossing bboxes.
-    """
-    a_crosses = a[0] > a[2]  # xmin > xmax indicates antimeridian crossing
-    b_crosses = b[0] > b[2]
-
-    # Latitude check is always the same (no wrapping in latitude)
-    if a[1] > b[3] or a[3] < b[1]:
-        return False
-
-    if not a_crosses and not b_crosses:
-        # Normal case: neither box crosses the antimeridian
-        return a[0] <= b[2] and a[2] >= b[0]
-
-    if a_crosses and not b_crosses:
-        # a wraps around: check if b overlaps the western or eastern part of a
-        return a[2] >= b[0] or a[0] <= b[2]
-
-    if not a_crosses and b_crosses:
-        # b wraps around: check if a overlaps the western or eastern part of b
-        return b[2] >= a[0] or b[0] <= a[2]
-
-    # Both wrap: they must overlap (both span the antimeridian)
-    return True
-
-
 # Geometry column name per source, excluded from Parquet output.
 # overture_place is None: overture_place_import.sql drops geometry inside
 # ov_base (before any join/materialization), so `places` never carries it —
@@ -2067,6 +2119,8 @@ def stage_export(source: str, places_parquet: str, tile_assignments_parquet: str
                  containment_dir: str, tiles_root: str, t0: float,
                  export_workers: int = None,
                  export_partition_zoom: int = 6,
+                 export_partition_workers: int = 1,
+                 export_engine: str = "python",
                  memory_limit: str = "48GB",
                  temp_directory: str | None = None,
                  max_temp_directory_size: str | None = "250GB",
@@ -2077,7 +2131,11 @@ def stage_export(source: str, places_parquet: str, tile_assignments_parquet: str
 
     Reads places and tile_assignments from parquet artifacts. Builds a
     timestamped run dir under tiles_root with per-tile .json.gz files,
-    manifest.duckdb, and manifest.json. Updates tiles_root/current symlink.
+    manifest.duckdb, its manifest.idx sidecar, and manifest.json. Updates tiles_root/current symlink.
+
+    Tiles whose content (envelope.tile_digest) matches the tile in the run
+    `current` pointed at are hardlinked from that run rather than
+    recompressed, so a routine rebuild writes roughly what changed.
 
     Args:
         source: Source key (overture_place, osm, overture_division).
@@ -2093,6 +2151,18 @@ def stage_export(source: str, places_parquet: str, tile_assignments_parquet: str
             one partition at a time). Default 6, matching the qk[:6] output
             subdirectory grain (zoom 6-17, plus the summary band's short
             keys). Not exposed via run_pipeline, the CLI, or config.yaml.
+        export_partition_workers: Partitions pass 2 sorts and groups
+            concurrently, each on its own DuckDB connection with 1/K of
+            memory_limit, max_temp_directory_size and the CPU threads, all
+            feeding the one export_workers gzip pool. Default 1: pass 2 runs
+            on the pass-1 connection with the whole budget.
+        export_engine: One of EXPORT_ENGINES. "duckdb" builds each tile's
+            records array in the partition query (string_agg over
+            envelope.wrap_record_sql, ordered by place_id) and hands flush
+            one ready byte string per tile instead of a tuple per record.
+            Default "python". Both produce byte-identical tiles;
+            scripts/tile_parity.py diff --bytes checks two runs against
+            each other.
         memory_limit: DuckDB memory_limit string. Default "48GB".
         temp_directory: optional caller-supplied spill directory, same contract
             as stage_covering's temp_directory (garganorn/covering.py):
@@ -2125,6 +2195,9 @@ def stage_export(source: str, places_parquet: str, tile_assignments_parquet: str
     Returns:
         str: Path to the run directory created (or existing if fresh and not forced).
     """
+    if export_engine not in EXPORT_ENGINES:
+        raise ValueError(f"export_engine must be one of {EXPORT_ENGINES}, got {export_engine!r}")
+
     # Step 1: Freshness gate — key on tiles_root/current/manifest.json
     current_link = os.path.join(tiles_root, "current")
     current_manifest = os.path.join(current_link, "manifest.json")
@@ -2193,8 +2266,8 @@ def stage_export(source: str, places_parquet: str, tile_assignments_parquet: str
     # Apply ${repo} substitution first (safe_substitute leaves unknown ${...} intact)
     sql = string.Template(raw).safe_substitute(repo=REPO)
     # Replace bare table references with read_parquet expressions
-    sql = sql.replace("FROM places p", f"FROM read_parquet('{places_pq}') p")
-    sql = sql.replace("JOIN tile_assignments ta", f"JOIN read_parquet('{ta_pq}') ta")
+    sql = sql.replace("JOIN places p", f"JOIN read_parquet('{places_pq}') p")
+    sql = sql.replace("FROM tile_assignments ta", f"FROM read_parquet('{ta_pq}') ta")
     sql = sql.replace("LEFT JOIN place_containment pc", f"LEFT JOIN {containment_expr} pc")
 
     # Step 5: Open ephemeral in-memory connection and execute the substituted SQL
@@ -2205,6 +2278,7 @@ def stage_export(source: str, places_parquet: str, tile_assignments_parquet: str
         spill_dir = os.path.join(temp_directory, "export.spill")
         staging_dir = os.path.join(temp_directory, "export.staging")
     con = duckdb.connect()
+    worker_cons = []
     manifest = {}
     try:
         # spill_dir/staging_dir names are fixed (not per-run), so residue
@@ -2227,35 +2301,35 @@ def stage_export(source: str, places_parquet: str, tile_assignments_parquet: str
         con.execute(sql)
         con.execute("SET enable_progress_bar = false")
 
-        # collection.json's `attributes` field: the tile_export view's
-        # attributes struct field names, captured now because the view only
-        # lives on this connection. Both overture_place and
-        # overture_division wrap attributes in strip_json_nulls, which
+        # collection.json's `attributes` field: the rendered records'
+        # attributes struct field names, captured now because
+        # export_records only lives on this connection. It holds every
+        # distinct record tile_export fans out, already rendered, so this
+        # reads JSON rather than rendering it again. Both overture_place
+        # and overture_division wrap attributes in strip_json_nulls, which
         # drops a key wherever that row's value is null, so only the union
         # over every row recovers the full set.
         if source in ("overture_place", "overture_division"):
             rows = con.execute(
-                "SELECT DISTINCT UNNEST(json_keys(record_json, '$.attributes')) AS k FROM tile_export"
+                "SELECT DISTINCT UNNEST(json_keys(record_json, '$.attributes')) AS k "
+                "FROM export_records"
             ).fetchall()
             attribute_fields = {r[0] for r in rows}
         else:
             attribute_fields = None
 
-        # Count tiles for logging (from parquet, not table)
-        tile_count = con.execute(
-            f"SELECT COUNT(DISTINCT tile_qk) FROM read_parquet('{ta_pq}')"
-        ).fetchone()[0]
-        log.info("[%s] export: %d tiles to write", source, tile_count)
-
         # Step 6: Pass 1 -- materialise tile_export unsorted, partitioned by
         # tile_qk prefix. No ORDER BY: the join streams straight to each
         # partition's writer, so peak spill is bounded by one partition, not
         # the whole dataset.
-        con.execute(
+        (staged_rows,) = con.execute(
             f"COPY (SELECT tile_qk, place_id, rkey, record_json, "
             f"left(tile_qk, {export_partition_zoom}) AS pfx FROM tile_export) "
             f"TO '{staging_dir}' (FORMAT PARQUET, COMPRESSION ZSTD, PARTITION_BY (pfx))"
-        )
+        ).fetchone()
+        # Everything pass 2 needs is staged; free the rendered records
+        # before the partition sorts want the memory.
+        con.execute("DROP TABLE export_records")
 
         # Partitions are enumerated by listing staging_dir, not by
         # synthesising a 4^d prefix list: pass 1 only creates a directory
@@ -2265,11 +2339,25 @@ def stage_export(source: str, places_parquet: str, tile_assignments_parquet: str
             entry[len("pfx="):] for entry in os.listdir(staging_dir)
             if entry.startswith("pfx=")
         )
+        log.info("[%s] export: staged %d records in %d partitions",
+                 source, staged_rows, len(partition_prefixes))
 
         source_cls = _SOURCES[source]
 
+        # Incremental export: the run `current` pointed at when this export
+        # started is the one unchanged tiles are reused from.
+        previous_dir = os.path.join(tiles_root, current_target) if current_target else None
+        previous_tiles = {}
+        if previous_dir is not None and os.path.realpath(previous_dir) != os.path.realpath(run_dir):
+            previous_tiles = load_tile_digests(previous_dir)
+            log.info("[%s] export: %d tiles in previous run %s to reuse from",
+                     source, len(previous_tiles), current_target)
+
+        header = envelope.tile_header(source_cls.collection, source_cls.source_url,
+                                      source_cls.license_url, generated_at)
+
         def flush_tile(qk, records):
-            """Compress and write one tile's records to disk.
+            """Compose one tile's payload from its records, then write it.
 
             records are (rkey, record_json) pairs; record_json is a DuckDB
             to_json()::VARCHAR string. wrap_record composes the {uri, cid,
@@ -2286,31 +2374,123 @@ def stage_export(source: str, places_parquet: str, tile_assignments_parquet: str
                 source_cls.collection, source_cls.source_url, source_cls.license_url,
                 generated_at, wrapped
             )
+            spans = envelope.record_value_spans(
+                payload, wrapped, [record_json for _, record_json in records])
+            return write_tile(qk, len(records), payload, spans)
+
+        def flush_joined_tile(qk, joined_records, wrapped_lens, value_lens):
+            """Write one tile whose records the duckdb engine already
+            wrapped and comma-joined, given each one's UTF-8 byte lengths."""
+            payload = envelope.compose_tile_payload(header, joined_records)
+            spans = envelope.value_spans(len(payload), wrapped_lens, value_lens)
+            return write_tile(qk, len(value_lens), payload, spans)
+
+        def write_tile(qk, count, payload, spans):
+            """Compress and write one tile's payload to disk.
+
+            When the previous run holds this tile with the same digest and
+            payload length, its file is hardlinked instead of compressed
+            and written. The reused file keeps the generated_at of the run
+            that first wrote it, and since generated_at has a fixed width,
+            the value spans are the same in both files.
+            """
+            digest = envelope.tile_digest(payload)
             subdir = os.path.join(run_dir, qk[:6])
             os.makedirs(subdir, exist_ok=True)
+            tile_path = os.path.join(subdir, f"{qk}.json.gz")
+            previous = previous_tiles.get(qk)
+            if previous is not None and previous[0] == digest and previous[2] == len(payload):
+                try:
+                    os.link(os.path.join(previous_dir, qk[:6], f"{qk}.json.gz"), tile_path)
+                except OSError:
+                    pass  # gone, or another filesystem: write it afresh
+                else:
+                    return (qk, count, previous[1], len(payload), digest, spans, True)
             compressed = gzip.compress(payload, mtime=0)
-            with open(os.path.join(subdir, f"{qk}.json.gz"), "wb") as f:
+            with open(tile_path, "wb") as f:
                 f.write(compressed)
-            return (qk, len(records))
+            return (qk, count, len(compressed), len(payload), digest, spans, False)
 
-        futures = deque()
         max_inflight = 2 * (export_workers or os.cpu_count() or 4)
 
-        def _drain_oldest():
-            qk, count = futures.popleft().result()
-            manifest[qk] = count
-            if len(manifest) % 1000 == 0:
-                log.info("[%s] export: wrote %d tiles", source, len(manifest))
+        # Every record's value span, flattened in tile order (results are
+        # recorded in partition, then submission order), for manifest.idx below.
+        value_offsets = array("I")
+        value_lengths = array("I")
+
+        reused = [0, 0]  # tiles, compressed bytes
+
+        # Pass 2 runs up to export_partition_workers partitions at once. One
+        # worker reuses con; more each get a connection of their own, with
+        # an equal share of the budget so K concurrent sorts together stay
+        # within memory_limit.
+        partition_workers = max(1, min(export_partition_workers, len(partition_prefixes)))
+        connections = queue.SimpleQueue()
+        if partition_workers == 1:
+            connections.put(con)
+        else:
+            worker_memory = _split_size(memory_limit, partition_workers)
+            worker_threads = max(1, (os.cpu_count() or 1) // partition_workers)
+            for i in range(partition_workers):
+                worker_spill = os.path.join(spill_dir, f"worker{i}")
+                os.makedirs(worker_spill, exist_ok=True)
+                worker_con = duckdb.connect()
+                worker_cons.append(worker_con)
+                worker_con.execute(f"SET temp_directory = '{worker_spill}'")
+                if max_temp_directory_size:
+                    worker_con.execute("SET max_temp_directory_size = "
+                                       f"'{_split_size(max_temp_directory_size, partition_workers)}'")
+                worker_con.execute(f"SET memory_limit = '{worker_memory}'")
+                worker_con.execute(f"SET threads = {worker_threads}")
+                worker_con.execute("SET enable_progress_bar = false")
+                connections.put(worker_con)
+            log.info("[%s] export: pass 2 over %d partitions, %d at a time (%s, %d threads each)",
+                     source, len(partition_prefixes), partition_workers,
+                     worker_memory, worker_threads)
+
+        # Each partition keeps at most its share of max_inflight tiles
+        # queued for the gzip pool.
+        partition_inflight = max(2, max_inflight // partition_workers)
+
+        def export_partition(p):
+            """Sort partition p and submit its tiles to executor in tile
+            order. Returns (finished results, futures still in flight), both
+            in tile order."""
+            pcon = connections.get()
+            try:
+                finished = []
+                pending = deque()
+
+                def submit(flush, *args):
+                    if len(pending) >= partition_inflight:
+                        finished.append(pending.popleft().result())
+                    pending.append(executor.submit(flush, *args))
+
+                if export_engine == "duckdb":
+                    cursor = pcon.execute(f"""
+                        SELECT tile_qk,
+                               encode(string_agg(wrapped, ',' ORDER BY place_id)),
+                               list(strlen(wrapped) ORDER BY place_id),
+                               list(strlen(record_json) ORDER BY place_id)
+                        FROM (
+                            SELECT tile_qk, place_id, record_json,
+                                   {envelope.wrap_record_sql(REPO, source_cls.collection,
+                                                             "rkey", "record_json")} AS wrapped
+                            FROM read_parquet('{staging_dir}/pfx={p}/*.parquet')
+                        )
+                        GROUP BY tile_qk
+                        ORDER BY tile_qk
+                    """)
+                    for batch in iter(lambda: cursor.fetchmany(64), []):
+                        for row in batch:
+                            submit(flush_joined_tile, *row)
+                    return finished, pending
 
-        with ThreadPoolExecutor(max_workers=export_workers) as executor:
-            # Pass 2: sort and flush one partition at a time.
-            for p in partition_prefixes:
-                cursor = con.execute(
+                cursor = pcon.execute(
                     f"SELECT tile_qk, place_id, rkey, record_json "
                     f"FROM read_parquet('{staging_dir}/pfx={p}/*.parquet') "
                     f"ORDER BY tile_qk, place_id"
                 )
-                # Must reset per partition, or the previous partition's last tile gets flushed twice.
                 current_qk = None
                 accumulated = []
                 while True:
@@ -2320,32 +2500,109 @@ def stage_export(source: str, places_parquet: str, tile_assignments_parquet: str
                     for tile_qk, place_id, rkey, record_json in batch:
                         if tile_qk != current_qk:
                             if current_qk is not None:
-                                if len(futures) >= max_inflight:
-                                    _drain_oldest()
-                                futures.append(executor.submit(flush_tile, current_qk, accumulated))
+                                submit(flush_tile, current_qk, accumulated)
                             current_qk = tile_qk
                             accumulated = []
                         accumulated.append((rkey, record_json))
 
                 if current_qk is not None:
-                    futures.append(executor.submit(flush_tile, current_qk, accumulated))
+                    submit(flush_tile, current_qk, accumulated)
+                return finished, pending
+            finally:
+                connections.put(pcon)
+
+        def _record(result):
+            qk, count, compressed_bytes, uncompressed_bytes, digest, spans, linked = result
+            manifest[qk] = (count, compressed_bytes, uncompressed_bytes, digest)
+            if linked:
+                reused[0] += 1
+                reused[1] += compressed_bytes
+            for offset, length in spans:
+                value_offsets.append(offset)
+                value_lengths.append(length)
+            if len(manifest) % 1000 == 0:
+                log.info("[%s] export: wrote %d tiles", source, len(manifest))
 
-            while futures:
-                _drain_oldest()
+        with ThreadPoolExecutor(max_workers=export_workers) as executor, \
+                ThreadPoolExecutor(max_workers=partition_workers) as partition_pool:
+            # Partitions finish out of order but are recorded in order, so
+            # manifest and the value spans stay in tile order. Submitting
+            # at most 2K ahead of the one being recorded bounds how many
+            # finished partitions wait in memory.
+            remaining = iter(partition_prefixes)
+            partitions = deque(
+                partition_pool.submit(export_partition, p)
+                for p in itertools.islice(remaining, 2 * partition_workers))
+            while partitions:
+                finished, pending = partitions.popleft().result()
+                for p in itertools.islice(remaining, 1):
+                    partitions.append(partition_pool.submit(export_partition, p))
+                for result in finished:
+                    _record(result)
+                while pending:
+                    _record(pending.popleft().result())
+
+        # manifest.idx: the serving-side rkey index (garganorn.record_index),
+        # derived from the staged rows pass 2 just flushed. Ordinals and
+        # in-tile positions follow pass 2's own ORDER BY tile_qk, place_id,
+        # and manifest's insertion order is the sorted tile order, so
+        # tile_starts[ordinal] + position finds a record's value span. The sidecar
+        # is an optional accelerator, so tile keys that don't pack (only
+        # synthetic fixtures produce them) skip it rather than fail the
+        # export; the server then falls back to manifest.duckdb.
+        try:
+            packed_tiles = array("Q", map(pack_quadkey, manifest))
+        except ValueError as e:
+            log.warning("[%s] export: not writing %s: %s", source, INDEX_FILENAME, e)
+        else:
+            tile_starts = array("Q", [0])
+            for count, *_ in manifest.values():
+                tile_starts.append(tile_starts[-1] + count)
+            rows = []
+            if partition_prefixes:
+                cursor = con.execute(f"""
+                    SELECT md5_number_upper(rkey) AS h,
+                           (dense_rank() OVER (ORDER BY tile_qk) - 1)::UINTEGER AS ordinal,
+                           (row_number() OVER (PARTITION BY tile_qk ORDER BY place_id) - 1)::UINTEGER
+                    FROM read_parquet('{staging_dir}/pfx=*/*.parquet')
+                    ORDER BY h, ordinal
+                """)
+                rows = (
+                    [(h, ordinal, value_offsets[tile_starts[ordinal] + position],
+                      value_lengths[tile_starts[ordinal] + position])
+                     for h, ordinal, position in batch]
+                    for batch in iter(lambda: cursor.fetchmany(100_000), [])
+                )
+            write_index_file(os.path.join(run_dir, INDEX_FILENAME),
+                             packed_tiles, len(value_offsets), rows)
+
+        # manifest.bloom: every staged rkey in garganorn.rkey_filter's Bloom
+        # filter, its bits OR-ed together per u64 word in SQL so Python only
+        # streams finished words. A division's repeated rkey sets the same bits.
+        filter_m, filter_k = filter_size(len(value_offsets))
+        words = []
+        if partition_prefixes:
+            cursor = con.execute(filter_words_sql(
+                f"read_parquet('{staging_dir}/pfx=*/*.parquet')", filter_m, filter_k))
+            words = iter(lambda: cursor.fetchmany(100_000), [])
+        write_filter_file(os.path.join(run_dir, FILTER_FILENAME),
+                          filter_m, filter_k, len(value_offsets), words)
 
     finally:
+        for worker_con in worker_cons:
+            worker_con.close()
         con.close()
         if os.path.exists(spill_dir):
             shutil.rmtree(spill_dir, ignore_errors=True)
         if os.path.exists(staging_dir):
             shutil.rmtree(staging_dir, ignore_errors=True)
 
-    log.info("[%s] export: wrote %d tiles total (%.1fs)", source, len(manifest),
-             time.monotonic() - t0)
+    log.info("[%s] export: wrote %d tiles total, %d (%d bytes) reused from the previous run (%.1fs)",
+             source, len(manifest), reused[0], reused[1], time.monotonic() - t0)
 
     # Step 7: Manifests in completion order — manifest.json lands LAST as completeness marker
     write_manifest_db(tile_assignments_parquet, run_dir, source, generated_at=generated_at,
-                      temp_directory=temp_directory,
+                      tiles=manifest, temp_directory=temp_directory,
                       max_temp_directory_size=max_temp_directory_size)
     write_collection_json(run_dir, source, source_cls, generated_at=generated_at,
                           manifest=manifest, places_pq=places_pq,
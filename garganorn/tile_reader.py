@@ -1,69 +1,485 @@
-import copy
 import duckdb
 import gzip
 import json
+import logging
 import os
 import threading
-from functools import lru_cache
+import time
+from collections import OrderedDict
+
+from garganorn.metrics import Counter, Histogram
+from garganorn.record_index import INDEX_FILENAME, RecordIndex
+from garganorn.rkey_filter import FILTER_FILENAME, RkeyFilter
+
+log = logging.getLogger(__name__)
+
+RECORD_INDEX_ENGINES = ("duckdb", "memory", "mmap")
+DEFAULT_TILE_CACHE_BYTES = 64 * 1024 * 1024
+DEFAULT_COLD_LOADS = 8
+DEFAULT_COLD_QUEUE = 32
+DEFAULT_COLD_QUEUE_SECONDS = 1.0
+RETRY_AFTER_SECONDS = 1
+
+
+class Overloaded(Exception):
+    """Cold-path work refused by an AdmissionLimiter. The app answers it
+    with 503 and Retry-After: retry_after."""
+
+    def __init__(self, retry_after=RETRY_AFTER_SECONDS):
+        super().__init__("Server is overloaded; retry shortly")
+        self.retry_after = retry_after
+
+
+class AdmissionLimiter:
+    """Bounded concurrency with a short queue, for the cold path.
+
+    Up to max_concurrent holders at once; up to max_queue more wait, each
+    for at most queue_timeout seconds. Anything beyond that -- or a waiter
+    that times out -- raises Overloaded at once instead of tying up a
+    server thread, so a spike of cold lookups sheds load rather than
+    starving the cheap requests queued behind it. max_queue=None queues
+    without bound (and queue_timeout=None waits forever), which is plain
+    semaphore behavior.
+    """
+
+    def __init__(self, max_concurrent: int = DEFAULT_COLD_LOADS,
+                 max_queue: int | None = None, queue_timeout: float | None = None,
+                 retry_after: int = RETRY_AFTER_SECONDS):
+        if max_concurrent < 1:
+            raise ValueError(f"max_concurrent must be >= 1, got {max_concurrent}")
+        if max_queue is not None and max_queue < 0:
+            raise ValueError(f"max_queue must be >= 0, got {max_queue}")
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._cond = threading.Condition()
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.shed = 0
+
+    def __enter__(self):
+        with self._cond:
+            if self.in_flight >= self.max_concurrent:
+                if self.max_queue is not None and self.queued >= self.max_queue:
+                    self.shed += 1
+                    raise Overloaded(self.retry_after)
+                self.queued += 1
+                try:
+                    admitted = self._cond.wait_for(
+                        lambda: self.in_flight < self.max_concurrent, self.queue_timeout)
+                finally:
+                    self.queued -= 1
+                if not admitted:
+                    self.shed += 1
+                    raise Overloaded(self.retry_after)
+            self.in_flight += 1
+            self.admitted += 1
+        return self
+
+    def __exit__(self, *exc):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "in_flight": self.in_flight,
+                "queued": self.queued,
+                "admitted": self.admitted,
+                "shed": self.shed,
+                "max_concurrent": self.max_concurrent,
+            }
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent loads of the same key.
+
+    The first caller for a key runs the load; callers arriving while it is
+    in flight wait for that result (or exception) instead of repeating the
+    read and decompress. Distinct loads go through limiter -- by default
+    at most max_concurrent at once, the rest queued -- so a burst of cold
+    tiles doesn't saturate the disk and every core; with a bounded
+    AdmissionLimiter the burst's excess is shed with Overloaded instead.
+    Nothing is retained after a load finishes -- caching is the caller's
+    business (TileCache, or nothing for serve_tile).
+    """
+
+    def __init__(self, max_concurrent: int = DEFAULT_COLD_LOADS,
+                 limiter: AdmissionLimiter | None = None):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.limiter = limiter if limiter is not None else AdmissionLimiter(max_concurrent)
+
+    def do(self, key, load):
+        """Return (load()'s result, shared): shared is True when this caller
+        waited on another caller's load rather than running its own."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            with self.limiter:
+                call.result = load()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+class TileCache:
+    """LRU of decompressed tile payloads, bounded by total bytes.
+
+    Holds bytes rather than parsed dicts: parsed JSON is several times the
+    size of its text and that ratio varies tile to tile, so only a cache of
+    bytes can be sized to the box. A tile larger than the whole budget is
+    returned uncached. max_bytes=0 disables caching.
+
+    Misses load through a SingleFlight, so concurrent misses on one tile
+    cost one read; pass a shared one to bound cold loads process-wide.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_TILE_CACHE_BYTES,
+                 flight: SingleFlight | None = None):
+        if max_bytes < 0:
+            raise ValueError(f"tile cache budget must be >= 0, got {max_bytes}")
+        self.max_bytes = max_bytes
+        self.flight = flight if flight is not None else SingleFlight()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+
+    def get(self, key, load):
+        """Return the cached bytes for key, calling load() to fill a miss.
+
+        load runs outside the lock, so a slow disk read never blocks hits on
+        other tiles. A miss that joins another thread's in-flight load of
+        the same key counts as coalesced, not as a miss.
+        """
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+        data, shared = self.flight.do(key, load)
+        with self._lock:
+            if shared:
+                self.coalesced += 1
+            else:
+                self.misses += 1
+        if not shared:
+            self._store(key, data)
+        return data
+
+    def _store(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = data
+                self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def warm(self, key, load):
+        """Fill key ahead of demand, without counting a hit or a miss."""
+        with self._lock:
+            if key in self._entries:
+                return
+        self._store(key, load())
+
+    def keys(self):
+        """Cached keys, least recently used first."""
+        with self._lock:
+            return list(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "coalesced": self.coalesced,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
 
 
 class TileBackedCollection:
     """Serves getRecord from static tile files + manifest.duckdb."""
 
     def __init__(self, collection: str, manifest_db_path: str,
-                 tiles_dir: str, source_url: str, license_url: str):
+                 tiles_dir: str, source_url: str, license_url: str,
+                 record_index: str = "duckdb",
+                 tile_cache_bytes: int = DEFAULT_TILE_CACHE_BYTES,
+                 flight: SingleFlight | None = None):
+        """record_index picks the rkey -> tile lookup engine: "duckdb" (the
+        default) queries record_tiles on a per-thread connection; "memory"
+        loads record_tiles into a RecordIndex at startup, trading ~12 bytes
+        a record for lookups that never touch DuckDB; "mmap" maps the run's
+        manifest.idx sidecar, which gunicorn workers share through the page
+        cache, and also records where each record's value sits in its tile,
+        so getRecord parses that one record instead of the whole tile.
+
+        Whatever the engine, a manifest.bloom next to manifest_db_path
+        (garganorn.rkey_filter) answers definite misses before it runs.
+
+        tile_cache_bytes bounds this collection's TileCache; flight, when
+        given, is the SingleFlight its cold tile reads share with the rest
+        of the process."""
+        if record_index not in RECORD_INDEX_ENGINES:
+            raise ValueError(
+                f"{collection}: record_index must be one of {RECORD_INDEX_ENGINES}, "
+                f"got {record_index!r}"
+            )
         self.collection = collection
         self.source_url = source_url
         self.license_url = license_url
         self.tiles_dir = tiles_dir
+        self.record_index = record_index
         self._db_path = manifest_db_path
         self._local = threading.local()
+        self.tile_cache = TileCache(tile_cache_bytes, flight)
+        # Time to find an rkey's candidate tiles, before any tile is read.
+        self.lookup_seconds = Histogram()
+        # getRecord misses answered by the run's manifest.bloom alone.
+        self.filter_rejections = Counter()
+        self._filter = None
+        filter_path = os.path.join(os.path.dirname(manifest_db_path), FILTER_FILENAME)
+        try:
+            self._filter = RkeyFilter.from_file(filter_path)
+        except FileNotFoundError:
+            pass  # a run exported before the filter existed
+        except ValueError as e:
+            log.warning("%s: ignoring %s: %s", collection, filter_path, e)
+        if record_index == "memory":
+            self._index = RecordIndex.from_manifest_db(manifest_db_path)
+        elif record_index == "mmap":
+            self._index = RecordIndex.from_file(os.path.join(
+                os.path.dirname(manifest_db_path), INDEX_FILENAME))
+        else:
+            self._index = None
 
     @property
     def _con(self):
-        """Per-thread DuckDB connection (DuckDB connections are not thread-safe)."""
-        if not hasattr(self._local, "con"):
+        """Per-thread DuckDB connection (DuckDB connections are not thread-safe).
+
+        Opened lazily and tagged with the opening process's pid: a process
+        forked from one that already held a connection (gunicorn --preload)
+        opens its own rather than sharing the parent's, and leaves the
+        inherited one alone -- closing it would tear down state the parent
+        still owns."""
+        if getattr(self._local, "pid", None) != os.getpid():
             self._local.con = duckdb.connect(self._db_path, read_only=True)
+            self._local.pid = os.getpid()
         return self._local.con
 
-    def get_record(self, _repo: str, _collection: str, rkey: str):
-        """Look up which tile contains this rkey, read the tile, find the record.
+    def _candidate_tiles(self, rkey: str):
+        """Yield (tile_qk, span) for tiles that may hold rkey; span is the
+        (offset, length) of the record's value in the decompressed tile, or
+        None if the engine can't say.
+
+        The DuckDB path's fetchone() picks one row arbitrarily when a
+        division rkey has N record_tiles rows (one per overlapping tile) --
+        correct only because all copies of a division's record are
+        byte-identical. The RecordIndex engines yield every hash match,
+        which also covers hash collisions.
 
-        fetchone() picks one row arbitrarily when a division rkey has N
-        record_tiles rows (one per overlapping tile) -- correct only because
-        all copies of a division's record are byte-identical.
+        The DuckDB query is cold-path work, so it runs under the same
+        AdmissionLimiter as tile loads and may raise Overloaded.
         """
-        result = self._con.execute(
-            "SELECT tile_qk FROM record_tiles WHERE rkey = ?", [rkey]
-        ).fetchone()
-        if result is None:
-            return None
-        tile_qk = result[0]
-        try:
-            tile_data = self._read_tile(tile_qk)
-        except FileNotFoundError:
+        if self._index is not None:
+            yield from self._index.lookup(rkey)
+            return
+        with self.tile_cache.flight.limiter:
+            result = self._con.execute(
+                "SELECT tile_qk FROM record_tiles WHERE rkey = ?", [rkey]
+            ).fetchone()
+        if result is not None:
+            yield result[0], None
+
+    def _candidate_tiles_many(self, rkeys):
+        """{rkey: [(tile_qk, span), ...]}, non-empty, for every rkey that may
+        be in the run -- _candidate_tiles for many rkeys at once, in a single DuckDB
+        query on that engine (one tile per rkey, as there)."""
+        if self._index is not None:
+            candidates = {rkey: list(self._index.lookup(rkey)) for rkey in rkeys}
+            return {rkey: tiles for rkey, tiles in candidates.items() if tiles}
+        if not rkeys:
+            return {}
+        candidates = {}
+        with self.tile_cache.flight.limiter:
+            rows = self._con.execute(
+                "SELECT rkey, tile_qk FROM record_tiles "
+                f"WHERE rkey IN ({', '.join('?' * len(rkeys))})", list(rkeys)
+            ).fetchall()
+        for rkey, tile_qk in rows:
+            candidates.setdefault(rkey, [(tile_qk, None)])
+        return candidates
+
+    def get_record(self, _repo: str, _collection: str, rkey: str):
+        """Look up which tile contains this rkey, read the tile, find the record."""
+        start = time.perf_counter()
+        if self._filter is not None and rkey not in self._filter:
+            # A definite miss: no index or DuckDB lookup at all.
+            self.lookup_seconds.observe(time.perf_counter() - start)
+            self.filter_rejections.inc()
             return None
-        for record in tile_data["records"]:
-            value = record["value"]
-            if value["rkey"] == rkey:
-                # Shallow copy prevents mutations by the server layer (e.g., popping
-                # "importance") from corrupting the lru_cache-held tile dict.
-                return copy.copy(value)
+        candidates = list(self._candidate_tiles(rkey))
+        self.lookup_seconds.observe(time.perf_counter() - start)
+        for tile_qk, span in candidates:
+            try:
+                data = self._read_tile(tile_qk)
+            except FileNotFoundError:
+                continue
+            if span is not None:
+                # Parse just this record's value. An rkey mismatch there is
+                # a hash collision, so move on to the next candidate.
+                offset, length = span
+                try:
+                    value = json.loads(data[offset:offset + length])
+                except ValueError:
+                    continue
+                if isinstance(value, dict) and value.get("rkey") == rkey:
+                    return value
+                continue
+            for record in json.loads(data)["records"]:
+                value = record["value"]
+                if value["rkey"] == rkey:
+                    # Parsed fresh from the cached bytes, so the server layer
+                    # may mutate it (e.g., pop "importance") freely.
+                    return value
         return None
 
-    def _read_tile(self, tile_qk: str) -> dict:
-        """Read and decompress a tile file. Uses LRU cache to amortize repeated access."""
+    def get_records(self, _repo: str, _collection: str, rkeys) -> dict:
+        """get_record for many rkeys: {rkey: value} for those found.
+
+        Candidate tiles for all of them come from one lookup, and each
+        distinct tile is read and parsed at most once, however many of the
+        rkeys it holds. An rkey with several candidates (a division, or a
+        hash collision) tries them in order over successive rounds, so a
+        later candidate tile is only read if the earlier ones missed.
+        """
+        start = time.perf_counter()
+        wanted = list(dict.fromkeys(rkeys))
+        if self._filter is not None:
+            known = [rkey for rkey in wanted if rkey in self._filter]
+            if len(known) < len(wanted):
+                self.filter_rejections.inc(len(wanted) - len(known))
+            wanted = known
+        pending = self._candidate_tiles_many(wanted)
+        self.lookup_seconds.observe(time.perf_counter() - start)
+        found = {}
+        payloads = {}  # tile_qk -> bytes, or None if the file is gone
+        parsed = {}  # tile_qk -> {rkey: value}, for whole-tile parses
+        while pending:
+            by_tile = {}
+            for rkey, candidates in pending.items():
+                tile_qk, span = candidates.pop(0)
+                by_tile.setdefault(tile_qk, []).append((rkey, span))
+            for tile_qk, entries in by_tile.items():
+                if tile_qk not in payloads:
+                    try:
+                        payloads[tile_qk] = self._read_tile(tile_qk)
+                    except FileNotFoundError:
+                        payloads[tile_qk] = None
+                data = payloads[tile_qk]
+                if data is None:
+                    continue
+                for rkey, span in entries:
+                    if span is not None:
+                        offset, length = span
+                        try:
+                            value = json.loads(data[offset:offset + length])
+                        except ValueError:
+                            continue
+                        if isinstance(value, dict) and value.get("rkey") == rkey:
+                            found[rkey] = value
+                        continue
+                    if tile_qk not in parsed:
+                        parsed[tile_qk] = {
+                            record["value"]["rkey"]: record["value"]
+                            for record in json.loads(data)["records"]
+                        }
+                    if rkey in parsed[tile_qk]:
+                        found[rkey] = parsed[tile_qk][rkey]
+            pending = {rkey: candidates for rkey, candidates in pending.items()
+                       if candidates and rkey not in found}
+        return found
+
+    def warm_from(self, other: "TileBackedCollection"):
+        """Prefill this collection's tile cache with this run's copies of
+        the tiles cached in other (typically the run it replaces), so a
+        run swap doesn't start cold. Loads least recently used first, so
+        the new cache ends up in the same recency order, and skips tiles
+        the new run doesn't have."""
+        for tile_path in other.tile_cache.keys():
+            tile_qk = os.path.basename(tile_path)[:-len(".json.gz")]
+            new_path = self._tile_path(tile_qk)
+            try:
+                self.tile_cache.warm(new_path, lambda: _read_gzip(new_path))
+            except FileNotFoundError:
+                continue
+
+    def _tile_path(self, tile_qk: str) -> str:
         # tile_qk[:6] is the 6-char subdirectory prefix. The export pipeline produces
         # zoom 6-17 keys, plus the summary band's short keys, where the slice is the
         # whole key.
-        tile_path = os.path.join(self.tiles_dir, tile_qk[:6], f"{tile_qk}.json.gz")
-        return self._cached_read_tile(tile_path)
-
-    @staticmethod
-    @lru_cache(maxsize=256)
-    def _cached_read_tile(tile_path: str) -> dict:
-        # Process-global cache keyed on tile_path. Tiles are immutable once written;
-        # if tiles are regenerated at the same paths, a process restart is required
-        # to clear stale cache entries.
-        with gzip.open(tile_path, "rt") as f:
-            return json.load(f)
+        return os.path.join(self.tiles_dir, tile_qk[:6], f"{tile_qk}.json.gz")
+
+    def _read_tile(self, tile_qk: str) -> bytes:
+        """Read and decompress a tile file through the tile cache."""
+        tile_path = self._tile_path(tile_qk)
+        # The cache belongs to this collection object, which serves exactly
+        # one run: a run swap replaces the object, and the old run's cached
+        # tiles go with it rather than being served stale.
+        return self.tile_cache.get(tile_path, lambda: _read_gzip(tile_path))
+
+
+def _read_gzip(path: str) -> bytes:
+    with gzip.open(path, "rb") as f:
+        return f.read()
+
+
+def load_pinned_tiles(tiles_dir: str, quadkeys) -> dict:
+    """Read tiles into memory in both wire forms: {tile_qk: (gzip bytes,
+    plain bytes)}. Tiles missing from disk are skipped."""
+    pinned = {}
+    for tile_qk in quadkeys:
+        path = os.path.join(tiles_dir, tile_qk[:6], f"{tile_qk}.json.gz")
+        try:
+            with open(path, "rb") as f:
+                compressed = f.read()
+        except FileNotFoundError:
+            continue
+        pinned[tile_qk] = (compressed, gzip.decompress(compressed))
+    return pinned
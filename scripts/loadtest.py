@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""Offline load test for the garganorn server against a synthetic tile run.
+
+Builds a stage_export-shaped run -- gzip tiles, manifest.duckdb (via
+write_manifest_db), manifest.idx, manifest.bloom, manifest.json, and a
+`current` symlink --
+of any size, boots create_app on it in a child process, and drives a mix of
+getCoverage, getRecord, /<collection>/<rkey> and /tiles/... requests from
+client threads (optionally spread over several client processes). Reports
+throughput and p50/p95/p99 latency per request kind.
+
+  python scripts/loadtest.py --tiles 100000 --requests 50000 --concurrency 32
+  python scripts/loadtest.py --workdir /tmp/lt --build-only   # then run gunicorn
+  python scripts/loadtest.py --workdir /tmp/lt --url http://127.0.0.1:8000
+
+A fixture already built in --workdir with the same --tiles, --records-per-tile
+and --seed is reused. Everything is seeded, so two runs issue identical
+request sequences.
+"""
+
+import argparse
+import gzip
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+import duckdb
+
+from garganorn import envelope
+from garganorn.database import OverturePlaces
+from garganorn.record_index import INDEX_FILENAME, write_index_file
+from garganorn.rkey_filter import (
+    FILTER_FILENAME,
+    filter_size,
+    filter_words_sql,
+    write_filter_file,
+)
+from garganorn.quadkey import pack_quadkey
+from garganorn.stages import quadkey_to_bbox, write_manifest, write_manifest_db
+
+REPO = "places.atgeo.org"
+SOURCE = "overture_place"
+COLLECTION = OverturePlaces.collection
+SLUG = "overture-place"
+STAMP = "20260101T000000"
+TILE_ZOOM = 12
+KINDS = ("getCoverage", "getRecord", "resource", "tile")
+DEFAULT_MIX = "getCoverage=4,getRecord=2,resource=1,tile=4"
+_FETCH_BATCH = 100_000
+
+
+# ---------------------------------------------------------------------------
+# Fixture
+# ---------------------------------------------------------------------------
+
+def _record_json(rkey, qk, i, rng):
+    xmin, ymin, xmax, ymax = quadkey_to_bbox(qk)
+    return json.dumps({
+        "$type": "org.atgeo.place",
+        "rkey": rkey,
+        "name": f"Place {rkey}",
+        "locations": [{
+            "$type": "community.lexicon.location.geo",
+            "latitude": f"{rng.uniform(ymin, ymax):.6f}",
+            "longitude": f"{rng.uniform(xmin, xmax):.6f}",
+        }],
+        "variants": [],
+        "attributes": {"category": f"category_{i % 17}", "confidence": round(rng.random(), 3)},
+    }, separators=(",", ":"))
+
+
+def _write_tile(run_dir, qk, records, generated_at):
+    """Write one tile exactly as stage_export's flush_tile does; returns
+    (compressed bytes, uncompressed bytes, digest, value spans)."""
+    wrapped = [envelope.wrap_record(envelope.record_uri(REPO, COLLECTION, rkey), record_json)
+               for rkey, record_json in records]
+    payload = envelope.build_tile_payload(
+        COLLECTION, OverturePlaces.source_url, OverturePlaces.license_url, generated_at, wrapped)
+    spans = envelope.record_value_spans(payload, wrapped, [j for _, j in records])
+    subdir = os.path.join(run_dir, qk[:6])
+    os.makedirs(subdir, exist_ok=True)
+    compressed = gzip.compress(payload, mtime=0)
+    with open(os.path.join(subdir, f"{qk}.json.gz"), "wb") as f:
+        f.write(compressed)
+    return len(compressed), len(payload), envelope.tile_digest(payload), spans
+
+
+def build_fixture(workdir, n_tiles, records_per_tile, seed=0):
+    """Build (or reuse) a complete run under workdir/tiles/<STAMP>.
+
+    n_tiles distinct zoom-12 tiles of records_per_tile records each, plus
+    one summary-band (zoom 5) tile per populated zoom-5 parent holding its
+    first tile's first record. Returns the `current` symlink's path.
+    """
+    tiles_root = os.path.join(workdir, "tiles")
+    run_dir = os.path.join(tiles_root, STAMP)
+    current = os.path.join(tiles_root, "current")
+    params_path = os.path.join(workdir, "fixture.json")
+    params = {"tiles": n_tiles, "records_per_tile": records_per_tile, "seed": seed}
+    if os.path.isfile(os.path.join(run_dir, "manifest.json")) and os.path.isfile(params_path):
+        with open(params_path) as f:
+            if json.load(f) == params:
+                return current
+    if os.path.exists(run_dir):
+        raise SystemExit(f"{run_dir} holds a different fixture; pick another --workdir")
+    os.makedirs(run_dir)
+    generated_at = "2026-01-01T00:00:00Z"
+    rng = random.Random(seed)
+
+    quadkeys = set()
+    while len(quadkeys) < n_tiles:
+        quadkeys.add("".join(rng.choice("0123") for _ in range(TILE_ZOOM)))
+    quadkeys = sorted(quadkeys)
+
+    tiles = {}
+    summary = {}
+    assignments_csv = os.path.join(workdir, "assignments.csv")
+    spans_csv = os.path.join(workdir, "spans.csv")
+    with open(assignments_csv, "w") as assignments, open(spans_csv, "w") as spans_out:
+        for t, qk in enumerate(quadkeys):
+            records = []
+            for i in range(records_per_tile):
+                rkey = f"lt{t:07d}{i:03d}"
+                records.append((rkey, _record_json(rkey, qk, i, rng)))
+            compressed, uncompressed, digest, spans = _write_tile(run_dir, qk, records, generated_at)
+            tiles[qk] = (len(records), compressed, uncompressed, digest)
+            summary.setdefault(qk[:5], records[0])
+            for (rkey, _), (offset, length) in zip(records, spans):
+                assignments.write(f"{rkey},{qk}\n")
+                spans_out.write(f"{rkey},{qk},{offset},{length}\n")
+        for qk, record in summary.items():
+            compressed, uncompressed, digest, spans = _write_tile(run_dir, qk, [record], generated_at)
+            tiles[qk] = (1, compressed, uncompressed, digest)
+            assignments.write(f"{record[0]},{qk}\n")
+            spans_out.write(f"{record[0]},{qk},{spans[0][0]},{spans[0][1]}\n")
+
+    con = duckdb.connect()
+    try:
+        columns = "{'place_id': 'VARCHAR', 'tile_qk': 'VARCHAR'}"
+        assignments_pq = os.path.join(workdir, "tile_assignments.parquet")
+        con.execute(f"""
+            COPY (SELECT * FROM read_csv('{assignments_csv}', header = false,
+                                         columns = {columns}))
+            TO '{assignments_pq}' (FORMAT PARQUET)
+        """)
+        write_manifest_db(assignments_pq, run_dir, SOURCE, generated_at=generated_at,
+                          tiles=tiles)
+        n_records = sum(count for count, *_ in tiles.values())
+        cursor = con.execute(f"""
+            SELECT md5_number_upper(rkey) AS h,
+                   (dense_rank() OVER (ORDER BY tile_qk) - 1)::UINTEGER AS ordinal,
+                   value_offset, value_length
+            FROM read_csv('{spans_csv}', header = false, columns = {{
+                'rkey': 'VARCHAR', 'tile_qk': 'VARCHAR',
+                'value_offset': 'UINTEGER', 'value_length': 'UINTEGER'}})
+            ORDER BY h, ordinal
+        """)
+        write_index_file(os.path.join(run_dir, INDEX_FILENAME),
+                         [pack_quadkey(qk) for qk in sorted(tiles)], n_records,
+                         iter(lambda: cursor.fetchmany(_FETCH_BATCH), []))
+        filter_m, filter_k = filter_size(n_records)
+        cursor = con.execute(filter_words_sql(
+            f"read_csv('{spans_csv}', header = false, columns = {{'rkey': 'VARCHAR', "
+            "'tile_qk': 'VARCHAR', 'value_offset': 'UINTEGER', 'value_length': 'UINTEGER'})",
+            filter_m, filter_k))
+        write_filter_file(os.path.join(run_dir, FILTER_FILENAME), filter_m, filter_k, n_records,
+                          iter(lambda: cursor.fetchmany(_FETCH_BATCH), []))
+    finally:
+        con.close()
+        for path in (assignments_csv, spans_csv):
+            os.remove(path)
+    write_manifest(run_dir, generated_at=generated_at)
+    if os.path.lexists(current):
+        os.remove(current)
+    os.symlink(STAMP, current)
+    with open(params_path, "w") as f:
+        json.dump(params, f)
+    return current
+
+
+def write_config(workdir, current, record_index="mmap", tile_cache_bytes=64 * 1024 * 1024):
+    """Write a garganorn config.yaml serving the fixture; returns its path."""
+    import yaml
+    config = {
+        "repo": REPO,
+        "tiles": {
+            "collections": {
+                COLLECTION: {
+                    "slug": SLUG,
+                    "manifest": os.path.join(current, "manifest.duckdb"),
+                    "tiles_dir": current,
+                    "base_url": f"https://{REPO}/tiles/{SLUG}",
+                    "source": OverturePlaces.source_url,
+                    "license": OverturePlaces.license_url,
+                    "record_index": record_index,
+                    "tile_cache_bytes": tile_cache_bytes,
+                },
+            },
+            "max_coverage_tiles": 50,
+        },
+    }
+    path = os.path.join(workdir, "config.yaml")
+    with open(path, "w") as f:
+        yaml.safe_dump(config, f)
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Request plan
+# ---------------------------------------------------------------------------
+
+def parse_mix(mix):
+    weights = {}
+    for part in mix.split(","):
+        kind, _, weight = part.partition("=")
+        if kind not in KINDS:
+            raise argparse.ArgumentTypeError(f"unknown request kind {kind!r}; one of {KINDS}")
+        weights[kind] = float(weight or 1)
+    return weights
+
+
+def _viewport(qk, rng):
+    """A 0.01°-snapped bbox around tile qk, the size of a city-to-region
+    map view, clamped to getCoverage's valid range."""
+    xmin, ymin, xmax, ymax = quadkey_to_bbox(qk)
+    cx, cy = (xmin + xmax) / 2, (ymin + ymax) / 2
+    half = rng.choice((0.05, 0.1, 0.25, 0.5, 1.0))
+    w = max(-180.0, round(cx - half, 2))
+    e = min(180.0, round(cx + half, 2))
+    s = max(-85.0, round(cy - half / 2, 2))
+    n = min(85.0, round(cy + half / 2, 2))
+    return f"{w:.2f},{s:.2f},{e:.2f},{n:.2f}"
+
+
+def build_plan(current, n_requests, weights, seed=0, viewports=1000, tile_encoding="gzip"):
+    """A seeded list of (kind, path, headers) to issue. Coverage requests
+    draw from a fixed pool of viewports, as real map traffic repeats."""
+    con = duckdb.connect(os.path.join(current, "manifest.duckdb"), read_only=True)
+    try:
+        tile_qks = [qk for (qk,) in con.execute("SELECT tile_qk FROM tiles ORDER BY tile_qk").fetchall()]
+        rkeys = [r for (r,) in con.execute(
+            "SELECT rkey FROM record_tiles USING SAMPLE 10000 ROWS (reservoir, 42)").fetchall()]
+    finally:
+        con.close()
+    rkeys.sort()
+    rng = random.Random(seed)
+    regular = [qk for qk in tile_qks if len(qk) >= 6]
+    bboxes = [_viewport(rng.choice(regular), rng) for _ in range(viewports)]
+    kinds = list(weights)
+    cum = [weights[k] for k in kinds]
+    tile_headers = {"Accept-Encoding": tile_encoding}
+    plan = []
+    for kind in rng.choices(kinds, weights=cum, k=n_requests):
+        if kind == "getCoverage":
+            path = ("/xrpc/org.atgeo.getCoverage?"
+                    + urllib.parse.urlencode({"collection": COLLECTION, "bbox": rng.choice(bboxes)}))
+            plan.append((kind, path, {}))
+        elif kind == "getRecord":
+            path = ("/xrpc/com.atproto.repo.getRecord?" + urllib.parse.urlencode(
+                {"repo": REPO, "collection": COLLECTION, "rkey": rng.choice(rkeys)}))
+            plan.append((kind, path, {}))
+        elif kind == "resource":
+            plan.append((kind, f"/{COLLECTION}/{rng.choice(rkeys)}", {}))
+        else:
+            qk = rng.choice(tile_qks)
+            plan.append((kind, f"/tiles/{SLUG}/{STAMP}/{qk[:6]}/{qk}.json.gz", tile_headers))
+    return plan
+
+
+# ---------------------------------------------------------------------------
+# Server and clients
+# ---------------------------------------------------------------------------
+
+def _serve(config_path, port_queue):
+    os.environ["GARGANORN_CONFIG"] = config_path
+    import logging
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    from werkzeug.serving import make_server
+    from garganorn.__main__ import create_app
+    server = make_server("127.0.0.1", 0, create_app(), threaded=True)
+    port_queue.put(server.server_port)
+    server.serve_forever()
+
+
+def start_server(config_path, timeout=300):
+    """Boot create_app in a child process; returns (process, base_url) once
+    /health reports ready."""
+    ctx = multiprocessing.get_context("spawn")
+    port_queue = ctx.Queue()
+    proc = ctx.Process(target=_serve, args=(config_path, port_queue), daemon=True)
+    proc.start()
+    port = port_queue.get(timeout=timeout)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            status, _ = _fetch(http.client.HTTPConnection("127.0.0.1", port), "/health", {})
+            if status == 200:
+                return proc, base_url
+        except OSError:
+            pass
+        if time.monotonic() > deadline:
+            proc.terminate()
+            raise SystemExit("server did not become ready")
+        time.sleep(0.05)
+
+
+def _fetch(conn, path, headers):
+    conn.request("GET", path, headers=headers)
+    resp = conn.getresponse()
+    resp.read()
+    return resp.status, conn
+
+
+def _drive(base_url, plan, concurrency):
+    """Issue plan from concurrency threads, each on a keep-alive connection.
+    Returns ({kind: [seconds, ...]}, {kind: errors}, wall seconds)."""
+    parsed = urllib.parse.urlsplit(base_url)
+    local = threading.local()
+    latencies = {kind: [] for kind in KINDS}
+    errors = {kind: 0 for kind in KINDS}
+    lock = threading.Lock()
+
+    def one(item):
+        kind, path, headers = item
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = local.conn = http.client.HTTPConnection(parsed.hostname, parsed.port)
+        start = time.perf_counter()
+        try:
+            status, _ = _fetch(conn, path, headers)
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            local.conn = None
+            status = None
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies[kind].append(elapsed)
+            # getCoverage's BboxTooLarge is a 400 by design, not a failure.
+            if status is None or status >= 500 or (status != 200 and kind != "getCoverage"):
+                errors[kind] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in pool.map(one, plan):
+            pass
+    return latencies, errors, time.perf_counter() - start
+
+
+def _drive_chunk(args):
+    return _drive(*args)
+
+
+def run_load(base_url, plan, concurrency, processes=1):
+    """Drive plan against base_url; returns the merged result of _drive."""
+    if processes <= 1:
+        return _drive(base_url, plan, concurrency)
+    chunks = [(base_url, plan[i::processes], concurrency) for i in range(processes)]
+    start = time.perf_counter()
+    with multiprocessing.get_context("spawn").Pool(processes) as pool:
+        results = pool.map(_drive_chunk, chunks)
+    wall = time.perf_counter() - start
+    latencies = {kind: [] for kind in KINDS}
+    errors = {kind: 0 for kind in KINDS}
+    for lat, err, _ in results:
+        for kind in KINDS:
+            latencies[kind].extend(lat[kind])
+            errors[kind] += err[kind]
+    return latencies, errors, wall
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(latencies, errors, wall):
+    """{kind: {count, errors, rps, p50_ms, p95_ms, p99_ms}}, plus "all"."""
+    report = {}
+    every = []
+    for kind in KINDS:
+        values = sorted(latencies[kind])
+        every.extend(values)
+        if values:
+            report[kind] = _row(values, errors[kind], wall)
+    report["all"] = _row(sorted(every), sum(errors.values()), wall)
+    return report
+
+
+def _row(values, errors, wall):
+    return {
+        "count": len(values),
+        "errors": errors,
+        "rps": len(values) / wall if wall else 0.0,
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workdir", default="loadtest-data",
+                        help="fixture and config directory (default: loadtest-data)")
+    parser.add_argument("--tiles", type=int, default=10_000, help="regular tiles (default 10000)")
+    parser.add_argument("--records-per-tile", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--record-index", default="mmap", choices=("duckdb", "memory", "mmap"))
+    parser.add_argument("--tile-cache-bytes", type=int, default=64 * 1024 * 1024)
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=16, help="client threads per process")
+    parser.add_argument("--processes", type=int, default=1, help="client processes")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"kind=weight,... over {', '.join(KINDS)} (default {DEFAULT_MIX})")
+    parser.add_argument("--tile-encoding", default="gzip", choices=("gzip", "identity"),
+                        help="Accept-Encoding for tile requests (default gzip)")
+    parser.add_argument("--url", help="drive an already-running server instead of booting one")
+    parser.add_argument("--build-only", action="store_true",
+                        help="build the fixture and config, print the config path, and exit")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.workdir, exist_ok=True)
+    t0 = time.perf_counter()
+    current = build_fixture(args.workdir, args.tiles, args.records_per_tile, args.seed)
+    config_path = write_config(args.workdir, os.path.abspath(current),
+                               args.record_index, args.tile_cache_bytes)
+    print(f"fixture ready in {time.perf_counter() - t0:.1f}s: {config_path}", file=sys.stderr)
+    if args.build_only:
+        print(config_path)
+        return 0
+
+    plan = build_plan(current, args.requests, args.mix, args.seed,
+                      tile_encoding=args.tile_encoding)
+    proc = None
+    base_url = args.url
+    if base_url is None:
+        proc, base_url = start_server(os.path.abspath(config_path))
+    try:
+        report = summarize(*run_load(base_url, plan, args.concurrency, args.processes))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.join()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'kind':<12} {'count':>8} {'errors':>7} {'req/s':>9} "
+              f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for kind, row in report.items():
+            print(f"{kind:<12} {row['count']:>8} {row['errors']:>7} {row['rps']:>9.1f} "
+                  f"{row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f}")
+    return 1 if report["all"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
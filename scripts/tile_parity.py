@@ -8,12 +8,19 @@ Two subcommands:
 Canonical form neutralizes record ordering, JSON key ordering, and the
 non-deterministic manifest `generated_at` timestamp so that only genuine
 value differences are reported. Zero-tolerance: any difference exits nonzero.
+
+`diff --bytes` is stricter: each tile's uncompressed payload must match
+byte for byte, apart from its `generated_at` value -- the check for two
+export paths that promise identical output, such as stage_export's
+python and duckdb engines.
 """
 
 import argparse
 import gzip
+import hashlib
 import json
 import os
+import re
 import sys
 
 import duckdb
@@ -44,6 +51,18 @@ def canonical_tile(gz_path):
     return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
 
 
+_GENERATED_AT_RE = re.compile(rb'"generated_at": "[^"]*"')
+
+
+def payload_digest(gz_path):
+    """SHA-256 of a tile's uncompressed payload with the first (top-level)
+    `generated_at` value blanked; every other byte counts."""
+    with gzip.open(gz_path) as f:
+        payload = f.read()
+    payload = _GENERATED_AT_RE.sub(b'"generated_at": ""', payload, count=1)
+    return hashlib.sha256(payload).hexdigest()
+
+
 def canonical_manifest(manifest_path):
     """Load manifest.json and return a dict with `generated_at` removed.
 
@@ -88,13 +107,18 @@ def capture(tiles_dir, out_dir):
       <out_dir>/<qk>.canon        — canonical JSON string per tile.
       <out_dir>/manifest.json     — manifest with `generated_at` removed.
       <out_dir>/manifest_rows.json — sorted [rkey, tile_qk] pairs from manifest.duckdb.
+      <out_dir>/digests.json      — {qk: payload_digest} for `diff --bytes`.
     """
     os.makedirs(out_dir, exist_ok=True)
 
+    digests = {}
     for qk, gz_path in iter_tiles(tiles_dir):
         canon = canonical_tile(gz_path)
         with open(os.path.join(out_dir, qk + ".canon"), "w") as f:
             f.write(canon)
+        digests[qk] = payload_digest(gz_path)
+    with open(os.path.join(out_dir, "digests.json"), "w") as f:
+        json.dump(digests, f, sort_keys=True, indent=2)
 
     manifest_path = os.path.join(tiles_dir, "manifest.json")
     if os.path.exists(manifest_path):
@@ -157,15 +181,31 @@ def _tile_value_diffs(qk, ref_text, cap_text):
     return diffs
 
 
-def diff_captures(ref_dir, captured_dir):
+def diff_captures(ref_dir, captured_dir, check_bytes=False):
     """Compare two capture dirs across three artifact classes.
 
     Checks: per-tile canonical files (*.canon), manifest.json, and
-    manifest_rows.json.  Returns a list of human-readable difference strings;
+    manifest_rows.json; with check_bytes, also each tile's payload digest
+    (digests.json).  Returns a list of human-readable difference strings;
     an empty list means the captures are identical.
     """
     diffs = []
 
+    if check_bytes:
+        loaded = []
+        for cap_dir in (ref_dir, captured_dir):
+            path = os.path.join(cap_dir, "digests.json")
+            if os.path.exists(path):
+                with open(path) as f:
+                    loaded.append(json.load(f))
+            else:
+                diffs.append(f"{cap_dir}: no digests.json; recapture for --bytes")
+        if len(loaded) == 2:
+            ref_digests, cap_digests = loaded
+            for qk in sorted(set(ref_digests) & set(cap_digests)):
+                if ref_digests[qk] != cap_digests[qk]:
+                    diffs.append(f"tile {qk}: payload bytes differ")
+
     ref_map = _load_canon_map(ref_dir)
     cap_map = _load_canon_map(captured_dir)
 
@@ -225,6 +265,8 @@ def main(argv=None):
     p_diff = sub.add_parser("diff", help="Compare two capture dirs; nonzero exit on any diff.")
     p_diff.add_argument("ref_dir", help="Reference capture directory.")
     p_diff.add_argument("captured_dir", help="Capture directory to compare against ref.")
+    p_diff.add_argument("--bytes", action="store_true", dest="check_bytes",
+                        help="Also require byte-identical tile payloads (generated_at aside).")
 
     args = parser.parse_args(argv)
 
@@ -234,7 +276,7 @@ def main(argv=None):
         return 0
 
     if args.cmd == "diff":
-        diffs = diff_captures(args.ref_dir, args.captured_dir)
+        diffs = diff_captures(args.ref_dir, args.captured_dir, check_bytes=args.check_bytes)
         if diffs:
             for d in diffs:
                 print(d)
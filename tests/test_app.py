@@ -2,9 +2,12 @@
 import gzip
 import json
 import os
+import signal
+import threading
 import pytest
 from unittest.mock import patch
 
+import garganorn.runs
 from garganorn.__main__ import create_app
 
 
@@ -254,6 +257,7 @@ def _build_tile_app(tiles_config):
         mock_load.return_value = ("places.atgeo.org", tiles_config)
         app = create_app()
     app.config["TESTING"] = True
+    assert app.tiles_ready.wait(10)
     return app
 
 
@@ -303,10 +307,9 @@ def tile_client_empty(tmp_path):
 
 
 def test_tile_served_successfully(tile_client):
-    """GET /tiles/<slug>/<stamp>/<qk6>/<qk>.json.gz returns 200 with plain
-    JSON and no Content-Encoding -- the on-disk file is gzip, but the
-    response body is decompressed before serving, so the client's
-    Accept-Encoding governs the wire format instead of a forced header.
+    """GET /tiles/<slug>/<stamp>/<qk6>/<qk>.json.gz without Accept-Encoding
+    returns 200 with plain JSON and no Content-Encoding -- the on-disk file
+    is gzip, but a client that didn't ask for gzip gets it decompressed.
     tile_client's run is stamped 20260101T000000 (tiles_dir roots at
     tiles/, one level above the run, so the stamp is part of the path)."""
     resp = tile_client.get("/tiles/overture-place/20260101T000000/012301/012301.json.gz")
@@ -317,6 +320,37 @@ def test_tile_served_successfully(tile_client):
     assert "records" in data
 
 
+def test_tile_gzip_passthrough_when_accepted(tile_client, tmp_path):
+    """A client accepting gzip gets the on-disk bytes verbatim, labelled
+    Content-Encoding: gzip -- no decompress/recompress round trip."""
+    resp = tile_client.get(
+        "/tiles/overture-place/20260101T000000/012301/012301.json.gz",
+        headers={"Accept-Encoding": "gzip, deflate, br"},
+    )
+    on_disk = (tmp_path / "overture_place" / "tiles" / "20260101T000000"
+               / "012301" / "012301.json.gz").read_bytes()
+    assert resp.status_code == 200
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "application/json" in resp.content_type
+    assert resp.data == on_disk
+    assert json.loads(gzip.decompress(resp.data)) == {
+        "attribution": "https://example.com", "records": []}
+    assert resp.headers.get("Cache-Control") == "public, max-age=604800, immutable"
+    assert "Accept-Encoding" in resp.headers.get("Vary", "")
+
+
+def test_tile_gzip_refused_gets_plain_json(tile_client):
+    """gzip;q=0 is a refusal, not an acceptance."""
+    resp = tile_client.get(
+        "/tiles/overture-place/20260101T000000/012301/012301.json.gz",
+        headers={"Accept-Encoding": "gzip;q=0, identity"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers.get("Content-Encoding") is None
+    assert "records" in json.loads(resp.data)
+    assert "Accept-Encoding" in resp.headers.get("Vary", "")
+
+
 def test_tile_missing_returns_404(tile_client_empty):
     """GET /tiles/<slug>/... for a nonexistent tile returns 404."""
     resp = tile_client_empty.get("/tiles/overture-place/000000/nonexistent.json.gz")
@@ -573,6 +607,93 @@ def test_manifest_files_not_reachable_over_http(tmp_path):
         )
 
 
+# ---------------------------------------------------------------------------
+# ETags and conditional requests
+# ---------------------------------------------------------------------------
+
+_TILE_URL = "/tiles/overture-place/20260101T000000/012301/012301.json.gz"
+
+
+def test_tile_etag_per_encoding(tile_client):
+    """Plain and gzip responses are different representations, so they
+    carry different strong ETags, both naming the run stamp and quadkey."""
+    plain = tile_client.get(_TILE_URL)
+    gz = tile_client.get(_TILE_URL, headers={"Accept-Encoding": "gzip"})
+    assert plain.get_etag() == ("20260101T000000-012301", False)
+    assert gz.get_etag() == ("20260101T000000-012301-gz", False)
+
+
+def test_tile_if_none_match_304_without_opening_file(tile_client):
+    etag = tile_client.get(_TILE_URL, headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+    with patch("garganorn.__main__.send_file") as mock_send, \
+            patch("garganorn.__main__.gzip.open") as mock_open:
+        resp = tile_client.get(_TILE_URL, headers={
+            "Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.data == b""
+    assert resp.headers["ETag"] == etag
+    assert resp.headers.get("Cache-Control") == "public, max-age=604800, immutable"
+    mock_send.assert_not_called()
+    mock_open.assert_not_called()
+
+
+def test_tile_etag_of_other_encoding_does_not_match(tile_client):
+    """A cached gzip body must not validate a plain request."""
+    gz_etag = tile_client.get(
+        _TILE_URL, headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+    resp = tile_client.get(_TILE_URL, headers={"If-None-Match": gz_etag})
+    assert resp.status_code == 200
+    assert "records" in json.loads(resp.data)
+
+
+def _record_app(tmp_path):
+    tiles_root = tmp_path / "overture_place" / "tiles"
+    run = _make_run(tiles_root, "20260101T000000", tile_content=_tile_json("RunOne"))
+    current = _point_current(tiles_root, run)
+    return _build_tile_app(_make_tile_config(
+        tiles_dir=current, manifest_path=current / "manifest.duckdb",
+        slug="overture-place", base_url="https://places.atgeo.org/tiles/overture-place",
+    ))
+
+
+def test_record_etag_and_304_before_lookup(tmp_path):
+    """Both record routes carry a weak ETag, and revalidating with it
+    answers 304 without touching the collection at all."""
+    app = _record_app(tmp_path)
+    xrpc_url = (f"/xrpc/com.atproto.repo.getRecord?repo=places.atgeo.org"
+                f"&collection={OVERTURE_COLLECTION}&rkey=r1")
+    with app.test_client() as client:
+        resource = client.get(f"/{OVERTURE_COLLECTION}/r1")
+        xrpc = client.get(xrpc_url)
+        assert resource.status_code == 200 and xrpc.status_code == 200
+        etag, weak = resource.get_etag()
+        assert weak and etag.startswith("20260101T000000-")
+        assert xrpc.get_etag() == (etag, True)
+
+        with patch("garganorn.tile_reader.TileBackedCollection.get_record") as mock_get:
+            for url in (f"/{OVERTURE_COLLECTION}/r1", xrpc_url):
+                resp = client.get(url, headers={"If-None-Match": resource.headers["ETag"]})
+                assert resp.status_code == 304
+                assert resp.headers["ETag"] == resource.headers["ETag"]
+        mock_get.assert_not_called()
+
+
+def test_record_etag_differs_per_rkey(tmp_path):
+    app = _record_app(tmp_path)
+    with app.test_client() as client:
+        etag = client.get(f"/{OVERTURE_COLLECTION}/r1").headers["ETag"]
+        resp = client.get(f"/{OVERTURE_COLLECTION}/r2", headers={"If-None-Match": etag})
+    assert resp.status_code == 404
+
+
+def test_record_errors_carry_no_etag(tmp_path):
+    app = _record_app(tmp_path)
+    with app.test_client() as client:
+        resp = client.get(f"/{OVERTURE_COLLECTION}/missing")
+    assert resp.status_code == 404
+    assert "ETag" not in resp.headers
+
+
 # ---------------------------------------------------------------------------
 # getRecord reads the run resolved at startup, not 'current' live
 # ---------------------------------------------------------------------------
@@ -872,3 +993,337 @@ def test_missing_collection_json_omits_metadata_and_404s_on_fetch(tmp_path):
         data = resp.get_json()
         assert data is not None
         assert data.get("error") == "RecordNotFound"
+
+
+# ---------------------------------------------------------------------------
+# Hot reload -- RunWatcher swaps in a newly completed run
+# ---------------------------------------------------------------------------
+
+def _reload_app(tmp_path, run1):
+    tiles_root = tmp_path / "overture_place" / "tiles"
+    current = _point_current(tiles_root, run1)
+    tiles_config = _make_tile_config(
+        tiles_dir=current, manifest_path=current / "manifest.duckdb",
+        slug="overture-place", base_url="https://places.atgeo.org/tiles/overture-place",
+    )
+    # Long enough that the background thread never polls during a test;
+    # tests drive poll() themselves.
+    tiles_config["reload_interval"] = 3600
+    return _build_tile_app(tiles_config)
+
+
+def test_reload_disabled_by_default(tile_client):
+    assert not hasattr(tile_client.application, "run_watcher")
+
+
+def test_reload_swaps_in_new_complete_run(tmp_path):
+    tiles_root = tmp_path / "overture_place" / "tiles"
+    run1 = _make_run(tiles_root, "20260101T000000", tile_content=_tile_json("RunOne"))
+    run2 = _make_run(tiles_root, "20260102T000000", tile_content=_tile_json("RunTwo"))
+    app = _reload_app(tmp_path, run1)
+    try:
+        with app.test_client() as client:
+            assert client.get(f"/{OVERTURE_COLLECTION}/r1").get_json()["name"] == "RunOne"
+            old_etag = client.get(f"/{OVERTURE_COLLECTION}/r1").headers["ETag"]
+
+            _point_current(tiles_root, run2)
+            assert app.run_watcher.poll() == [OVERTURE_COLLECTION]
+
+            resp = client.get(f"/{OVERTURE_COLLECTION}/r1", headers={"If-None-Match": old_etag})
+            assert resp.status_code == 200
+            assert resp.get_json()["name"] == "RunTwo"
+            assert resp.get_etag()[0].startswith("20260102T000000-")
+            coverage = client.get(
+                f"/xrpc/org.atgeo.getCoverage?collection={OVERTURE_COLLECTION}"
+                "&bbox=-180,-85,180,85"
+            ).get_json()
+            assert coverage["tiles"], coverage
+            assert all("/20260102T000000/" in url for url in coverage["tiles"])
+            # A second poll with nothing new is a no-op.
+            assert app.run_watcher.poll() == []
+    finally:
+        app.run_watcher.stop()
+
+
+def test_reload_ignores_incomplete_run(tmp_path):
+    """A run without manifest.json is still being written; keep serving."""
+    tiles_root = tmp_path / "overture_place" / "tiles"
+    run1 = _make_run(tiles_root, "20260101T000000", tile_content=_tile_json("RunOne"))
+    run2 = _make_run(tiles_root, "20260102T000000", tile_content=_tile_json("RunTwo"),
+                     complete=False)
+    app = _reload_app(tmp_path, run1)
+    try:
+        _point_current(tiles_root, run2)
+        assert app.run_watcher.poll() == []
+        with app.test_client() as client:
+            assert client.get(f"/{OVERTURE_COLLECTION}/r1").get_json()["name"] == "RunOne"
+    finally:
+        app.run_watcher.stop()
+
+
+def test_reload_failure_keeps_old_run(tmp_path):
+    tiles_root = tmp_path / "overture_place" / "tiles"
+    run1 = _make_run(tiles_root, "20260101T000000", tile_content=_tile_json("RunOne"))
+    run2 = _make_run(tiles_root, "20260102T000000", tile_content=_tile_json("RunTwo"))
+    (run2 / "manifest.duckdb").write_bytes(b"not a duckdb file")
+    app = _reload_app(tmp_path, run1)
+    try:
+        _point_current(tiles_root, run2)
+        assert app.run_watcher.poll() == []
+        with patch("garganorn.runs.load_run") as mock_load:
+            assert app.run_watcher.poll() == []
+        mock_load.assert_not_called()  # not retried until current moves
+        with app.test_client() as client:
+            assert client.get(f"/{OVERTURE_COLLECTION}/r1").get_json()["name"] == "RunOne"
+    finally:
+        app.run_watcher.stop()
+
+
+def test_reload_warms_new_cache_from_old(tmp_path):
+    tiles_root = tmp_path / "overture_place" / "tiles"
+    run1 = _make_run(tiles_root, "20260101T000000", tile_content=_tile_json("RunOne"))
+    run2 = _make_run(tiles_root, "20260102T000000", tile_content=_tile_json("RunTwo"))
+    app = _reload_app(tmp_path, run1)
+    try:
+        with app.test_client() as client:
+            client.get(f"/{OVERTURE_COLLECTION}/r1")
+            _point_current(tiles_root, run2)
+            app.run_watcher.poll()
+            new = app.run_watcher.runs[OVERTURE_COLLECTION].records
+            assert [os.path.dirname(os.path.dirname(k)) for k in new.tile_cache.keys()] == [
+                os.path.realpath(run2)]
+            assert client.get(f"/{OVERTURE_COLLECTION}/r1").get_json()["name"] == "RunTwo"
+            assert new.tile_cache.stats()["hits"] == 1
+            assert new.tile_cache.stats()["misses"] == 0
+    finally:
+        app.run_watcher.stop()
+
+
+# ---------------------------------------------------------------------------
+# Pinned tiles -- the summary band and pin_prefixes, served from memory
+# ---------------------------------------------------------------------------
+
+def _pinned_app(tmp_path, qk, pin_prefixes=None):
+    tiles_root = tmp_path / "overture_place" / "tiles"
+    run_dir = _make_run(tiles_root, "20260101T000000", qk=qk, tile_content=_tile_json("Pinned"))
+    current = _point_current(tiles_root, run_dir)
+    tiles_config = _make_tile_config(
+        tiles_dir=current, manifest_path=current / "manifest.duckdb",
+        slug="overture-place", base_url="https://places.atgeo.org/tiles/overture-place",
+    )
+    if pin_prefixes is not None:
+        tiles_config["collections"][OVERTURE_COLLECTION]["pin_prefixes"] = pin_prefixes
+    return _build_tile_app(tiles_config), run_dir / qk[:6] / f"{qk}.json.gz"
+
+
+def test_summary_tile_served_from_memory(tmp_path):
+    app, tile_file = _pinned_app(tmp_path, "0123")
+    on_disk = tile_file.read_bytes()
+    tile_file.unlink()  # pinned: the route must not need it
+    url = "/tiles/overture-place/20260101T000000/0123/0123.json.gz"
+    with app.test_client() as client, \
+            patch("garganorn.__main__.send_file") as mock_send, \
+            patch("garganorn.__main__.gzip.open") as mock_open:
+        gz = client.get(url, headers={"Accept-Encoding": "gzip"})
+        plain = client.get(url)
+        not_modified = client.get(url, headers={"If-None-Match": plain.headers["ETag"]})
+    mock_send.assert_not_called()
+    mock_open.assert_not_called()
+    assert gz.status_code == 200
+    assert gz.headers["Content-Encoding"] == "gzip"
+    assert gz.data == on_disk
+    assert gz.get_etag() == ("20260101T000000-0123-gz", False)
+    assert plain.status_code == 200
+    assert plain.headers.get("Content-Encoding") is None
+    assert json.loads(plain.data)["records"][0]["value"]["name"] == "Pinned"
+    assert plain.headers.get("Cache-Control") == "public, max-age=604800, immutable"
+    assert not_modified.status_code == 304
+
+
+def test_regular_tile_not_pinned_by_default(tmp_path):
+    app, tile_file = _pinned_app(tmp_path, "012301")
+    tile_file.unlink()
+    with app.test_client() as client:
+        resp = client.get("/tiles/overture-place/20260101T000000/012301/012301.json.gz")
+    assert resp.status_code == 404
+
+
+def test_pin_prefixes_pins_tiles_under_prefix(tmp_path):
+    app, tile_file = _pinned_app(tmp_path, "012301", pin_prefixes=["0123"])
+    tile_file.unlink()
+    with app.test_client() as client:
+        resp = client.get("/tiles/overture-place/20260101T000000/012301/012301.json.gz")
+    assert resp.status_code == 200
+    assert json.loads(resp.data)["records"][0]["value"]["name"] == "Pinned"
+
+
+def test_health_not_ready_until_warm_up_done(tmp_path):
+    tiles_root = tmp_path / "overture_place" / "tiles"
+    current = _point_current(tiles_root, _make_run(tiles_root, "20260101T000000", qk="0123",
+                                                   tile_content=_tile_json("Pinned")))
+    tiles_config = _make_tile_config(tiles_dir=current,
+                                     manifest_path=current / "manifest.duckdb")
+    release = threading.Event()
+    real_pin_run = garganorn.runs.pin_run
+
+    def slow_pin_run(run, coll_cfg):
+        release.wait(10)
+        real_pin_run(run, coll_cfg)
+
+    with patch("garganorn.runs.pin_run", slow_pin_run), \
+            patch("garganorn.__main__.load_config") as mock_load:
+        mock_load.return_value = ("places.atgeo.org", tiles_config)
+        app = create_app()
+        with app.test_client() as client:
+            resp = client.get("/health")
+            assert resp.status_code == 503
+            assert resp.get_json()["status"] == "warming"
+            release.set()
+            assert app.tiles_ready.wait(10)
+            assert client.get("/health").status_code == 200
+
+
+# ---------------------------------------------------------------------------
+# /metrics
+# ---------------------------------------------------------------------------
+
+def _metric(body, line_prefix):
+    """The value of the one sample line starting with line_prefix."""
+    [line] = [l for l in body.splitlines() if l.startswith(line_prefix + " ")]
+    return float(line.rsplit(" ", 1)[1])
+
+
+def test_metrics_endpoint_reports_requests_and_caches(client):
+    client.get(f"/{OVERTURE_COLLECTION}/ov001")
+    client.get(f"/xrpc/com.atproto.repo.getRecord?repo=places.atgeo.org"
+               f"&collection={OVERTURE_COLLECTION}&rkey=ov001")
+    for _ in range(2):
+        client.get(f"/xrpc/org.atgeo.getCoverage?collection={OVERTURE_COLLECTION}"
+                   "&bbox=-122.45,37.75,-122.40,37.80")
+    client.get(f"/xrpc/org.atgeo.getCoverage?collection={OVERTURE_COLLECTION}"
+               "&bbox=-122.451,37.75,-122.40,37.80")
+    client.get("/tiles/overture-place/20260101T000000/012301/012301.json.gz",
+               headers={"Accept-Encoding": "gzip"})
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.content_type.startswith("text/plain; version=0.0.4")
+    body = resp.get_data(as_text=True)
+    assert _metric(body, 'garganorn_request_duration_seconds_count{method="getRecord"}') == 2
+    assert _metric(body, 'garganorn_request_duration_seconds_count{method="getCoverage"}') == 3
+    assert _metric(body, 'garganorn_request_duration_seconds_count{method="tile"}') == 1
+    assert _metric(body, 'garganorn_requests_total{code="400",method="getCoverage"}') == 1
+    assert _metric(body, f'garganorn_records_served_total{{collection="{OVERTURE_COLLECTION}"}}') == 2
+    assert _metric(body, 'garganorn_tile_bytes_served_total{encoding="gzip"}') > 0
+    assert _metric(body, f'garganorn_tile_cache_hits_total{{collection="{OVERTURE_COLLECTION}"}}') == 1
+    assert _metric(body, f'garganorn_tile_cache_misses_total{{collection="{OVERTURE_COLLECTION}"}}') == 1
+    assert _metric(body, "garganorn_coverage_cache_hit_ratio") == 0.5
+    assert _metric(body, 'garganorn_coverage_errors_total{error="BboxTooPrecise"}') == 1
+    assert _metric(
+        body, f'garganorn_record_lookup_seconds_count{{collection="{OVERTURE_COLLECTION}",'
+              'engine="duckdb"}') == 2
+    assert _metric(body, 'garganorn_record_filter_rejections_total'
+                         f'{{collection="{OVERTURE_COLLECTION}"}}') == 0
+    # Nothing a client sent beyond known collection names is echoed back.
+    for coordinate in ("122.45", "37.75", "122.451", "ov001", "012301"):
+        assert coordinate not in body
+
+
+def test_metrics_ignore_unserved_collection_names(client):
+    client.get("/xrpc/com.atproto.repo.getRecord?repo=places.atgeo.org"
+               "&collection=made.up.collection&rkey=x")
+    body = client.get("/metrics").get_data(as_text=True)
+    assert "made.up.collection" not in body
+
+
+def test_get_records_endpoint(client):
+    resp = client.get(f"/xrpc/org.atgeo.getRecords?collection={OVERTURE_COLLECTION}"
+                      "&rkeys=nonexistent&rkeys=ov001")
+    assert resp.status_code == 200
+    records = resp.get_json()["records"]
+    assert records[0] == {"rkey": "nonexistent", "notFound": True}
+    assert records[1]["value"]["name"] == "Blue Bottle Coffee"
+
+    body = client.get("/metrics").get_data(as_text=True)
+    assert _metric(body, 'garganorn_request_duration_seconds_count{method="getRecords"}') == 1
+    assert _metric(body, f'garganorn_records_served_total{{collection="{OVERTURE_COLLECTION}"}}') == 1
+
+
+def test_get_records_rejects_oversized_batch(client):
+    rkeys = "&".join(f"rkeys=r{i}" for i in range(101))
+    resp = client.get(f"/xrpc/org.atgeo.getRecords?collection={OVERTURE_COLLECTION}&{rkeys}")
+    assert resp.status_code == 400
+
+
+def test_overloaded_cold_path_sheds_with_503(client):
+    from garganorn.tile_reader import Overloaded
+
+    with patch("garganorn.tile_reader.TileBackedCollection._candidate_tiles",
+               side_effect=Overloaded(retry_after=2)):
+        xrpc = client.get("/xrpc/com.atproto.repo.getRecord?repo=places.atgeo.org"
+                          f"&collection={OVERTURE_COLLECTION}&rkey=ov001")
+        resource = client.get(f"/{OVERTURE_COLLECTION}/ov001")
+    for resp in (xrpc, resource):
+        assert resp.status_code == 503
+        assert resp.headers["Retry-After"] == "2"
+        assert resp.get_json()["error"] == "Overloaded"
+    # Requests that never reach the cold path are unaffected.
+    assert client.get("/xrpc/org.atgeo.getCoverage?collection="
+                      f"{OVERTURE_COLLECTION}&bbox=-122.45,37.75,-122.40,37.80").status_code == 200
+
+    body = client.get("/metrics").get_data(as_text=True)
+    assert _metric(body, 'garganorn_requests_total{code="503",method="getRecord"}') == 2
+    assert _metric(body, "garganorn_cold_path_queue_depth") == 0
+    assert _metric(body, "garganorn_cold_path_shed_total") == 0
+
+
+# ---------------------------------------------------------------------------
+# Preload-and-fork mode
+# ---------------------------------------------------------------------------
+
+def _preload_app(tmp_path, **tiles_extra):
+    tiles_root = tmp_path / "overture_place" / "tiles"
+    current = _point_current(tiles_root, _make_run(
+        tiles_root, "20260101T000000", qk="0123", tile_content=_tile_json("Preloaded")))
+    tiles_config = _make_tile_config(tiles_dir=current,
+                                     manifest_path=current / "manifest.duckdb")
+    tiles_config.update(tiles_extra)
+    with patch("garganorn.__main__.load_config") as mock_load:
+        mock_load.return_value = ("places.atgeo.org", tiles_config)
+        return create_app(preload=True)
+
+
+def test_preload_warms_up_before_returning(tmp_path):
+    with patch("garganorn.__main__.threading.Thread") as mock_thread:
+        app = _preload_app(tmp_path)
+    mock_thread.assert_not_called()
+    assert app.tiles_ready.is_set()
+    with app.test_client() as client:
+        assert client.get("/health").status_code == 200
+
+
+def test_preload_starts_run_watcher_after_fork(tmp_path):
+    with patch("garganorn.__main__.os.register_at_fork") as mock_register:
+        app = _preload_app(tmp_path, reload_interval=3600)
+    assert app.run_watcher._thread is None
+    mock_register.assert_called_once_with(after_in_child=app.run_watcher.start)
+
+
+def test_preloaded_app_serves_in_forked_child(tmp_path):
+    app = _preload_app(tmp_path)
+    with app.test_client() as client:
+        # The parent uses its DuckDB connection first, as a master would
+        # if anything touched it before forking.
+        assert client.get(f"/{OVERTURE_COLLECTION}/r1").status_code == 200
+    pid = os.fork()
+    if pid == 0:  # child: report through the exit status only
+        ok = False
+        try:
+            signal.alarm(20)
+            with app.test_client() as client:
+                resp = client.get(f"/{OVERTURE_COLLECTION}/r1")
+                ok = resp.status_code == 200 and resp.get_json()["name"] == "Preloaded"
+        finally:
+            os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
@@ -171,8 +171,8 @@ def test_url_contract_base_url_slug_and_tile_path_shape():
     # Build a TileManifest without touching DuckDB.
     tm = object.__new__(TileManifest)
     tm.base_url = base_url.rstrip("/")
-    # A quadkey that covers the whole world at zoom 0 ensures bbox always hits.
-    tm.quadkeys = {sample_qk}
+    # A whole-world bbox always hits the sample quadkey.
+    tm._build_index([sample_qk])
 
     urls = tm.get_tiles_for_bbox(-180, -90, 180, 90)
     assert len(urls) == 1, f"Expected 1 URL, got {len(urls)}: {urls}"
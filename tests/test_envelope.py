@@ -11,6 +11,11 @@ Envelope contract exercised here:
   - build_tile_payload(collection, source_url, license_url, generated_at,
     wrapped_records) -> bytes whose top-level parses to exactly {collection,
     source, license, generated_at, records}.
+  - record_value_spans(payload, wrapped_records, record_jsons) -> each
+    record's (offset, length) in payload, such that the slice parses to
+    that record's value.
+  - tile_digest(payload) -> a digest of everything in payload except
+    generated_at.
 
 Determinism, timestamp coherence, and server round-trip are covered
 end-to-end against the real stage_export/tile_reader production path in
@@ -269,3 +274,71 @@ class TestBuildTilePayload:
             name="output", val=json.loads(payload), type_name="org.atgeo.tilePayload",
             lexicon="org.atgeo.tilePayload", schema=schema,
         )
+
+
+# ---------------------------------------------------------------------------
+# record_value_spans()
+# ---------------------------------------------------------------------------
+
+class TestRecordValueSpans:
+    _COLLECTION = "org.atgeo.places.overture.place"
+
+    def _build(self, values):
+        record_jsons = [json.dumps(v, ensure_ascii=False, separators=(",", ":"))
+                        for v in values]
+        wrapped = [
+            envelope.wrap_record(
+                envelope.record_uri("places.atgeo.org", self._COLLECTION, v["rkey"]), rj)
+            for v, rj in zip(values, record_jsons)
+        ]
+        payload = envelope.build_tile_payload(
+            self._COLLECTION, "https://overturemaps.org/", "https://example.com/ü",
+            "2026-07-09T18:00:00Z", wrapped,
+        )
+        return payload, envelope.record_value_spans(payload, wrapped, record_jsons)
+
+    def test_slices_parse_to_each_value(self):
+        values = [
+            {"rkey": "ov001", "name": "Plain"},
+            {"rkey": "ov002", "name": "Café ☕ 東京"},
+            {"rkey": "node:3", "name": "quote \" and ] and }"},
+        ]
+        payload, spans = self._build(values)
+        assert len(spans) == 3
+        for value, (offset, length) in zip(values, spans):
+            assert json.loads(payload[offset:offset + length]) == value
+
+    def test_slice_is_exactly_the_embedded_record_json(self):
+        payload, spans = self._build([{"rkey": "ov001", "name": "Ünïcode"}])
+        offset, length = spans[0]
+        assert payload[offset:offset + length].decode("utf-8") == (
+            '{"rkey":"ov001","name":"Ünïcode"}'
+        )
+
+    def test_empty_tile(self):
+        payload, spans = self._build([])
+        assert spans == []
+
+
+class TestTileDigest:
+    _COLLECTION = "org.atgeo.places.overture.place"
+
+    def _payload(self, name="Plain", generated_at="2026-07-09T18:00:00Z",
+                 license_url="https://example.com/l"):
+        record_json = json.dumps({"rkey": "ov001", "name": name}, separators=(",", ":"))
+        wrapped = [envelope.wrap_record(
+            envelope.record_uri("places.atgeo.org", self._COLLECTION, "ov001"), record_json)]
+        return envelope.build_tile_payload(
+            self._COLLECTION, "https://overturemaps.org/", license_url, generated_at, wrapped)
+
+    def test_ignores_generated_at(self):
+        assert envelope.tile_digest(self._payload()) == envelope.tile_digest(
+            self._payload(generated_at="2026-08-01T00:00:00Z"))
+
+    def test_changes_with_records(self):
+        assert envelope.tile_digest(self._payload()) != envelope.tile_digest(
+            self._payload(name="Renamed"))
+
+    def test_changes_with_header(self):
+        assert envelope.tile_digest(self._payload()) != envelope.tile_digest(
+            self._payload(license_url="https://example.com/other"))
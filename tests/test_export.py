@@ -1233,6 +1233,107 @@ class TestContainmentInExport:
 # Record JSON byte-identical per source
 # ---------------------------------------------------------------------------
 
+class TestExportRendersEachRecordOnce:
+    """The export SQL renders each distinct (place, containment) pair once
+    into export_records and fans it out by reference: a division spanning
+    many tiles with the same containment is one export_records row, not one
+    per tile, and tile_export still yields a row per tile."""
+
+    def test_division_rendered_once_per_distinct_containment(self):
+        conn = duckdb.connect()
+        conn.execute("""
+            CREATE TABLE places (
+                id            VARCHAR PRIMARY KEY,
+                names         STRUCT("primary" VARCHAR),
+                importance    INTEGER,
+                min_latitude  DOUBLE, max_latitude  DOUBLE,
+                min_longitude DOUBLE, max_longitude DOUBLE,
+                variants      STRUCT(name VARCHAR, type VARCHAR, language VARCHAR)[] DEFAULT [],
+                subtype       VARCHAR, country VARCHAR, region VARCHAR,
+                level         VARCHAR, wikidata VARCHAR, population BIGINT
+            )
+        """)
+        conn.execute("""
+            INSERT INTO places VALUES (
+                'div001', {'primary': 'Test Division'}, 50, 37.60, 37.85,
+                -122.55, -122.30, [], 'region', 'US', NULL, 'region', NULL, NULL
+            )
+        """)
+        tiles = ["023130", "023131", "023132", "023133"]
+        conn.execute("CREATE TABLE tile_assignments (place_id VARCHAR, tile_qk VARCHAR)")
+        conn.executemany("INSERT INTO tile_assignments VALUES ('div001', ?)", [[t] for t in tiles])
+        other_json = json.dumps({"within": [{"rkey": "org.atgeo.places.overture.division:x"}]})
+        # Three tiles share one containment; the fourth has its own.
+        _create_place_containment(
+            conn, [("div001", t, _SF_WITHIN_JSON) for t in tiles[:3]]
+            + [("div001", tiles[3], other_json)])
+        raw_sql = _load_sql("overture_division_export_tiles.sql", {"repo": "https://example.com"})
+        conn.execute(_strip_spatial_install(_strip_memory_limit(raw_sql)))
+
+        (rendered,) = conn.execute("SELECT count(*) FROM export_records").fetchone()
+        rows = dict(conn.execute("SELECT tile_qk, record_json FROM tile_export").fetchall())
+        conn.close()
+
+        assert rendered == 2
+        assert sorted(rows) == tiles
+        assert rows["023130"] == rows["023131"] == rows["023132"]
+        assert json.loads(rows["023130"])["relations"] == json.loads(_SF_WITHIN_JSON)
+        assert json.loads(rows["023133"])["relations"] == json.loads(other_json)
+
+    def test_summary_band_place_rendered_once(self):
+        conn = duckdb.connect()
+        conn.execute("""
+            CREATE TABLE places (
+                rkey VARCHAR PRIMARY KEY, name VARCHAR, importance INTEGER,
+                latitude DOUBLE, longitude DOUBLE,
+                variants STRUCT(name VARCHAR, type VARCHAR, language VARCHAR)[] DEFAULT [],
+                primary_category VARCHAR, tags MAP(VARCHAR, VARCHAR)
+            )
+        """)
+        conn.execute("""
+            INSERT INTO places VALUES (
+                'n1', 'Test OSM Place', 50, 37.7749, -122.4194, [], NULL,
+                map([]::VARCHAR[], []::VARCHAR[])
+            )
+        """)
+        conn.execute("CREATE TABLE tile_assignments (place_id VARCHAR, tile_qk VARCHAR)")
+        conn.execute("INSERT INTO tile_assignments VALUES ('n1', '0231301230'), ('n1', '0231')")
+        _create_place_containment(conn, [])
+        conn.execute(_strip_spatial_install(_strip_memory_limit(_load_sql("osm_export_tiles.sql", {}))))
+
+        (rendered,) = conn.execute("SELECT count(*) FROM export_records").fetchone()
+        rows = conn.execute("SELECT rkey, record_json FROM tile_export").fetchall()
+        conn.close()
+
+        assert rendered == 1
+        assert len(rows) == 2 and rows[0] == rows[1]
+        assert rows[0][0] == "node:1"
+        assert json.loads(rows[0][1])["relations"] == {}
+
+
+    def test_stage_export_evaluates_tile_export_once(self, tmp_path, monkeypatch):
+        """Only pass 1 reads tile_export; collection.json's attribute keys
+        come from the already-rendered export_records, and no separate
+        tile-count scan runs before pass 1."""
+        import os, time
+        from garganorn.stages import stage_export
+        import garganorn.stages as stages_module
+
+        assignments = [(f"once{i}", "0110000000") for i in range(3)] + [("once9", "0110")]
+        places_pq, ta_pq = _build_overture_tiles_fixture(tmp_path, assignments, "once")
+        containment_dir = _build_containment_dir(tmp_path, "cd_once")
+        sql_log = spy_on_duckdb_connect(monkeypatch, stages_module)
+
+        run_dir = stage_export("overture_place", places_pq, ta_pq, containment_dir,
+                               str(tmp_path / "tiles"), time.monotonic())
+
+        assert len([s for s in sql_log if "FROM tile_export" in s]) == 1
+        assert not any("COUNT(DISTINCT tile_qk)" in s for s in sql_log)
+        with open(os.path.join(run_dir, "collection.json")) as f:
+            attributes = json.load(f)["attributes"]
+        assert "id" in attributes and "name" not in attributes
+
+
 class TestExportRecordParityPhase2:
     """stage_export takes places/tile_assignments parquet paths, not a
     connection, and two forced exports from the same artifacts produce
@@ -2020,6 +2121,97 @@ class TestBatchedExportPartitioning:
         # '012344', '019876'
         _assert_two_pass_query_shape(sql_log, expected_partitions=3)
 
+    def test_concurrent_partitions_match_sequential(self, tmp_path, monkeypatch):
+        """export_partition_workers > 1 sorts partitions on connections of
+        their own, each with an equal share of memory_limit, and records them
+        in partition order: tiles, manifest.duckdb and manifest.idx come out
+        byte-identical to the sequential export's."""
+        import os, time
+        from datetime import datetime, timezone
+        from pathlib import Path
+        from garganorn.stages import stage_export
+        import garganorn.stages as stages_module
+
+        assignments = [(f"p{t}_{r}", qk)
+                       for t, qk in enumerate(["0110000000", "0110001111", "0110020000",
+                                               "0120000000", "0130000000"])
+                       for r in range(t + 1)]
+        places_pq, ta_pq = _build_overture_tiles_fixture(tmp_path, assignments, "conc")
+        containment_dir = _build_containment_dir(tmp_path, "cd_conc")
+        fixed_now = datetime(2026, 7, 1, tzinfo=timezone.utc)
+
+        def export(name, **kw):
+            return stage_export(
+                "overture_place", places_pq, ta_pq, containment_dir, str(tmp_path / name),
+                time.monotonic(), export_partition_zoom=6, memory_limit="3GB",
+                now=fixed_now, **kw,
+            )
+
+        sequential = export("seq")
+        sql_log = spy_on_duckdb_connect(monkeypatch, stages_module)
+        concurrent = export("conc", export_partition_workers=3)
+
+        def files(run_dir):
+            return {str(p.relative_to(run_dir)): p.read_bytes()
+                    for p in Path(run_dir).rglob("*") if p.suffix in (".gz", ".idx")}
+
+        assert files(concurrent) == files(sequential)
+        tiles = []
+        for run_dir in (sequential, concurrent):
+            con = duckdb.connect(os.path.join(run_dir, "manifest.duckdb"), read_only=True)
+            tiles.append(con.execute("SELECT * FROM tiles ORDER BY tile_qk").fetchall())
+            con.close()
+        assert tiles[0] == tiles[1]
+        assert len(tiles[0]) == 5
+        assert sql_log.count("SET memory_limit = '1000000000B'") == 3
+        _assert_two_pass_query_shape(sql_log, expected_partitions=4)
+
+    def test_duckdb_engine_matches_python_engine(self, tmp_path):
+        """export_engine="duckdb" composes each tile's records array in the
+        partition query; tiles, manifest.idx and the tiles table must be
+        byte-identical to the per-record Python path's."""
+        import os, time
+        from datetime import datetime, timezone
+        from pathlib import Path
+        from garganorn.stages import stage_export
+
+        assignments = ([(f"e{i}", "0110000000") for i in range(4)]
+                       + [("e9", "0110020000"), ("e8", "0123")])
+        places_pq, ta_pq = _build_overture_tiles_fixture(tmp_path, assignments, "eng")
+        containment_dir = _build_containment_dir(tmp_path, "cd_eng")
+        fixed_now = datetime(2026, 7, 1, tzinfo=timezone.utc)
+
+        def export(name, engine):
+            return stage_export(
+                "overture_place", places_pq, ta_pq, containment_dir, str(tmp_path / name),
+                time.monotonic(), export_partition_zoom=6, now=fixed_now,
+                export_engine=engine,
+            )
+
+        python_run = export("py", "python")
+        duckdb_run = export("db", "duckdb")
+
+        def files(run_dir):
+            return {str(p.relative_to(run_dir)): p.read_bytes()
+                    for p in Path(run_dir).rglob("*") if p.suffix in (".gz", ".idx")}
+
+        assert len(files(python_run)) == 4
+        assert files(duckdb_run) == files(python_run)
+        tiles = []
+        for run_dir in (python_run, duckdb_run):
+            con = duckdb.connect(os.path.join(run_dir, "manifest.duckdb"), read_only=True)
+            tiles.append(con.execute("SELECT * FROM tiles ORDER BY tile_qk").fetchall())
+            con.close()
+        assert tiles[0] == tiles[1]
+
+    def test_unknown_engine_rejected(self, tmp_path):
+        import time
+        from garganorn.stages import stage_export
+
+        with pytest.raises(ValueError, match="export_engine"):
+            stage_export("overture_place", "p.parquet", "ta.parquet", str(tmp_path),
+                         str(tmp_path / "tiles"), time.monotonic(), export_engine="rust")
+
     def test_partition_boundary_flush_no_leak_no_duplicate(self, tmp_path, monkeypatch):
         """Input spans two partitions ('011000' and '011002', with the empty
         '011001' between them) where the last tile of the first partition
@@ -2265,6 +2457,77 @@ _EXPLAIN_ORDER_BY_OP = "ORDER_BY"
 _EXPLAIN_MERGE_JOIN_OP = "PIECEWISE_MERGE_JOIN"
 
 
+class TestIncrementalExport:
+    """A tile whose content matches the previous run's is hardlinked from
+    it instead of rewritten; manifest.duckdb records every tile's digest."""
+
+    _TILES = ["0231010101", "0231010102", "0231010103"]
+
+    def _export(self, tmp_path, tiles_root, assignments, name, day):
+        import time
+        from datetime import datetime, timezone
+        from garganorn.stages import stage_export
+
+        places_pq, ta_pq = _build_overture_tiles_fixture(tmp_path, assignments, name)
+        containment_dir = _build_containment_dir(tmp_path, f"cd_{name}")
+        return stage_export("overture_place", places_pq, ta_pq, containment_dir, tiles_root,
+                            time.monotonic(), force=True,
+                            now=datetime(2026, 7, day, tzinfo=timezone.utc))
+
+    def test_unchanged_tiles_hardlinked_from_previous_run(self, tmp_path):
+        import os
+
+        tiles_root = str(tmp_path / "tiles")
+        assignments = [(f"inc{t}{r}", qk) for t, qk in enumerate(self._TILES) for r in range(2)]
+        run_a = self._export(tmp_path, tiles_root, assignments, "a", 1)
+        # Run b adds a record to the last tile only.
+        run_b = self._export(tmp_path, tiles_root, assignments + [("inc29", self._TILES[2])],
+                             "b", 2)
+
+        def tile(run_dir, qk):
+            return os.path.join(run_dir, qk[:6], f"{qk}.json.gz")
+
+        for qk in self._TILES[:2]:
+            assert os.path.samefile(tile(run_a, qk), tile(run_b, qk))
+        assert not os.path.samefile(tile(run_a, self._TILES[2]), tile(run_b, self._TILES[2]))
+        with gzip.open(tile(run_b, self._TILES[0]), "rt") as f:
+            assert json.load(f)["generated_at"] == "2026-07-01T00:00:00Z"
+        with gzip.open(tile(run_b, self._TILES[2]), "rt") as f:
+            assert json.load(f)["generated_at"] == "2026-07-02T00:00:00Z"
+
+        from garganorn.tile_reader import TileBackedCollection
+        col = TileBackedCollection("c", os.path.join(run_b, "manifest.duckdb"), run_b,
+                                   "s", "l", record_index="mmap")
+        for rkey, _ in assignments:
+            assert col.get_record("r", "c", rkey)["rkey"] == rkey
+
+    def test_manifest_records_digests(self, tmp_path):
+        import os
+        from garganorn import envelope
+
+        tiles_root = str(tmp_path / "tiles")
+        run_dir = self._export(tmp_path, tiles_root, [("inc00", self._TILES[0])], "a", 1)
+        con = duckdb.connect(os.path.join(run_dir, "manifest.duckdb"), read_only=True)
+        (digest,) = con.execute("SELECT digest FROM tiles").fetchone()
+        con.close()
+        qk = self._TILES[0]
+        with gzip.open(os.path.join(run_dir, qk[:6], f"{qk}.json.gz"), "rb") as f:
+            assert envelope.tile_digest(f.read()) == digest
+
+    def test_previous_run_without_digests_rewrites_everything(self, tmp_path):
+        import os
+
+        tiles_root = str(tmp_path / "tiles")
+        assignments = [("inc00", self._TILES[0])]
+        run_a = self._export(tmp_path, tiles_root, assignments, "a", 1)
+        con = duckdb.connect(os.path.join(run_a, "manifest.duckdb"))
+        con.execute("ALTER TABLE tiles DROP COLUMN digest")
+        con.close()
+        run_b = self._export(tmp_path, tiles_root, assignments, "b", 2)
+        qk = self._TILES[0]
+        assert os.stat(os.path.join(run_b, qk[:6], f"{qk}.json.gz")).st_nlink == 1
+
+
 class TestExportPlanShape:
     """Pins the query-plan shape of the pass-1 SELECT off tile_export: no
     ORDER_BY and no PIECEWISE_MERGE_JOIN. Peak spill is bounded by one
@@ -5,6 +5,7 @@ from unittest.mock import MagicMock
 import pytest
 from lexrpc.base import XrpcError
 
+from garganorn.runs import Run
 from garganorn.server import Server
 
 OVERTURE_COLLECTION = "org.atgeo.places.overture.place"
@@ -103,6 +104,74 @@ class TestGetCoverage:
         )
 
 
+class TestCoverageCache:
+    def test_repeat_bbox_skips_tile_walk(self):
+        manifest = _make_mock_manifest()
+        server = _make_server(tile_manifests={OVERTURE_COLLECTION: manifest})
+        first = server.get_coverage({}, collection=OVERTURE_COLLECTION, bbox="-122.55,37.60,-122.30,37.85")
+        # Same grid point spelled differently is the same key.
+        second = server.get_coverage({}, collection=OVERTURE_COLLECTION, bbox="-122.55,37.6,-122.3,37.85")
+        assert first == second == {"tiles": sorted(SAMPLE_TILES)}
+        manifest.get_tiles_for_bbox.assert_called_once()
+        stats = server.coverage_cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+    def test_bbox_too_large_is_cached(self):
+        from garganorn.quadtree import BboxTooLarge
+        manifest = _make_mock_manifest(raises=BboxTooLarge)
+        server = _make_server(tile_manifests={OVERTURE_COLLECTION: manifest})
+        for _ in range(2):
+            with pytest.raises(XrpcError) as exc_info:
+                server.get_coverage({}, collection=OVERTURE_COLLECTION, bbox="-180,-85,180,85")
+            assert exc_info.value.name == "BboxTooLarge"
+        manifest.get_tiles_for_bbox.assert_called_once()
+
+    def test_response_list_is_not_shared(self):
+        server = _make_server(tile_manifests={OVERTURE_COLLECTION: _make_mock_manifest()})
+        server.get_coverage({}, collection=OVERTURE_COLLECTION, bbox="-180,-85,180,85")["tiles"].clear()
+        assert server.get_coverage(
+            {}, collection=OVERTURE_COLLECTION, bbox="-180,-85,180,85")["tiles"] == sorted(SAMPLE_TILES)
+
+    def test_swap_run_invalidates(self):
+        old = _make_mock_manifest(tiles=["https://tiles.example.com/old.json.gz"])
+        new = _make_mock_manifest(tiles=["https://tiles.example.com/new.json.gz"])
+        server = _make_server(tile_manifests={OVERTURE_COLLECTION: old})
+        server.get_coverage({}, collection=OVERTURE_COLLECTION, bbox="-180,-85,180,85")
+        server.swap_run(Run(OVERTURE_COLLECTION, "/runs/20260102T000000", new))
+        assert server.coverage_cache.stats()["entries"] == 0
+        result = server.get_coverage({}, collection=OVERTURE_COLLECTION, bbox="-180,-85,180,85")
+        assert result == {"tiles": ["https://tiles.example.com/new.json.gz"]}
+
+    def test_entry_from_replaced_manifest_is_a_miss(self):
+        """An outcome stored by a request that raced a swap is never served."""
+        old = _make_mock_manifest(tiles=["https://tiles.example.com/old.json.gz"])
+        new = _make_mock_manifest(tiles=["https://tiles.example.com/new.json.gz"])
+        server = _make_server(tile_manifests={OVERTURE_COLLECTION: old})
+        server.get_coverage({}, collection=OVERTURE_COLLECTION, bbox="-180,-85,180,85")
+        server.tile_manifests[OVERTURE_COLLECTION] = new
+        result = server.get_coverage({}, collection=OVERTURE_COLLECTION, bbox="-180,-85,180,85")
+        assert result == {"tiles": ["https://tiles.example.com/new.json.gz"]}
+
+    def test_lru_eviction_and_disable(self):
+        manifest = _make_mock_manifest()
+        server = Server("places.atgeo.org", logging.getLogger("test"),
+                        tile_manifests={OVERTURE_COLLECTION: manifest},
+                        coverage_cache_entries=1)
+        for bbox in ("-180,-85,180,85", "-10,-10,10,10", "-180,-85,180,85"):
+            server.get_coverage({}, collection=OVERTURE_COLLECTION, bbox=bbox)
+        assert manifest.get_tiles_for_bbox.call_count == 3
+        assert server.coverage_cache.stats()["entries"] == 1
+
+        manifest = _make_mock_manifest()
+        server = Server("places.atgeo.org", logging.getLogger("test"),
+                        tile_manifests={OVERTURE_COLLECTION: manifest},
+                        coverage_cache_entries=0)
+        for _ in range(2):
+            server.get_coverage({}, collection=OVERTURE_COLLECTION, bbox="-180,-85,180,85")
+        assert manifest.get_tiles_for_bbox.call_count == 2
+        assert server.coverage_cache.stats()["entries"] == 0
+
+
 class TestBboxPrecision:
     """Tests for BboxTooPrecise validation in get_coverage.
 
@@ -0,0 +1,38 @@
+"""Serving workers must not import the export pipeline.
+
+Checked in a fresh interpreter, since this test process has long since
+imported everything."""
+import json
+import subprocess
+import sys
+
+# Everything a gunicorn worker imports to serve.
+_SERVING = ("garganorn.__main__", "garganorn.runs", "garganorn.manifest",
+            "garganorn.tile_reader", "garganorn.server")
+_PIPELINE = ("garganorn.stages", "garganorn.quadtree", "garganorn.covering",
+             "garganorn.database", "garganorn.levels", "argparse")
+
+
+def _modules_after_import(*modules):
+    code = (f"import sys\nfor m in {list(modules)!r}: __import__(m)\n"
+            "import json; print(json.dumps(sorted(sys.modules)))")
+    out = subprocess.run([sys.executable, "-c", code], check=True,
+                         capture_output=True, text=True).stdout
+    return set(json.loads(out))
+
+
+def test_serving_imports_no_pipeline_modules():
+    loaded = _modules_after_import(*_SERVING)
+    assert loaded.isdisjoint(_PIPELINE), sorted(loaded & set(_PIPELINE))
+
+
+def test_pipeline_names_still_reachable():
+    import garganorn
+    from garganorn.quadtree import BboxTooLarge, TileManifest
+    from garganorn.stages import bboxes_intersect, quadkey_to_bbox
+    from garganorn import manifest, quadkey
+
+    assert garganorn.OverturePlaces.source_key == "overture_place"
+    assert (TileManifest, BboxTooLarge) == (manifest.TileManifest, manifest.BboxTooLarge)
+    assert (quadkey_to_bbox, bboxes_intersect) == (quadkey.quadkey_to_bbox,
+                                                    quadkey.bboxes_intersect)
@@ -0,0 +1,85 @@
+"""Tests for scripts/loadtest.py: the synthetic run it builds is one the
+server serves, and its report arithmetic."""
+import os
+import sys
+import threading
+
+import duckdb
+import pytest
+
+_SCRIPTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts")
+if _SCRIPTS not in sys.path:
+    sys.path.insert(0, _SCRIPTS)
+
+import loadtest  # noqa: E402
+
+from garganorn.tile_reader import TileBackedCollection  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def fixture_run(tmp_path_factory):
+    workdir = str(tmp_path_factory.mktemp("loadtest"))
+    current = loadtest.build_fixture(workdir, n_tiles=40, records_per_tile=3, seed=7)
+    return workdir, current
+
+
+def test_fixture_is_a_complete_run(fixture_run):
+    _, current = fixture_run
+    for name in ("manifest.duckdb", "manifest.json", "manifest.idx"):
+        assert os.path.isfile(os.path.join(current, name))
+    con = duckdb.connect(os.path.join(current, "manifest.duckdb"), read_only=True)
+    try:
+        n_regular = con.execute("SELECT count(*) FROM tiles WHERE length(tile_qk) = 12").fetchone()[0]
+        rows = con.execute("SELECT rkey, tile_qk FROM record_tiles ORDER BY rkey LIMIT 5").fetchall()
+    finally:
+        con.close()
+    assert n_regular == 40
+    records = TileBackedCollection(
+        loadtest.COLLECTION, os.path.join(current, "manifest.duckdb"), current,
+        "https://example.com", "https://example.com", record_index="mmap")
+    for rkey, _ in rows:
+        assert records.get_record(None, loadtest.COLLECTION, rkey)["rkey"] == rkey
+
+
+def test_fixture_reused_when_parameters_match(fixture_run):
+    workdir, current = fixture_run
+    assert loadtest.build_fixture(workdir, n_tiles=40, records_per_tile=3, seed=7) == current
+    with pytest.raises(SystemExit):
+        loadtest.build_fixture(workdir, n_tiles=41, records_per_tile=3, seed=7)
+
+
+def test_plan_is_seeded(fixture_run):
+    _, current = fixture_run
+    weights = loadtest.parse_mix(loadtest.DEFAULT_MIX)
+    plan = loadtest.build_plan(current, 200, weights, seed=3)
+    assert plan == loadtest.build_plan(current, 200, weights, seed=3)
+    assert {kind for kind, _, _ in plan} == set(loadtest.KINDS)
+
+
+def test_load_run_against_app(fixture_run, monkeypatch):
+    from werkzeug.serving import make_server
+    from garganorn.__main__ import create_app
+
+    workdir, current = fixture_run
+    monkeypatch.setenv("GARGANORN_CONFIG", loadtest.write_config(workdir, current))
+    app = create_app()
+    assert app.tiles_ready.wait(10)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        plan = loadtest.build_plan(current, 200, loadtest.parse_mix(loadtest.DEFAULT_MIX))
+        report = loadtest.summarize(*loadtest.run_load(
+            f"http://127.0.0.1:{server.server_port}", plan, concurrency=4))
+    finally:
+        server.shutdown()
+    assert report["all"]["count"] == 200
+    assert report["all"]["errors"] == 0
+    assert report["all"]["p50_ms"] <= report["all"]["p95_ms"] <= report["all"]["p99_ms"]
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert loadtest.percentile(values, 50) == 50
+    assert loadtest.percentile(values, 99) == 99
+    assert loadtest.percentile([5], 95) == 5
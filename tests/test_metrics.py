@@ -0,0 +1,50 @@
+"""Tests for garganorn.metrics' Prometheus text rendering."""
+import math
+
+from garganorn.metrics import Counter, Histogram, Registry
+
+
+def test_counter_by_labels():
+    c = Counter()
+    c.inc(method="getRecord")
+    c.inc(2, method="getRecord")
+    c.inc(method="tile")
+    assert c.value(method="getRecord") == 3
+    assert c.value(method="getCoverage") == 0
+    assert list(c.samples()) == [
+        ("", {"method": "getRecord"}, 3), ("", {"method": "tile"}, 1)]
+
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram(buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 5.0):
+        h.observe(v, method="tile")
+    assert h.count(method="tile") == 3
+    assert list(h.samples()) == [
+        ("_bucket", {"method": "tile", "le": 0.1}, 1),
+        ("_bucket", {"method": "tile", "le": 1.0}, 2),
+        ("_bucket", {"method": "tile", "le": math.inf}, 3),
+        ("_sum", {"method": "tile"}, 5.55),
+        ("_count", {"method": "tile"}, 3),
+    ]
+
+
+def test_render_text_format():
+    registry = Registry()
+    registry.counter("x_total", "Things.").inc(code="200")
+    registry.histogram("lat_seconds", "Latency.", buckets=(1.0,)).observe(0.25)
+    registry.collector(lambda: [("g", "gauge", "A gauge.", [("", {"q": 'a"b\\'}, 0.5)])])
+    assert registry.render() == "\n".join([
+        "# HELP x_total Things.",
+        "# TYPE x_total counter",
+        'x_total{code="200"} 1',
+        "# HELP lat_seconds Latency.",
+        "# TYPE lat_seconds histogram",
+        'lat_seconds_bucket{le="1"} 1',
+        'lat_seconds_bucket{le="+Inf"} 1',
+        "lat_seconds_sum 0.25",
+        "lat_seconds_count 1",
+        "# HELP g A gauge.",
+        "# TYPE g gauge",
+        'g{q="a\\"b\\\\"} 0.5',
+    ]) + "\n"
@@ -0,0 +1,62 @@
+"""Tests for garganorn.quadkey: the packed 64-bit quadint encoding."""
+import itertools
+import random
+
+import pytest
+
+from garganorn.quadkey import (
+    MAX_ZOOM,
+    pack_quadkey,
+    packed_zoom,
+    subtree_range,
+    unpack_quadkey,
+)
+
+
+def _random_quadkeys(n, seed=7):
+    rng = random.Random(seed)
+    return {"".join(rng.choice("0123") for _ in range(rng.randint(1, 17)))
+            for _ in range(n)}
+
+
+class TestPackQuadkey:
+    def test_round_trip(self):
+        for qk in _random_quadkeys(2000) | {"", "0", "3", "3" * MAX_ZOOM}:
+            assert unpack_quadkey(pack_quadkey(qk)) == qk
+
+    def test_fits_in_64_bits(self):
+        assert pack_quadkey("3" * MAX_ZOOM) < 2 ** 64
+
+    def test_integer_order_is_string_order(self):
+        """Sorting quadints must sort quadkeys exactly as str does -- the
+        property every bisect over a packed manifest depends on."""
+        qks = sorted(_random_quadkeys(2000) | {"0", "00", "000000", "0000001", "1"})
+        assert sorted(qks, key=pack_quadkey) == qks
+
+    def test_packed_zoom_is_length(self):
+        for qk in ("", "2", "023010", "12021302232332100"):
+            assert packed_zoom(pack_quadkey(qk)) == len(qk)
+
+    def test_rejects_too_deep(self):
+        with pytest.raises(ValueError):
+            pack_quadkey("0" * (MAX_ZOOM + 1))
+
+    @pytest.mark.parametrize("bad", ["4", "01a", " 01", "0_1", "-1", "+1"])
+    def test_rejects_non_quadkey_strings(self, bad):
+        with pytest.raises(ValueError):
+            pack_quadkey(bad)
+
+
+class TestSubtreeRange:
+    def test_contains_exactly_the_descendants(self):
+        qks = sorted(_random_quadkeys(500)
+                     | {"".join(p) for p in itertools.product("0123", repeat=3)})
+        for prefix in ("", "0", "13", "230", "3333"):
+            lo, hi = subtree_range(prefix)
+            inside = {qk for qk in qks if lo <= pack_quadkey(qk) < hi}
+            assert inside == {qk for qk in qks if qk.startswith(prefix)}
+
+    def test_root_covers_everything(self):
+        lo, hi = subtree_range("")
+        assert lo == 0
+        assert pack_quadkey("3" * MAX_ZOOM) < hi
@@ -7,9 +7,13 @@ import os
 import subprocess
 import sys
 
+from array import array
+
 import duckdb
 import pytest
 
+from garganorn.quadkey import pack_quadkey
+from garganorn.record_index import INDEX_FILENAME, write_index_file
 from garganorn.quadtree import (
     BboxTooLarge,
     TileManifest,
@@ -289,6 +293,176 @@ class TestSummaryFallback:
         )
 
 
+class TestTileManifestTilesTable:
+    """TileManifest loads from manifest.duckdb's per-tile `tiles` table when
+    the run has one, and falls back to record_tiles when it does not."""
+
+    def test_prefers_tiles_table(self, tmp_path):
+        path = _make_manifest_db(tmp_path, quadkeys=["023010"])
+        con = duckdb.connect(str(path))
+        con.execute(
+            "CREATE TABLE tiles (tile_qk VARCHAR, record_count BIGINT, "
+            "compressed_bytes BIGINT, uncompressed_bytes BIGINT)"
+        )
+        con.execute("INSERT INTO tiles VALUES ('120301', 1, 10, 20)")
+        con.close()
+
+        tm = TileManifest(str(path), _BASE_URL)
+        assert list(tm) == ["120301"]
+
+    def test_falls_back_to_record_tiles(self, tmp_path):
+        path = _make_manifest_db(tmp_path, quadkeys=["023010", "023010", "120301"])
+        tm = TileManifest(str(path), _BASE_URL)
+        assert list(tm) == ["023010", "120301"]
+
+
+class TestTileManifestIndexFile:
+    """A run with a manifest.idx sidecar serves its tile list from the
+    mapped file instead of querying manifest.duckdb."""
+
+    def _write_idx(self, tmp_path, quadkeys):
+        write_index_file(str(tmp_path / INDEX_FILENAME),
+                         array("Q", sorted(map(pack_quadkey, quadkeys))), 0, [])
+
+    def test_prefers_index_file(self, tmp_path):
+        path = _make_manifest_db(tmp_path, quadkeys=["023010"])
+        self._write_idx(tmp_path, ["120301", "120302"])
+        tm = TileManifest(str(path), _BASE_URL)
+        assert list(tm) == ["120301", "120302"]
+        assert "120302" in tm
+        assert not tm.has_summary_band
+
+    def test_summary_band_detected(self, tmp_path):
+        path = _make_manifest_db(tmp_path)
+        self._write_idx(tmp_path, _MANIFEST_QUADKEYS + ["0230"])
+        tm = TileManifest(str(path), _BASE_URL)
+        assert tm.has_summary_band
+        assert tm.count_prefix("0230") == 1 + sum(
+            qk.startswith("0230") for qk in _MANIFEST_QUADKEYS)
+
+    def test_same_answers_as_duckdb(self, tmp_path):
+        path = _make_manifest_db(tmp_path)
+        from_db = TileManifest(str(path), _BASE_URL)
+        self._write_idx(tmp_path, _MANIFEST_QUADKEYS)
+        from_idx = TileManifest(str(path), _BASE_URL)
+        bbox = quadkey_to_bbox("023010")
+        assert from_idx.get_tiles_for_bbox(*bbox) == from_db.get_tiles_for_bbox(*bbox)
+
+
+class TestTileManifestQueries:
+    """Membership and prefix-range queries over the packed quadkey array."""
+
+    def test_len_and_iteration_are_sorted_quadkeys(self, tmp_path):
+        path = _make_manifest_db(tmp_path)
+        tm = TileManifest(str(path), _BASE_URL)
+        assert len(tm) == len(_MANIFEST_QUADKEYS)
+        assert list(tm) == sorted(_MANIFEST_QUADKEYS)
+
+    def test_membership(self, tmp_path):
+        path = _make_manifest_db(tmp_path, quadkeys=_MANIFEST_QUADKEYS + ["0"])
+        tm = TileManifest(str(path), _BASE_URL)
+        assert "023010" in tm
+        assert "0" in tm
+        assert "02301" not in tm
+        assert "0230100" not in tm
+        assert "not-a-quadkey" not in tm
+
+    def test_count_prefix(self, tmp_path):
+        path = _make_manifest_db(tmp_path, quadkeys=_MANIFEST_QUADKEYS + ["0"])
+        tm = TileManifest(str(path), _BASE_URL)
+        assert tm.count_prefix("") == 5
+        assert tm.count_prefix("0") == 3
+        assert tm.count_prefix("02301") == 2
+        assert tm.count_prefix("3") == 0
+
+    def test_summary_tiles(self, tmp_path):
+        path = _make_manifest_db(tmp_path, quadkeys=_MANIFEST_QUADKEYS + ["0", "31", "02301"])
+        tm = TileManifest(str(path), _BASE_URL)
+        assert tm.summary_tiles() == ["0", "02301", "31"]
+
+    def test_tiles_with_prefix(self, tmp_path):
+        path = _make_manifest_db(tmp_path, quadkeys=_MANIFEST_QUADKEYS + ["0"])
+        tm = TileManifest(str(path), _BASE_URL)
+        assert tm.tiles_with_prefix("0") == [qk for qk in list(tm) if qk.startswith("0")]
+        assert tm.tiles_with_prefix("02301") == sorted(
+            qk for qk in _MANIFEST_QUADKEYS if qk.startswith("02301"))
+        assert tm.tiles_with_prefix("3") == []
+
+
+# ---------------------------------------------------------------------------
+# The bbox walk prunes by subtree and stops at the budget.
+# ---------------------------------------------------------------------------
+
+def _brute_force_urls(quadkeys, bbox, max_tiles):
+    """The pre-index reference answer: test every quadkey's own envelope."""
+    regular = [qk for qk in quadkeys
+               if len(qk) >= 6 and bboxes_intersect(quadkey_to_bbox(qk), bbox)]
+    if len(regular) <= max_tiles:
+        return {f"{_BASE_URL}/{qk[:6]}/{qk}.json.gz" for qk in regular}
+    summary = [qk for qk in quadkeys if len(qk) < 6]
+    if not summary:
+        return None
+    return {f"{_BASE_URL}/{qk[:6]}/{qk}.json.gz" for qk in summary
+            if bboxes_intersect(quadkey_to_bbox(qk), bbox)}
+
+
+def _bare_manifest(quadkeys):
+    tm = object.__new__(TileManifest)
+    tm.base_url = _BASE_URL
+    tm._build_index(quadkeys)
+    return tm
+
+
+class TestTileManifestWalk:
+    def test_matches_brute_force_scan(self):
+        """The pruned walk returns exactly what a scan of every quadkey
+        returns, across nested keys, both bands, and antimeridian bboxes."""
+        import random
+        rng = random.Random(1234)
+        quadkeys = set()
+        for _ in range(600):
+            quadkeys.add("".join(rng.choice("0123") for _ in range(rng.randint(6, 12))))
+        for _ in range(20):
+            quadkeys.add("".join(rng.choice("0123") for _ in range(rng.randint(1, 5))))
+        # A tile and its own descendants both present.
+        quadkeys.update(["023010", "0230101", "02301012"])
+        tm = _bare_manifest(quadkeys)
+
+        bboxes = [(-180, -85, 180, 85), (170.0, -10.0, -170.0, 10.0), (5.0, 86.0, 15.0, 89.0)]
+        for _ in range(200):
+            x0 = rng.uniform(-180, 180)
+            y0 = rng.uniform(-85, 80)
+            bboxes.append((x0, y0, min(x0 + rng.uniform(0.01, 40), 180),
+                           y0 + rng.uniform(0.01, 5)))
+        for bbox in bboxes:
+            for max_tiles in (0, 3, 50, 10_000):
+                expected = _brute_force_urls(quadkeys, bbox, max_tiles)
+                if expected is None:
+                    with pytest.raises(BboxTooLarge):
+                        tm.get_tiles_for_bbox(*bbox, max_tiles=max_tiles)
+                    continue
+                urls = tm.get_tiles_for_bbox(*bbox, max_tiles=max_tiles)
+                assert len(urls) == len(set(urls))
+                assert set(urls) == expected, (bbox, max_tiles)
+
+    def test_oversized_bbox_stops_at_budget(self):
+        """A bbox over every tile of a dense manifest raises after visiting
+        about max_tiles tiles' worth of the tree, not the whole manifest."""
+        import itertools
+        from unittest.mock import patch
+        import garganorn.quadtree as quadtree
+        quadkeys = ["".join(p) for p in itertools.product("0123", repeat=6)]
+        tm = _bare_manifest(quadkeys)
+
+        with patch.object(quadtree, "quadkey_to_bbox", wraps=quadkey_to_bbox) as spy:
+            with pytest.raises(BboxTooLarge):
+                tm.get_tiles_for_bbox(-180, -85, 180, 85, max_tiles=10)
+        assert spy.call_count < 100, (
+            f"walk evaluated {spy.call_count} envelopes for a 10-tile budget "
+            f"over {len(quadkeys)} tiles"
+        )
+
+
 class TestAcquireBuildLock:
     """_acquire_build_lock guards concurrent `quadtree all` runs with an
     OS-level flock, so a killed holder can never wedge the next run."""
@@ -0,0 +1,135 @@
+"""Tests for garganorn.record_index: the in-memory rkey -> tile lookup."""
+from array import array
+
+import duckdb
+import pytest
+
+from garganorn.quadkey import pack_quadkey
+from garganorn.record_index import RecordIndex, rkey_hash, write_index_file
+
+
+def _make_manifest_db(tmp_path, entries):
+    p = tmp_path / "manifest.duckdb"
+    con = duckdb.connect(str(p))
+    con.execute("CREATE TABLE record_tiles (rkey VARCHAR, tile_qk VARCHAR)")
+    if entries:
+        con.executemany("INSERT INTO record_tiles VALUES (?, ?)", entries)
+    con.close()
+    return p
+
+
+class TestRkeyHash:
+    def test_matches_duckdb_md5_number_upper(self):
+        """Python and SQL must hash alike, or an index built in DuckDB
+        would miss every lookup hashed in Python."""
+        rkeys = ["place001", "node:10080395917", "08f2a1e0-ünïcode", ""]
+        con = duckdb.connect()
+        for rkey in rkeys:
+            (expected,) = con.execute("SELECT md5_number_upper(?)", [rkey]).fetchone()
+            assert rkey_hash(rkey) == expected
+
+    def test_fits_in_64_bits(self):
+        assert 0 <= rkey_hash("node:1") < 2 ** 64
+
+
+class TestRecordIndex:
+    def test_lookup_from_manifest_db(self, tmp_path):
+        entries = [("place001", "023010"), ("place002", "120301"),
+                   ("place003", "023010"), ("node:42", "0")]
+        index = RecordIndex.from_manifest_db(str(_make_manifest_db(tmp_path, entries)))
+        assert len(index) == 4
+        for rkey, qk in entries:
+            assert list(index.lookup(rkey)) == [(qk, None)]
+
+    def test_unknown_rkey_yields_nothing(self, tmp_path):
+        index = RecordIndex.from_manifest_db(
+            str(_make_manifest_db(tmp_path, [("place001", "023010")])))
+        assert list(index.lookup("nonexistent")) == []
+
+    def test_multi_tile_rkey_yields_every_tile(self, tmp_path):
+        """A division referenced from several tiles has one entry per tile."""
+        entries = [("div1", "023010"), ("div1", "023011"), ("div1", "02")]
+        index = RecordIndex.from_manifest_db(str(_make_manifest_db(tmp_path, entries)))
+        assert sorted(qk for qk, _ in index.lookup("div1")) == ["02", "023010", "023011"]
+
+    def test_empty_manifest(self, tmp_path):
+        index = RecordIndex.from_manifest_db(str(_make_manifest_db(tmp_path, [])))
+        assert len(index) == 0
+        assert list(index.lookup("place001")) == []
+
+    def test_hash_collision_yields_both_candidates(self):
+        """Two rkeys sharing a hash both surface as candidates; the caller
+        tells them apart by reading the tile."""
+        h = rkey_hash("place001")
+        index = RecordIndex(
+            tiles=array("Q", [pack_quadkey("023010"), pack_quadkey("120301")]),
+            hashes=array("Q", [h, h]),
+            ordinals=array("I", [0, 1]),
+        )
+        assert list(index.lookup("place001")) == [("023010", None), ("120301", None)]
+
+
+def _write_index(path, tiles, entries):
+    """entries: (rkey, tile_qk, (offset, length)); writes them the way
+    stage_export does -- tiles sorted, rows in (hash, ordinal) order."""
+    ordinal = {qk: i for i, qk in enumerate(tiles)}
+    rows = sorted((rkey_hash(rkey), ordinal[qk], off, ln)
+                  for rkey, qk, (off, ln) in entries)
+    write_index_file(str(path), array("Q", map(pack_quadkey, tiles)),
+                     len(rows), [rows[:2], rows[2:]])
+
+
+class TestIndexFile:
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "manifest.idx"
+        _write_index(path, ["02", "023010", "120301"], [
+            ("div1", "02", (100, 20)), ("place001", "023010", (300, 41)),
+            ("place002", "023010", (120, 40)), ("place003", "120301", (2**32 - 1, 7)),
+        ])
+        index = RecordIndex.from_file(str(path))
+        assert len(index) == 4
+        assert list(index.tiles) == [pack_quadkey(qk) for qk in ["02", "023010", "120301"]]
+        assert list(index.lookup("place001")) == [("023010", (300, 41))]
+        assert list(index.lookup("place003")) == [("120301", (2**32 - 1, 7))]
+        assert list(index.lookup("nonexistent")) == []
+        assert not (tmp_path / "manifest.idx.tmp").exists()
+
+    def test_empty_index(self, tmp_path):
+        path = tmp_path / "manifest.idx"
+        _write_index(path, [], [])
+        index = RecordIndex.from_file(str(path))
+        assert len(index) == 0
+        assert len(index.tiles) == 0
+
+    def test_short_row_stream_rejected(self, tmp_path):
+        path = tmp_path / "manifest.idx"
+        with pytest.raises(ValueError):
+            write_index_file(str(path), array("Q"), 3, [[(1, 0, 0, 0)]])
+        assert not path.exists()
+        assert not (tmp_path / "manifest.idx.tmp").exists()
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            RecordIndex.from_file(str(tmp_path / "manifest.idx"))
+
+    def test_bad_magic_rejected(self, tmp_path):
+        path = tmp_path / "manifest.idx"
+        path.write_bytes(b"\0" * 64)
+        with pytest.raises(ValueError):
+            RecordIndex.from_file(str(path))
+
+    def test_truncated_file_rejected(self, tmp_path):
+        path = tmp_path / "manifest.idx"
+        _write_index(path, ["023010"], [("place001", "023010", (0, 1))])
+        path.write_bytes(path.read_bytes()[:-8])
+        with pytest.raises(ValueError):
+            RecordIndex.from_file(str(path))
+
+    def test_older_version_rejected(self, tmp_path):
+        path = tmp_path / "manifest.idx"
+        _write_index(path, [], [])
+        data = bytearray(path.read_bytes())
+        data[8] = 1
+        path.write_bytes(bytes(data))
+        with pytest.raises(ValueError):
+            RecordIndex.from_file(str(path))
@@ -0,0 +1,81 @@
+"""Tests for garganorn.rkey_filter: the per-run Bloom filter of rkeys."""
+import duckdb
+import pytest
+
+from garganorn.rkey_filter import (
+    RkeyFilter,
+    filter_size,
+    filter_words_sql,
+    write_filter_file,
+)
+
+
+def _write_filter(path, rkeys):
+    """Build the filter for rkeys with the export's SQL."""
+    m, k = filter_size(len(rkeys))
+    con = duckdb.connect()
+    try:
+        con.execute("CREATE TABLE staged (rkey VARCHAR)")
+        if rkeys:
+            con.executemany("INSERT INTO staged VALUES (?)", [[r] for r in rkeys])
+        cursor = con.execute(filter_words_sql("staged", m, k))
+        write_filter_file(str(path), m, k, len(rkeys),
+                          iter(lambda: cursor.fetchmany(7), []))
+    finally:
+        con.close()
+    return RkeyFilter.from_file(str(path))
+
+
+class TestFilterSize:
+    def test_rounds_up_to_whole_words(self):
+        m, k = filter_size(7)
+        assert m == 128
+        assert k == 7
+
+    def test_empty_run_still_has_a_word(self):
+        assert filter_size(0)[0] == 64
+
+
+class TestRkeyFilter:
+    def test_no_false_negatives(self, tmp_path):
+        """SQL-set bits and Python-probed bits must agree, or a filter built
+        at export would reject rkeys the run holds."""
+        rkeys = [f"place{i:05d}" for i in range(2000)] + [
+            "node:10080395917", "08f2a1e0-ünïcode", ""]
+        rkey_filter = _write_filter(tmp_path / "manifest.bloom", rkeys)
+        assert all(rkey in rkey_filter for rkey in rkeys)
+        assert not (tmp_path / "manifest.bloom.tmp").exists()
+
+    def test_rejects_most_unknown_rkeys(self, tmp_path):
+        rkey_filter = _write_filter(
+            tmp_path / "manifest.bloom", [f"place{i:05d}" for i in range(2000)])
+        false_positives = sum(f"other{i:05d}" in rkey_filter for i in range(10000))
+        assert false_positives < 300  # ~1% expected at 10 bits a key
+
+    def test_empty_filter_rejects_everything(self, tmp_path):
+        rkey_filter = _write_filter(tmp_path / "manifest.bloom", [])
+        assert "place001" not in rkey_filter
+
+    def test_word_beyond_size_rejected(self, tmp_path):
+        path = tmp_path / "manifest.bloom"
+        with pytest.raises(ValueError):
+            write_filter_file(str(path), 64, 7, 1, [[(1, 1)]])
+        assert not path.exists()
+        assert not (tmp_path / "manifest.bloom.tmp").exists()
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            RkeyFilter.from_file(str(tmp_path / "manifest.bloom"))
+
+    def test_bad_magic_rejected(self, tmp_path):
+        path = tmp_path / "manifest.bloom"
+        path.write_bytes(b"\0" * 64)
+        with pytest.raises(ValueError):
+            RkeyFilter.from_file(str(path))
+
+    def test_truncated_file_rejected(self, tmp_path):
+        path = tmp_path / "manifest.bloom"
+        _write_filter(path, ["place001"])
+        path.write_bytes(path.read_bytes()[:-8])
+        with pytest.raises(ValueError):
+            RkeyFilter.from_file(str(path))
@@ -29,6 +29,13 @@ class MockTileBackedCollection:
     def get_record(self, repo, collection, rkey):
         return self._record
 
+    def get_records(self, repo, collection, rkeys):
+        """Every rkey matching the mock's record, each a fresh copy as the
+        real reader parses them."""
+        if self._record is None:
+            return {}
+        return {r: dict(self._record) for r in rkeys if r == self._record["rkey"]}
+
 
 def _make_server(tile_collections=None, tile_manifests=None, collection_metadata=None):
     """Create a Server with the given tile_collections/tile_manifests/
@@ -347,3 +354,39 @@ def test_get_record_collection_metadata_output_validates_against_lexicon_schema(
     )
 
     server.server.validate("com.atproto.repo.getRecord", "output", result)
+
+
+def test_get_records_in_request_order_with_not_found_entries():
+    record = {"rkey": "tile001", "name": "Tile Place", "importance": 5}
+    mock_col = MockTileBackedCollection(record=record)
+    server = _make_server(tile_collections={TILE_COLLECTION: mock_col})
+
+    result = server.get_records(
+        {}, collection=TILE_COLLECTION, rkeys=["missing", "tile001", "missing"])
+
+    assert result["source"] == TILE_SOURCE_URL
+    assert result["license"] == TILE_LICENSE_URL
+    assert result["records"] == [
+        {"rkey": "missing", "notFound": True},
+        {"rkey": "tile001", "uri": f"https://places.atgeo.org/{TILE_COLLECTION}/tile001",
+         "importance": 5, "value": {"rkey": "tile001", "name": "Tile Place"}},
+        {"rkey": "missing", "notFound": True},
+    ]
+    server.server.validate("org.atgeo.getRecords", "output", result)
+
+
+def test_get_records_repeated_rkey_repeats_its_entry():
+    mock_col = MockTileBackedCollection(record={"rkey": "tile001", "importance": 5})
+    server = _make_server(tile_collections={TILE_COLLECTION: mock_col})
+
+    first, second = server.get_records(
+        {}, collection=TILE_COLLECTION, rkeys=["tile001", "tile001"])["records"]
+    assert first == second
+    assert first["importance"] == 5
+
+
+def test_get_records_collection_not_found():
+    server = _make_server()
+    with pytest.raises(XrpcError) as exc_info:
+        server.get_records({}, collection="unknown.collection", rkeys=["x"])
+    assert exc_info.value.name == "CollectionNotFound"
@@ -1591,6 +1591,72 @@ class TestStageExportMaxTempDirectorySize:
         )
 
 
+class TestSplitSize:
+    """_split_size divides a DuckDB size string into equal byte shares."""
+
+    @pytest.mark.parametrize("size,parts,expected", [
+        ("48GB", 4, "12000000000B"),
+        ("3GiB", 3, "1073741824B"),
+        ("1.5 gb", 2, "750000000B"),
+        ("250G", 1, "250000000000B"),
+        ("1000", 3, "333B"),
+    ])
+    def test_splits(self, size, parts, expected):
+        from garganorn.stages import _split_size
+        assert _split_size(size, parts) == expected
+
+    def test_rejects_unknown_unit(self):
+        from garganorn.stages import _split_size
+        with pytest.raises(ValueError):
+            _split_size("80%", 2)
+
+
+class TestWriteManifestDbTilesTable:
+    """write_manifest_db persists a per-tile `tiles` table, sorted by
+    tile_qk, so the server never has to SELECT DISTINCT over record_tiles."""
+
+    @staticmethod
+    def _ta_parquet(tmp_path, rows):
+        path = str(tmp_path / "tile_assignments.parquet")
+        con = duckdb.connect()
+        con.execute("CREATE TABLE ta (place_id VARCHAR, tile_qk VARCHAR)")
+        con.executemany("INSERT INTO ta VALUES (?, ?)", rows)
+        con.execute(f"COPY ta TO '{path}' (FORMAT PARQUET)")
+        con.close()
+        return path
+
+    def test_persists_export_tile_stats_sorted(self, tmp_path):
+        ta = self._ta_parquet(tmp_path, [("a", "120301"), ("b", "023010"), ("c", "023010")])
+        out_dir = tmp_path / "run"
+        out_dir.mkdir()
+        tiles = {"120301": (1, 40, 90, "d1"), "023010": (2, 55, 180, "d2")}
+
+        write_manifest_db(ta, str(out_dir), "overture_place", tiles=tiles)
+
+        con = duckdb.connect(str(out_dir / "manifest.duckdb"), read_only=True)
+        rows = con.execute("SELECT * FROM tiles").fetchall()
+        types = dict(con.execute(
+            "SELECT column_name, data_type FROM information_schema.columns "
+            "WHERE table_name = 'tiles'"
+        ).fetchall())
+        con.close()
+        assert rows == [("023010", 2, 55, 180, "d2"), ("120301", 1, 40, 90, "d1")]
+        assert types["tile_qk"] == "VARCHAR"
+        assert not (out_dir / "manifest.duckdb.tiles.csv").exists()
+
+    def test_derives_counts_without_export_stats(self, tmp_path):
+        ta = self._ta_parquet(tmp_path, [("a", "120301"), ("b", "023010"), ("c", "023010")])
+        out_dir = tmp_path / "run"
+        out_dir.mkdir()
+
+        write_manifest_db(ta, str(out_dir), "overture_place")
+
+        con = duckdb.connect(str(out_dir / "manifest.duckdb"), read_only=True)
+        rows = con.execute("SELECT * FROM tiles").fetchall()
+        con.close()
+        assert rows == [("023010", 2, None, None, None), ("120301", 1, None, None, None)]
+
+
 class TestWriteManifestDbMaxTempDirectorySize:
     """write_manifest_db opens its own bare connection and runs a
     CREATE TABLE ... ORDER BY over the full tile_assignments parquet, AFTER
@@ -1829,7 +1895,8 @@ class TestMaxTempDirectorySizeThreading:
             parquet_dir=None, division_parquet=None, division_area_parquet=None,
             output="/nonexistent/out", bbox=None, config=None,
             memory_limit=None, max_per_tile=None, boundaries=None,
-            export_workers=None, density_parquet=None, idf_parquet=None,
+            export_workers=None, export_partition_workers=None, export_engine=None,
+            density_parquet=None, idf_parquet=None,
             temp_directory=None, max_temp_directory_size=None, force=False,
         )
         defaults.update(overrides)
@@ -190,6 +190,37 @@ def test_cli_diff_difference_exits_nonzero(tmp_path):
     assert "r1" in res.stdout
 
 
+def test_cli_diff_bytes_catches_reordering_canonical_diff_ignores(tmp_path):
+    records = [{"rkey": "r1", "name": "one"}, {"rkey": "r2", "name": "two"}]
+    src_a = str(tmp_path / "a_tiles")
+    src_b = str(tmp_path / "b_tiles")
+    _build_tiles_dir(src_a, tiles=[("023130", records)],
+                     manifest_qks=("023130",), db_rows=[("r1", "023130"), ("r2", "023130")])
+    _build_tiles_dir(src_b, tiles=[("023130", records[::-1])],
+                     manifest_qks=("023130",), db_rows=[("r1", "023130"), ("r2", "023130")])
+
+    cap_a = str(tmp_path / "a_cap")
+    cap_b = str(tmp_path / "b_cap")
+    assert _run_cli("capture", src_a, cap_a).returncode == 0
+    assert _run_cli("capture", src_b, cap_b).returncode == 0
+
+    assert _run_cli("diff", cap_a, cap_b).returncode == 0
+    res = _run_cli("diff", "--bytes", cap_a, cap_b)
+    assert res.returncode == 1, f"stdout={res.stdout} stderr={res.stderr}"
+    assert "tile 023130: payload bytes differ" in res.stdout
+
+
+def test_payload_digest_ignores_generated_at(tmp_path):
+    paths = []
+    for i, generated_at in enumerate(["2026-01-01T00:00:00Z", "2026-02-01T00:00:00Z"]):
+        path = str(tmp_path / f"{i}.json.gz")
+        with gzip.open(path, "wt") as f:
+            json.dump({"collection": "c", "generated_at": generated_at,
+                       "records": [{"uri": "u", "cid": None, "value": {"rkey": "r1"}}]}, f)
+        paths.append(path)
+    assert tile_parity.payload_digest(paths[0]) == tile_parity.payload_digest(paths[1])
+
+
 # ---------------------------------------------------------------------------
 # atgeo v1 tiles carry {collection, source, license, generated_at, records}
 # with records wrapped as {uri, cid, value}. canonical_tile() must (a) strip
@@ -1,18 +1,36 @@
 """Tests for garganorn.tile_reader.TileBackedCollection.
 
 Tiles are atgeo v1 {uri, cid, value}-wrapped records. get_record() matches
-on `record["value"]["rkey"]` and returns `copy.copy(record["value"])` — the
-value sub-object, not the wrapper.
+on `record["value"]["rkey"]` and returns `record["value"]` — the value
+sub-object, not the wrapper.
 """
 import gzip
 import json
 import os
+import threading
+import time
+from array import array
 from unittest.mock import patch
 
 import duckdb
 import pytest
 
-from garganorn.tile_reader import TileBackedCollection
+from garganorn import envelope
+from garganorn.quadkey import pack_quadkey
+from garganorn.record_index import INDEX_FILENAME, rkey_hash, write_index_file
+from garganorn.rkey_filter import (
+    FILTER_FILENAME,
+    filter_size,
+    filter_words_sql,
+    write_filter_file,
+)
+from garganorn.tile_reader import (
+    AdmissionLimiter,
+    Overloaded,
+    SingleFlight,
+    TileBackedCollection,
+    TileCache,
+)
 
 COLLECTION = "org.atgeo.places.test"
 SOURCE_URL = "https://example.com/tile-source"
@@ -57,12 +75,9 @@ class TestTileBackedCollectionNewEnvelope:
     """get_record() against {uri, cid, value}-wrapped tiles.
 
     Verifies get_record() matches `record["value"]["rkey"]` and returns
-    `copy.copy(record["value"])` — the value sub-object, not the wrapper.
+    `record["value"]` — the value sub-object, not the wrapper.
     """
 
-    def setup_method(self):
-        TileBackedCollection._cached_read_tile.cache_clear()
-
     def test_get_record_returns_value_not_wrapper(self, tmp_path):
         """get_record returns the value dict, not the {uri, cid, value} wrapper."""
         tile_qk = "023010"
@@ -138,8 +153,8 @@ class TestTileBackedCollectionNewEnvelope:
 
     def test_get_record_mutation_does_not_corrupt_cache(self, tmp_path):
         """Popping a key from the returned value (as the server layer does with
-        'importance') must not corrupt the lru_cache-held tile dict — the
-        shallow-copy contract must hold for the value sub-object too."""
+        'importance') must not corrupt the cached tile -- each call gets a
+        value of its own."""
         tile_qk = "023010"
         rkey = "place001"
         manifest_db = _make_manifest_db(tmp_path, [(rkey, tile_qk)])
@@ -185,7 +200,7 @@ class TestTileBackedCollectionNewEnvelope:
 
     def test_tile_caching(self, tmp_path):
         """Two get_record() calls against the same tile only read the tile
-        file from disk once (_cached_read_tile is lru_cache-backed)."""
+        file from disk once (tiles go through the collection's TileCache)."""
         tile_qk = "023010"
         rkey = "place001"
         manifest_db = _make_manifest_db(tmp_path, [(rkey, tile_qk)])
@@ -209,3 +224,540 @@ class TestTileBackedCollectionNewEnvelope:
             "second get_record() for the same tile should hit the cache, "
             "not reopen the tile file"
         )
+
+
+class TestTileBackedCollectionForkSafety:
+    def test_forked_process_opens_its_own_connection(self, tmp_path):
+        manifest_db = _make_manifest_db(tmp_path, [("place001", "023010")])
+        _write_envelope_tile(tmp_path, "023010", [{"rkey": "place001", "name": "First"}])
+        col = TileBackedCollection(
+            collection=COLLECTION, manifest_db_path=str(manifest_db),
+            tiles_dir=str(tmp_path), source_url=SOURCE_URL, license_url=LICENSE_URL,
+        )
+        parent_con = col._con
+        assert col._con is parent_con
+        with patch("garganorn.tile_reader.os.getpid", return_value=os.getpid() + 1):
+            child_con = col._con
+            assert child_con is not parent_con
+            assert col.get_record("repo", COLLECTION, "place001")["name"] == "First"
+        # The inherited connection was left open, not closed under the parent.
+        assert parent_con.execute("SELECT 1").fetchone() == (1,)
+
+
+class TestTileBackedCollectionMemoryIndex:
+    """record_index="memory" answers from a RecordIndex built at startup and
+    never opens a per-thread DuckDB connection."""
+
+    def _collection(self, tmp_path, entries, tiles):
+        manifest_db = _make_manifest_db(tmp_path, entries)
+        for tile_qk, values in tiles.items():
+            _write_envelope_tile(tmp_path, tile_qk, values)
+        return TileBackedCollection(
+            collection=COLLECTION,
+            manifest_db_path=str(manifest_db),
+            tiles_dir=str(tmp_path),
+            source_url=SOURCE_URL,
+            license_url=LICENSE_URL,
+            record_index="memory",
+        )
+
+    def test_get_record_without_duckdb(self, tmp_path):
+        col = self._collection(
+            tmp_path,
+            [("place001", "023010"), ("place002", "120301")],
+            {"023010": [{"rkey": "place001", "name": "First"}],
+             "120301": [{"rkey": "place002", "name": "Second"}]},
+        )
+        with patch("garganorn.tile_reader.duckdb.connect") as mock_connect:
+            first = col.get_record("repo", COLLECTION, "place001")
+            second = col.get_record("repo", COLLECTION, "place002")
+            missing = col.get_record("repo", COLLECTION, "nonexistent")
+        mock_connect.assert_not_called()
+        assert first["name"] == "First"
+        assert second["name"] == "Second"
+        assert missing is None
+
+    def test_missing_tile_file_returns_none(self, tmp_path):
+        col = self._collection(tmp_path, [("place001", "023010")], {})
+        assert col.get_record("repo", COLLECTION, "place001") is None
+
+    def test_unknown_engine_rejected(self, tmp_path):
+        manifest_db = _make_manifest_db(tmp_path, [])
+        with pytest.raises(ValueError):
+            TileBackedCollection(
+                collection=COLLECTION, manifest_db_path=str(manifest_db),
+                tiles_dir=str(tmp_path), source_url=SOURCE_URL,
+                license_url=LICENSE_URL, record_index="redis",
+            )
+
+
+def _write_export_tile(tiles_dir, tile_qk, values):
+    """Write a tile the way stage_export does, returning each record's
+    value span for manifest.idx."""
+    record_jsons = [json.dumps(v, ensure_ascii=False) for v in values]
+    wrapped = [
+        envelope.wrap_record(envelope.record_uri("repo", COLLECTION, v["rkey"]), rj)
+        for v, rj in zip(values, record_jsons)
+    ]
+    payload = envelope.build_tile_payload(
+        COLLECTION, SOURCE_URL, LICENSE_URL, "2026-07-09T18:00:00Z", wrapped)
+    subdir = os.path.join(str(tiles_dir), tile_qk[:6])
+    os.makedirs(subdir, exist_ok=True)
+    with gzip.open(os.path.join(subdir, f"{tile_qk}.json.gz"), "wb") as f:
+        f.write(payload)
+    return envelope.record_value_spans(payload, wrapped, record_jsons)
+
+
+class TestTileBackedCollectionMmapIndex:
+    """record_index="mmap" reads the run's manifest.idx sidecar and parses
+    only the indexed record's value."""
+
+    def _collection(self, tmp_path, tiles, entries):
+        """entries: (rkey, tile_qk, (offset, length))."""
+        manifest_db = _make_manifest_db(tmp_path, [(r, qk) for r, qk, _ in entries])
+        ordinal = {qk: i for i, qk in enumerate(tiles)}
+        rows = sorted((rkey_hash(r), ordinal[qk], off, ln) for r, qk, (off, ln) in entries)
+        write_index_file(str(tmp_path / INDEX_FILENAME),
+                         array("Q", map(pack_quadkey, tiles)), len(rows), [rows])
+        return TileBackedCollection(
+            collection=COLLECTION,
+            manifest_db_path=str(manifest_db),
+            tiles_dir=str(tmp_path),
+            source_url=SOURCE_URL,
+            license_url=LICENSE_URL,
+            record_index="mmap",
+        )
+
+    def test_get_record_by_span(self, tmp_path):
+        spans = _write_export_tile(tmp_path, "023010", [
+            {"rkey": "place001", "name": "Café ☕"},
+            {"rkey": "place002", "name": "Second"},
+        ])
+        col = self._collection(tmp_path, ["023010"], [
+            ("place001", "023010", spans[0]), ("place002", "023010", spans[1]),
+        ])
+        with patch("garganorn.tile_reader.duckdb.connect") as mock_connect:
+            assert col.get_record("repo", COLLECTION, "place002")["name"] == "Second"
+            assert col.get_record("repo", COLLECTION, "place001")["name"] == "Café ☕"
+            assert col.get_record("repo", COLLECTION, "nonexistent") is None
+        mock_connect.assert_not_called()
+
+    def test_does_not_parse_whole_tile(self, tmp_path):
+        spans = _write_export_tile(tmp_path, "023010", [
+            {"rkey": f"place{i:03d}", "name": str(i)} for i in range(50)
+        ])
+        col = self._collection(tmp_path, ["023010"], [("place007", "023010", spans[7])])
+        with patch("garganorn.tile_reader.json.loads", wraps=json.loads) as mock_loads:
+            assert col.get_record("repo", COLLECTION, "place007")["name"] == "7"
+        (arg,), _ = mock_loads.call_args
+        assert len(arg) == spans[7][1]
+
+    def test_span_mismatch_is_not_a_match(self, tmp_path):
+        """The value at the indexed span must carry the rkey itself."""
+        spans = _write_export_tile(tmp_path, "023010", [
+            {"rkey": "place001", "name": "First"},
+            {"rkey": "place002", "name": "Second"},
+        ])
+        col = self._collection(tmp_path, ["023010"], [("place002", "023010", spans[0])])
+        assert col.get_record("repo", COLLECTION, "place002") is None
+
+    def test_missing_sidecar_raises(self, tmp_path):
+        manifest_db = _make_manifest_db(tmp_path, [])
+        with pytest.raises(FileNotFoundError):
+            TileBackedCollection(
+                collection=COLLECTION, manifest_db_path=str(manifest_db),
+                tiles_dir=str(tmp_path), source_url=SOURCE_URL,
+                license_url=LICENSE_URL, record_index="mmap",
+            )
+
+
+class TestTileBackedCollectionGetRecords:
+    """get_records() resolves every rkey's tile in one lookup and reads
+    each distinct tile once."""
+
+    def _collection(self, tmp_path, entries, record_index="duckdb"):
+        manifest_db = _make_manifest_db(tmp_path, entries)
+        return TileBackedCollection(
+            collection=COLLECTION, manifest_db_path=str(manifest_db),
+            tiles_dir=str(tmp_path), source_url=SOURCE_URL, license_url=LICENSE_URL,
+            record_index=record_index,
+        )
+
+    @pytest.mark.parametrize("record_index", ["duckdb", "memory"])
+    def test_reads_each_tile_once(self, tmp_path, record_index):
+        _write_envelope_tile(tmp_path, "023010", [
+            {"rkey": "place001", "name": "First"}, {"rkey": "place002", "name": "Second"}])
+        _write_envelope_tile(tmp_path, "120301", [{"rkey": "place003", "name": "Third"}])
+        col = self._collection(tmp_path, [
+            ("place001", "023010"), ("place002", "023010"), ("place003", "120301")],
+            record_index)
+        with patch.object(col, "_read_tile", wraps=col._read_tile) as mock_read:
+            found = col.get_records("repo", COLLECTION,
+                                    ["place003", "nonexistent", "place001", "place002"])
+        assert {rkey: v["name"] for rkey, v in found.items()} == {
+            "place001": "First", "place002": "Second", "place003": "Third"}
+        assert sorted(c.args[0] for c in mock_read.call_args_list) == ["023010", "120301"]
+        assert col.lookup_seconds.count() == 1
+
+    def test_one_manifest_query(self, tmp_path):
+        _write_envelope_tile(tmp_path, "023010", [
+            {"rkey": "place001", "name": "First"}, {"rkey": "place002", "name": "Second"}])
+        col = self._collection(tmp_path, [("place001", "023010"), ("place002", "023010")])
+        con = col._con
+        with patch.object(col._local, "con") as mock_con:
+            mock_con.execute.side_effect = con.execute
+            col.get_records("repo", COLLECTION, ["place001", "place002", "place001"])
+        assert mock_con.execute.call_count == 1
+
+    def test_later_candidate_tried_when_first_misses(self, tmp_path):
+        """A division referenced from several tiles is still found when the
+        first candidate tile is gone."""
+        _write_envelope_tile(tmp_path, "023011", [{"rkey": "div1", "name": "Division"}])
+        col = self._collection(
+            tmp_path, [("div1", "023010"), ("div1", "023011")], record_index="memory")
+        assert col.get_records("repo", COLLECTION, ["div1"])["div1"]["name"] == "Division"
+
+    def test_by_span(self, tmp_path):
+        spans = _write_export_tile(tmp_path, "023010", [
+            {"rkey": "place001", "name": "First"}, {"rkey": "place002", "name": "Second"}])
+        manifest_db = _make_manifest_db(tmp_path, [("place001", "023010"), ("place002", "023010")])
+        rows = sorted((rkey_hash(r), 0, *span) for r, span in zip(["place001", "place002"], spans))
+        write_index_file(str(tmp_path / INDEX_FILENAME),
+                         array("Q", [pack_quadkey("023010")]), len(rows), [rows])
+        col = TileBackedCollection(
+            collection=COLLECTION, manifest_db_path=str(manifest_db),
+            tiles_dir=str(tmp_path), source_url=SOURCE_URL, license_url=LICENSE_URL,
+            record_index="mmap",
+        )
+        found = col.get_records("repo", COLLECTION, ["place002", "place001"])
+        assert found["place001"]["name"] == "First"
+        assert found["place002"]["name"] == "Second"
+
+    def test_filter_rejects_before_lookup(self, tmp_path):
+        _write_envelope_tile(tmp_path, "023010", [{"rkey": "place001", "name": "First"}])
+        _write_bloom(tmp_path, ["place001"])
+        col = self._collection(tmp_path, [("place001", "023010")])
+        found = col.get_records("repo", COLLECTION, ["place001", "nonexistent", "nonexistent"])
+        assert list(found) == ["place001"]
+        assert col.filter_rejections.value() == 1
+
+    def test_nothing_to_look_up(self, tmp_path):
+        col = self._collection(tmp_path, [])
+        with patch("garganorn.tile_reader.duckdb.connect") as mock_connect:
+            assert col.get_records("repo", COLLECTION, []) == {}
+        mock_connect.assert_not_called()
+
+
+def _write_bloom(tiles_dir, rkeys):
+    """Write manifest.bloom for rkeys with the export's SQL."""
+    m, k = filter_size(len(rkeys))
+    con = duckdb.connect()
+    try:
+        cursor = con.execute(filter_words_sql(
+            "(SELECT unnest(?::VARCHAR[]) AS rkey)", m, k), [rkeys])
+        write_filter_file(os.path.join(str(tiles_dir), FILTER_FILENAME), m, k,
+                          len(rkeys), [cursor.fetchall()])
+    finally:
+        con.close()
+
+
+class TestTileBackedCollectionRkeyFilter:
+    """A manifest.bloom beside manifest.duckdb answers definite misses
+    before any record_index engine runs."""
+
+    def _collection(self, tmp_path):
+        manifest_db = _make_manifest_db(tmp_path, [("place001", "023010")])
+        _write_envelope_tile(tmp_path, "023010", [{"rkey": "place001", "name": "First"}])
+        return TileBackedCollection(
+            collection=COLLECTION, manifest_db_path=str(manifest_db),
+            tiles_dir=str(tmp_path), source_url=SOURCE_URL, license_url=LICENSE_URL,
+        )
+
+    def test_unknown_rkey_skips_lookup(self, tmp_path):
+        _write_bloom(tmp_path, ["place001"])
+        col = self._collection(tmp_path)
+        with patch("garganorn.tile_reader.duckdb.connect") as mock_connect:
+            assert col.get_record("repo", COLLECTION, "nonexistent") is None
+        mock_connect.assert_not_called()
+        assert col.filter_rejections.value() == 1
+        assert col.lookup_seconds.count() == 1
+
+    def test_known_rkey_still_found(self, tmp_path):
+        _write_bloom(tmp_path, ["place001"])
+        col = self._collection(tmp_path)
+        assert col.get_record("repo", COLLECTION, "place001")["name"] == "First"
+        assert col.filter_rejections.value() == 0
+
+    def test_run_without_filter(self, tmp_path):
+        col = self._collection(tmp_path)
+        assert col.get_record("repo", COLLECTION, "place001")["name"] == "First"
+        assert col.get_record("repo", COLLECTION, "nonexistent") is None
+        assert col.filter_rejections.value() == 0
+
+    def test_unusable_filter_ignored(self, tmp_path):
+        (tmp_path / FILTER_FILENAME).write_bytes(b"\0" * 64)
+        col = self._collection(tmp_path)
+        assert col.get_record("repo", COLLECTION, "place001")["name"] == "First"
+
+
+class TestTileCache:
+    """TileCache bounds decompressed tile bytes by total size, LRU first."""
+
+    def test_hit_and_miss_counters(self):
+        cache = TileCache(max_bytes=100)
+        loads = []
+
+        def load():
+            loads.append(1)
+            return b"x" * 10
+
+        assert cache.get("a", load) == b"x" * 10
+        assert cache.get("a", load) == b"x" * 10
+        assert len(loads) == 1
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["bytes"]) == (1, 1, 10)
+
+    def test_evicts_least_recently_used_over_budget(self):
+        cache = TileCache(max_bytes=25)
+        cache.get("a", lambda: b"a" * 10)
+        cache.get("b", lambda: b"b" * 10)
+        cache.get("a", lambda: b"unused")      # a is now most recent
+        cache.get("c", lambda: b"c" * 10)      # 30 bytes > 25: evicts b
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["bytes"] == 20
+        assert cache.get("a", lambda: b"reloaded") == b"a" * 10
+        assert cache.get("b", lambda: b"reloaded") == b"reloaded"
+
+    def test_oversized_entry_not_cached(self):
+        cache = TileCache(max_bytes=5)
+        assert cache.get("a", lambda: b"123456") == b"123456"
+        assert cache.stats()["entries"] == 0
+        assert cache.stats()["evictions"] == 0
+
+    def test_zero_budget_disables_caching(self):
+        cache = TileCache(max_bytes=0)
+        cache.get("a", lambda: b"1")
+        cache.get("a", lambda: b"1")
+        assert cache.stats()["misses"] == 2
+
+    def test_negative_budget_rejected(self):
+        with pytest.raises(ValueError):
+            TileCache(max_bytes=-1)
+
+    def test_collection_budget_from_constructor(self, tmp_path):
+        """tile_cache_bytes sizes the collection's cache; a budget smaller
+        than the tile means every read goes back to disk."""
+        manifest_db = _make_manifest_db(tmp_path, [("place001", "023010")])
+        _write_envelope_tile(tmp_path, "023010", [{"rkey": "place001"}])
+        col = TileBackedCollection(
+            collection=COLLECTION, manifest_db_path=str(manifest_db),
+            tiles_dir=str(tmp_path), source_url=SOURCE_URL,
+            license_url=LICENSE_URL, tile_cache_bytes=1,
+        )
+        col.get_record("repo", COLLECTION, "place001")
+        col.get_record("repo", COLLECTION, "place001")
+        assert col.tile_cache.stats()["misses"] == 2
+
+
+class TestTileCacheWarm:
+    def test_warm_fills_without_counting(self):
+        cache = TileCache(max_bytes=100)
+        cache.warm("a", lambda: b"1234")
+        cache.warm("a", lambda: b"never loaded")
+        assert cache.get("a", lambda: b"unused") == b"1234"
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 0)
+
+    def test_keys_least_recent_first(self):
+        cache = TileCache(max_bytes=100)
+        for key in "abc":
+            cache.get(key, lambda: b"x")
+        cache.get("a", lambda: b"x")
+        assert cache.keys() == ["b", "c", "a"]
+
+
+class TestSingleFlight:
+    """SingleFlight runs one load per key at a time and caps distinct loads."""
+
+    def _run_threads(self, n, target):
+        threads = [threading.Thread(target=target) for _ in range(n)]
+        for t in threads:
+            t.start()
+        return threads
+
+    def test_concurrent_callers_share_one_load(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def load():
+            calls.append(1)
+            release.wait(5)
+            return b"tile"
+
+        threads = self._run_threads(8, lambda: results.append(flight.do("k", load)))
+        # Let every thread reach do() before the leader's load finishes.
+        time.sleep(0.05)
+        release.set()
+        for t in threads:
+            t.join()
+        assert len(calls) == 1
+        assert sorted(shared for _, shared in results) == [False] + [True] * 7
+        assert all(data == b"tile" for data, _ in results)
+
+    def test_error_reaches_waiters_and_is_not_remembered(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        errors = []
+
+        def load():
+            release.wait(5)
+            raise FileNotFoundError("gone")
+
+        def call():
+            try:
+                flight.do("k", load)
+            except FileNotFoundError as e:
+                errors.append(e)
+
+        threads = self._run_threads(4, call)
+        release.set()
+        for t in threads:
+            t.join()
+        assert len(errors) == 4
+        assert flight.do("k", lambda: b"back") == (b"back", False)
+
+    def test_distinct_loads_bounded(self):
+        flight = SingleFlight(max_concurrent=2)
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+
+        def load():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            return b""
+
+        keys = iter(range(6))
+        threads = self._run_threads(6, lambda: flight.do(next(keys), load))
+        for t in threads:
+            t.join()
+        assert peak[0] == 2
+
+    def test_invalid_bound_rejected(self):
+        with pytest.raises(ValueError):
+            SingleFlight(max_concurrent=0)
+
+    def test_tile_cache_counts_coalesced_misses(self):
+        cache = TileCache(max_bytes=100)
+        release = threading.Event()
+        started = threading.Event()
+
+        def load():
+            started.set()
+            release.wait(5)
+            return b"tile"
+
+        leader = threading.Thread(target=lambda: cache.get("k", load))
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=lambda: cache.get("k", load))
+        follower.start()
+        # Give the follower time to join the in-flight load.
+        time.sleep(0.05)
+        release.set()
+        leader.join()
+        follower.join()
+        stats = cache.stats()
+        assert (stats["misses"], stats["coalesced"], stats["entries"]) == (1, 1, 1)
+
+
+class TestAdmissionLimiter:
+    """AdmissionLimiter admits max_concurrent holders, queues max_queue
+    more for up to queue_timeout, and sheds the rest with Overloaded."""
+
+    def _hold(self, limiter):
+        """Occupy one slot from another thread; returns the release Event."""
+        entered = threading.Event()
+        release = threading.Event()
+
+        def hold():
+            with limiter:
+                entered.set()
+                release.wait(5)
+
+        threading.Thread(target=hold).start()
+        entered.wait(5)
+        return release
+
+    def test_full_queue_sheds_at_once(self):
+        limiter = AdmissionLimiter(1, max_queue=0, retry_after=3)
+        release = self._hold(limiter)
+        start = time.monotonic()
+        with pytest.raises(Overloaded) as exc_info:
+            with limiter:
+                pass
+        release.set()
+        assert time.monotonic() - start < 0.5
+        assert exc_info.value.retry_after == 3
+        assert limiter.stats()["shed"] == 1
+
+    def test_waiter_times_out(self):
+        limiter = AdmissionLimiter(1, max_queue=4, queue_timeout=0.05)
+        release = self._hold(limiter)
+        with pytest.raises(Overloaded):
+            with limiter:
+                pass
+        release.set()
+        stats = limiter.stats()
+        assert (stats["shed"], stats["queued"]) == (1, 0)
+
+    def test_waiter_admitted_when_slot_frees(self):
+        limiter = AdmissionLimiter(1, max_queue=1, queue_timeout=5)
+        release = self._hold(limiter)
+        threading.Timer(0.05, release.set).start()
+        with limiter:
+            assert limiter.stats()["in_flight"] == 1
+        stats = limiter.stats()
+        assert (stats["admitted"], stats["shed"], stats["in_flight"]) == (2, 0, 0)
+
+    def test_invalid_bounds_rejected(self):
+        with pytest.raises(ValueError):
+            AdmissionLimiter(0)
+        with pytest.raises(ValueError):
+            AdmissionLimiter(1, max_queue=-1)
+
+    def test_shed_load_is_not_remembered(self):
+        flight = SingleFlight(limiter=AdmissionLimiter(1, max_queue=0))
+        release = self._hold(flight.limiter)
+        with pytest.raises(Overloaded):
+            flight.do("k", lambda: b"tile")
+        release.set()
+        time.sleep(0.05)
+        assert flight.do("k", lambda: b"tile") == (b"tile", False)
+
+    def test_duckdb_lookup_is_cold_path(self, tmp_path):
+        """A DuckDB getRecord lookup takes a slot; with none free and no
+        queue it is shed before querying."""
+        manifest_db = _make_manifest_db(tmp_path, [("place001", "023010")])
+        _write_envelope_tile(tmp_path, "023010", [{"rkey": "place001", "name": "First"}])
+        flight = SingleFlight(limiter=AdmissionLimiter(1, max_queue=0))
+        col = TileBackedCollection(
+            collection=COLLECTION, manifest_db_path=str(manifest_db),
+            tiles_dir=str(tmp_path), source_url=SOURCE_URL, license_url=LICENSE_URL,
+            flight=flight,
+        )
+        release = self._hold(flight.limiter)
+        with pytest.raises(Overloaded):
+            col.get_record("repo", COLLECTION, "place001")
+        with pytest.raises(Overloaded):
+            col.get_records("repo", COLLECTION, ["place001"])
+        release.set()
+        time.sleep(0.05)
+        assert col.get_record("repo", COLLECTION, "place001")["name"] == "First"